@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+# python benchmarks/bench_tilemap.py로 실행해도 modules를 찾을 수 있도록 저장소 루트를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from modules.map import CHUNK_SIZE, TileMap
+
+# 맵 크기별 TileMap.draw 시간 측정 (화면 크기가 같으면 draw 시간도 같아야 함)
+# 사용법: python benchmarks/bench_tilemap.py
+MAP_SIZES = [(9, 6), (100, 100), (1000, 1000)]
+SCREEN_SIZE = (800, 600)
+WINDOW_SIZE = (1600, 1200)  # 카메라가 오가는 고정 영역 (맵 크기와 무관하게 같은 경로)
+CAMERA_SPEED = 5            # 프레임당 이동 거리 (플레이어 속도와 같음)
+FRAMES = 1000
+
+
+def make_tilemap(cols, rows, tile_size=50):
+    pattern = ["grass", "soil", "planted soil", "stone", "water"]
+    data = [[pattern[(c + r) % len(pattern)] for c in range(cols)] for r in range(rows)]
+    tilemap = TileMap(cols, rows, tile_size)
+    tilemap.generate(data)
+    return tilemap
+
+
+def camera_path(tilemap, screen, frames):
+    """고정 영역 안을 플레이어 속도로 대각선 왕복하는 카메라 위치 (맵이 작으면 맵 안으로 제한)"""
+    max_x = max(0, min(WINDOW_SIZE[0], tilemap.map_width * tilemap.tile_size) - screen.get_width())
+    max_y = max(0, min(WINDOW_SIZE[1], tilemap.map_height * tilemap.tile_size) - screen.get_height())
+    for i in range(frames):
+        distance = i * CAMERA_SPEED
+        x = distance % (2 * max_x) if max_x else 0
+        y = distance % (2 * max_y) if max_y else 0
+        yield (2 * max_x - x if x > max_x else x), (2 * max_y - y if y > max_y else y)
+
+
+def missing_chunks(tilemap, screen, camera_x, camera_y):
+    """이번 프레임에 새로 그려야 하는 청크가 있는지 (캐시 미스)"""
+    col_start, col_end, row_start, row_end = tilemap.visible_range(
+        camera_x, camera_y, screen.get_width(), screen.get_height())
+    return any(
+        (chunk_col, chunk_row) not in tilemap.chunk_surfaces
+        for chunk_row in range(row_start // CHUNK_SIZE, (row_end - 1) // CHUNK_SIZE + 1)
+        for chunk_col in range(col_start // CHUNK_SIZE, (col_end - 1) // CHUNK_SIZE + 1)
+    )
+
+
+def bench_draw(tilemap, screen, frames=FRAMES):
+    """캐시된 청크만 그린 프레임과 청크를 새로 그린 프레임의 평균 시간(ms)과 미스 프레임 수"""
+    cached, missed = [], []
+    for camera_x, camera_y in camera_path(tilemap, screen, frames):
+        miss = missing_chunks(tilemap, screen, camera_x, camera_y)
+        start = time.perf_counter()
+        tilemap.draw(screen, camera_x, camera_y)
+        elapsed = (time.perf_counter() - start) * 1000
+        (missed if miss else cached).append(elapsed)
+    average = lambda times: sum(times) / len(times) if times else 0.0
+    return average(cached), average(missed), len(missed)
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    for cols, rows in MAP_SIZES:
+        tilemap = make_tilemap(cols, rows)
+        cached_ms, miss_ms, misses = bench_draw(tilemap, screen)
+        print(f"{cols}x{rows}: 캐시 {cached_ms:.3f} ms/frame, 미스 {miss_ms:.3f} ms/frame ({misses}/{FRAMES} 프레임)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
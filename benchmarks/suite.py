@@ -0,0 +1,167 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from modules.map import Map, SeedManager
+from modules.map_binary import compile_maps, compiled_path
+from modules.camera import Camera
+from modules.npc import NPCManager
+from modules.player import Player, SpriteSheet, CollisionManager
+from modules.save import SaveLoad
+from modules.game import PressedKeys
+from benchmarks.worlds import SCALES, make_world
+
+# 합성 월드 규모별 주요 경로 시간 측정 후 기준값과 비교
+# 사용법: python -m benchmarks.suite [--scales small medium] [--save-baseline] [--check]
+SCREEN_SIZE = (800, 600)
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def measure(func, repeat):
+    """func(i)를 repeat번 실행한 시간의 중앙값 (ms)"""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run_scale(name, screen, workdir):
+    maps_data, save_data = make_world(**SCALES[name])
+    map_file = os.path.join(workdir, f"{name}_maps.json")
+    save_file = os.path.join(workdir, f"{name}_save.json")
+    with open(map_file, "w") as file:
+        json.dump(maps_data, file)
+    with open(save_file, "w", encoding="utf-8") as file:
+        json.dump(save_data, file)
+
+    game_map = Map(map_file)
+    player = Player(100, 100, 40, 5, SpriteSheet("data/ditto.png"))
+    npc_manager = NPCManager()
+    SaveLoad.load_game(player, game_map, npc_manager, save_file)
+    camera = Camera(SCREEN_SIZE[0], SCREEN_SIZE[1], game_map, screen)
+    collision_manager = CollisionManager(game_map)
+    seed_manager = SeedManager(game_map)
+    camera.update(player)
+    npc_manager.update(game_map, camera)
+
+    tile_map = game_map.tile_map
+    max_x = max(0, tile_map.map_width * tile_map.tile_size - SCREEN_SIZE[0])
+    max_y = max(0, tile_map.map_height * tile_map.tile_size - SCREEN_SIZE[1])
+
+    def draw_tiles(i):
+        # 한 화면 폭 안에서 좌우로 스크롤
+        offset = (i * 8) % (2 * SCREEN_SIZE[0])
+        camera_x = min(max_x, offset if offset < SCREEN_SIZE[0] else 2 * SCREEN_SIZE[0] - offset)
+        tile_map.draw(screen, camera_x, min(max_y, SCREEN_SIZE[1]))
+
+    def move_player(i):
+        keys = PressedKeys([pygame.K_d] if (i // 20) % 2 == 0 else [pygame.K_a])
+        player.move(keys, game_map, collision_manager, 16, npc_manager, camera, None)
+
+    def draw_inventory(i):
+        # 상점 UI: 인벤토리를 연 채로 가끔 아이템 수량이 바뀜
+        camera.show_inventory = True
+        if i % 20 == 0:
+            player.inventory.add(0)
+        camera.draw_inventory(player)
+
+    results = {
+        "tilemap_draw": measure(draw_tiles, 200),
+        "update_crop": measure(lambda i: game_map.update_crop(i * 150), 200),
+        "player_move": measure(move_player, 200),
+        # 카메라를 넘겨 화면 안/근처/먼 NPC를 나눠 갱신하는 경로를 측정
+        "npc_update": measure(lambda i: npc_manager.update(game_map, camera, 16), 200),
+        "npc_draw": measure(lambda i: npc_manager.draw(screen, camera), 200),
+        "item_draw": measure(lambda i: game_map.draw_items(screen, camera, seed_manager), 200),
+        "inventory_draw": measure(draw_inventory, 200),
+        "save_game": measure(lambda i: SaveLoad.save_game(player, game_map, npc_manager, save_file), 5),
+        "load_game": measure(lambda i: SaveLoad.load_game(player, game_map, npc_manager, save_file), 5),
+        "save_maps": measure(lambda i: game_map.save_maps(), 3),
+        "load_maps": measure(lambda i: game_map.load_maps(), 3),
+    }
+    # 같은 월드를 컴파일한 파일로 다시 로드 (타일은 mmap에서 필요할 때 읽음)
+    compile_maps(maps_data, compiled_path(map_file))
+    results["load_maps_bin"] = measure(lambda i: game_map.load_maps(), 3)
+    return results
+
+
+def compare(results, baseline, threshold, min_delta=0.0):
+    """기준값보다 threshold 비율 이상, min_delta(ms) 이상 느려진 항목 목록 반환 (1ms 미만 측정의 흔들림은 무시)"""
+    regressions = []
+    for scale, benchmarks in results.items():
+        for bench, value in benchmarks.items():
+            base = baseline.get(scale, {}).get(bench)
+            if base and value > base * (1 + threshold) and value - base >= min_delta:
+                regressions.append((scale, bench, base, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 월드 벤치마크")
+    parser.add_argument("--scales", nargs="+", default=list(SCALES), choices=list(SCALES))
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 파일 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준 결과 JSON 파일 경로")
+    parser.add_argument("--threshold", type=float, default=0.25, help="허용 성능 저하 비율 (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="이보다 적게(ms) 느려진 항목은 무시")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--check", action="store_true", help="기준값 파일이 없어도 실패로 처리 (CI용)")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            with contextlib.redirect_stdout(io.StringIO()):  # 게임 로그 출력 숨김
+                results[scale] = run_scale(scale, screen, workdir)
+            for bench, value in results[scale].items():
+                print(f"{scale:>8} {bench:<14} {value:10.3f} ms")
+    pygame.quit()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"결과 저장: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=4)
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["results"]
+    except FileNotFoundError:
+        print(f"기준값 파일이 없습니다: {args.baseline} (--save-baseline 으로 생성)")
+        return 1 if args.check else 0
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    for scale, bench, base, value in regressions:
+        print(f"성능 저하: {scale} {bench} {base:.3f} ms -> {value:.3f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
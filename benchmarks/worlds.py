@@ -0,0 +1,84 @@
+import random
+
+# 벤치마크용 합성 월드 생성 (maps_data.json / game_save.json 과 같은 형식)
+TILE_PATTERN = ["grass", "grass", "soil", "planted soil", "stone", "water"]
+
+SCALES = {
+    "small": {"tiles": (9, 6), "obstacles": 2, "items": 5, "npcs": 1, "inventory": 4},
+    "medium": {"tiles": (200, 200), "obstacles": 200, "items": 1000, "npcs": 100, "inventory": 100},
+    "large": {"tiles": (500, 500), "obstacles": 1000, "items": 10000, "npcs": 1000, "inventory": 1000},
+}
+
+
+def make_world(tiles, obstacles, items, npcs, inventory, tile_size=50, seed=0):
+    """(maps 데이터, 세이브 데이터) 반환. 모든 내용은 플레이어가 있는 0번 맵에 배치"""
+    rng = random.Random(seed)
+    cols, rows = tiles
+    width = max(cols * tile_size, 2000)
+    height = max(rows * tile_size, 2000)
+
+    spawn_map = {
+        "type": "spawn map",
+        "size": [width, height],
+        "background_path": None,
+        "tilemap": [[rng.choice(TILE_PATTERN) for _ in range(cols)] for _ in range(rows)],
+        "obstacles": [
+            {
+                "x": rng.randint(0, width - 200),
+                "y": rng.randint(0, height - 200),
+                "width": rng.randint(20, 200),
+                "height": rng.randint(20, 200),
+            }
+            for _ in range(obstacles)
+        ],
+        "transition_zones": [
+            {"zone": {"x": width - 50, "y": height // 2, "width": 50, "height": 100}, "target_map": 1, "start_pos": [80, 725]}
+        ],
+        "map_index": 0,
+        "items": [
+            {"map_index": 0, "position": [rng.randint(0, width), rng.randint(0, height)], "type": "seed", "id": rng.randint(0, 2)}
+            for _ in range(items)
+        ],
+    }
+    seed_map = {
+        "type": "seed map",
+        "size": [1000, 1000],
+        "background_path": None,
+        "tilemap": [],
+        "obstacles": [],
+        "transition_zones": [
+            {"zone": {"x": 0, "y": 700, "width": 50, "height": 100}, "target_map": 0, "start_pos": [100, 100]}
+        ],
+        "map_index": 1,
+        "items": [],
+    }
+    maps_data = {"maps": [spawn_map, seed_map]}
+
+    save_data = {
+        "player": {
+            "map": 0,
+            "x": 100,
+            "y": 100,
+            "level": 1,
+            "experience": 0,
+            "health": 100,
+            "money": 0,
+            "inventory": [
+                {"id": item_id, "type": "seed", "name": f"Seed {item_id}", "quantity": 10, "price": 10}
+                for item_id in range(inventory)
+            ],
+        },
+        "npcs": [
+            {
+                "id": npc_id,
+                "name": f"NPC {npc_id}",
+                "type": "villager",
+                "map": 0,
+                "x": rng.randint(0, width),
+                "y": rng.randint(0, height),
+                "dialogue": ["Hi"],
+            }
+            for npc_id in range(npcs)
+        ],
+    }
+    return maps_data, save_data
@@ -0,0 +1,102 @@
+import pygame
+
+####################################
+# 공용 에셋 관리 (이미지 1회 로드 + 변형 결과 캐시 + 아틀라스)
+####################################
+def display_ready():
+    """convert()/convert_alpha()는 화면 모드가 설정된 뒤에만 쓸 수 있음"""
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+
+def to_display_format(surface, alpha=True):
+    if not display_ready():
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class Atlas:
+    """작은 프레임 여러 개를 큰 서피스 하나에 선반(shelf) 방식으로 배치하고, 각 프레임은 그 일부를 가리킴"""
+    def __init__(self, frames, max_width=1024, padding=1):
+        positions = []
+        x = y = shelf_height = width = 0
+        for frame in frames:
+            frame_width, frame_height = frame.get_size()
+            if x > 0 and x + frame_width > max_width:  # 현재 줄이 가득 차면 다음 줄로
+                x = 0
+                y += shelf_height + padding
+                shelf_height = 0
+            positions.append((x, y))
+            x += frame_width + padding
+            shelf_height = max(shelf_height, frame_height)
+            width = max(width, x)
+
+        surface = pygame.Surface((max(1, width), max(1, y + shelf_height)), pygame.SRCALPHA)
+        for frame, pos in zip(frames, positions):
+            surface.blit(frame, pos, special_flags=pygame.BLEND_RGBA_MAX)  # 투명 배경 위에 픽셀 그대로 복사
+        self.surface = to_display_format(surface)
+        self.frames = [
+            self.surface.subsurface((pos, frame.get_size()))
+            for frame, pos in zip(frames, positions)
+        ]
+
+
+class AssetManager:
+    """이미지 파일은 한 번만 읽어 화면 형식으로 변환하고, 잘라내기/크기 변경/뒤집기 결과는 키별로 재사용"""
+    def __init__(self):
+        self.images = {}    # (경로, 알파 여부) -> 원본 이미지
+        self.variants = {}  # (경로, 영역, 배율, 크기, 뒤집기, 알파 여부) -> 변형된 이미지
+        self.atlases = {}   # 프레임 묶음 키 -> Atlas
+
+    def load(self, path, alpha=True):
+        key = (path, alpha)
+        image = self.images.get(key)
+        if image is None:
+            image = to_display_format(pygame.image.load(path), alpha)
+            self.images[key] = image
+        return image
+
+    def get_image(self, path, rect=None, scale=1, size=None, flip_x=False, flip_y=False, alpha=True):
+        """이미지(또는 rect 영역)를 scale배 혹은 size 크기로 바꾸고 뒤집은 결과"""
+        key = (path, tuple(rect) if rect else None, scale, tuple(size) if size else None, flip_x, flip_y, alpha)
+        image = self.variants.get(key)
+        if image is not None:
+            return image
+
+        image = self.load(path, alpha)
+        if rect:
+            x, y, width, height = rect
+            frame = pygame.Surface((width, height), pygame.SRCALPHA if alpha else 0)
+            frame.blit(image, (0, 0), (x, y, width, height))
+            image = frame
+        if size:
+            image = pygame.transform.scale(image, size)
+        elif scale != 1:
+            width, height = image.get_size()
+            image = pygame.transform.scale(image, (int(width * scale), int(height * scale)))
+        if flip_x or flip_y:
+            image = pygame.transform.flip(image, flip_x, flip_y)
+
+        image = to_display_format(image, alpha)
+        self.variants[key] = image
+        return image
+
+    def get_frames(self, path, start_x, start_y, frame_width, frame_height, num_frames, scale=1):
+        """가로로 이어진 애니메이션 프레임을 잘라 하나의 아틀라스에 모아 반환"""
+        key = (path, start_x, start_y, frame_width, frame_height, num_frames, scale)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            frames = [
+                self.get_image(path, (start_x + i * frame_width, start_y, frame_width, frame_height), scale)
+                for i in range(num_frames)
+            ]
+            atlas = Atlas(frames)
+            self.atlases[key] = atlas
+        return list(atlas.frames)
+
+    def clear(self):
+        self.images.clear()
+        self.variants.clear()
+        self.atlases.clear()
+
+
+assets = AssetManager()  # 게임 전체에서 공유
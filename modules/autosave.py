@@ -0,0 +1,270 @@
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from modules.map_binary import compiled_path, is_fresh, refresh_compiled
+from modules.save import SaveLoad, write_json_atomic
+
+####################################
+# 저널 기반 백그라운드 자동 저장
+####################################
+def apply_journal(save_data, maps_data, entries):
+    """저널 항목을 저장 데이터에 순서대로 반영"""
+    maps = {m["map_index"]: m for m in maps_data["maps"]} if maps_data else {}
+    for entry in entries:
+        entry_type = entry["type"]
+        if entry_type == "player":
+            save_data["player"] = entry["player"]
+        elif entry_type == "npcs":
+            save_data["npcs"] = entry["npcs"]
+        elif entry_type == "npc_updates":  # 바뀐 NPC만 [위치, 기록]으로 저장한 항목
+            npcs = save_data.setdefault("npcs", [])
+            del npcs[entry["count"]:]
+            npcs.extend([None] * (entry["count"] - len(npcs)))
+            for index, record in entry["npcs"]:
+                npcs[index] = record
+        elif entry_type == "world":
+            save_data["world"] = entry["world"]
+        elif entry_type == "items" and entry["map"] in maps:
+            maps[entry["map"]]["items"] = entry["items"]
+        elif entry_type == "tiles" and entry["map"] in maps:
+            tilemap = maps[entry["map"]]["tilemap"]
+            for col, row, tile_type in entry["cells"]:
+                if 0 <= row < len(tilemap) and 0 <= col < len(tilemap[row]):
+                    tilemap[row][col] = tile_type
+        elif entry_type == "chunks" and entry["map"] in maps:
+            maps[entry["map"]].setdefault("chunks", {}).update(entry["chunks"])
+        elif entry_type == "crops" and entry["map"] in maps:
+            crops = {(crop[0], crop[1]): crop for crop in maps[entry["map"]].get("crops", [])}
+            for col, row, crop in entry["cells"]:
+                if crop is None:
+                    crops.pop((col, row), None)
+                else:
+                    crops[(col, row)] = [col, row] + crop
+            maps[entry["map"]]["crops"] = sorted(crops.values(), key=lambda crop: (crop[0], crop[1]))
+
+
+def read_journal(journal_file):
+    """저널 파일의 항목 목록 (종료 직전에 잘린 마지막 줄은 무시)"""
+    entries = []
+    try:
+        with open(journal_file, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def compact_journal(save_file, map_file, journal_file):
+    """저널을 전체 파일로 합침 (자동 저장 중에는 별도 프로세스에서 실행해 JSON 변환이 프레임과 GIL을 다투지 않게 함)"""
+    entries = read_journal(journal_file)
+    if entries:
+        AutoSaver.compact_files(save_file, map_file, journal_file, entries)
+
+
+def load_json(file_path):
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class AutoSaver:
+    """바뀐 상태만 주기적으로 저널에 덧붙이고, 가끔 전체 파일로 합침 (파일 쓰기는 작업 스레드에서)"""
+    def __init__(self, player, game_map, npc_manager, save_file="game_save.json",
+                 journal_file=None, interval=60000, compact_every=10):
+        self.player = player
+        self.game_map = game_map
+        self.npc_manager = npc_manager
+        self.save_file = save_file
+        self.map_file = game_map.json_file
+        self.journal_file = journal_file or save_file + ".journal"
+        self.interval = interval            # 자동 저장 간격 (게임 시간 ms)
+        self.compact_every = compact_every  # 저널을 전체 파일로 합치는 자동 저장 횟수
+        self.last_save_time = 0
+        self.saves_since_compact = 0
+        self.saved_map_versions = {}
+        self.last_player = None
+        self.saved_npcs = None  # 마지막으로 전체 기록한 NPC 리스트 (다시 대입되거나 길이가 바뀌면 전체 기록)
+        self.saved_npc_count = 0
+        self.npc_slots = {}  # id(NPC) -> 저장 데이터 npcs 안의 위치
+        self.closed = False
+        game_map.autosaver = self
+
+        self.tasks = queue.Queue()
+        self.worker = threading.Thread(target=self.run_worker, daemon=True)
+        self.worker.start()
+
+    @staticmethod
+    def recover(save_file="game_save.json", map_file="maps_data.json", journal_file=None):
+        """비정상 종료 후 남은 저널을 저장 파일에 반영 (게임 데이터를 불러오기 전에 호출)"""
+        journal_file = journal_file or save_file + ".journal"
+        entries = read_journal(journal_file)
+        if entries:
+            AutoSaver.compact_files(save_file, map_file, journal_file, entries)
+            print(f"자동 저장 기록 {len(entries)}개를 복구했습니다.")
+
+    @staticmethod
+    def compact_files(save_file, map_file, journal_file, entries):
+        save_data = load_json(save_file) or {"player": {}, "npcs": []}
+        maps_data = load_json(map_file)
+        apply_journal(save_data, maps_data, entries)
+        write_json_atomic(save_file, save_data)
+        if maps_data is not None:
+            # 저널에 타일 변경이 없고 컴파일된 파일이 최신이면 배치 구역은 기존 파일에서 복사
+            layout_changed = (any(entry["type"] == "tiles" for entry in entries)
+                              or not is_fresh(compiled_path(map_file), map_file))
+            write_json_atomic(map_file, maps_data)
+            refresh_compiled(map_file, maps_data, layout_changed)
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+
+    def snapshot(self):
+        """지난 자동 저장 이후 바뀐 상태만 저널 항목으로 복사 (메인 스레드에서 실행, JSON 변환은 작업 스레드에서)"""
+        entries = []
+        game_map = self.game_map
+        for map_index, tilemap in game_map.tilemaps.items():
+            if tilemap is None or not tilemap.changed_cells:
+                continue
+            if tilemap.streamed:  # 열린 맵은 아래에서 청크 단위로 기록
+                tilemap.changed_cells = set()
+                continue
+            cells = []
+            crops = []
+            for col, row in tilemap.changed_cells:
+                tile = tilemap.get_tile(col, row)
+                cells.append([col, row, tile.tile_type])
+                crop = [tile.planted_time, tile.growth_stage, tile.crop_type] if tile.planted_time is not None else None
+                crops.append([col, row, crop])
+            tilemap.changed_cells = set()
+            entries.append({"type": "tiles", "map": map_index, "cells": cells})
+            entries.append({"type": "crops", "map": map_index, "cells": crops})
+
+        for map_index, changes in game_map.pending_tile_changes.items():
+            cells = [[col, row, tile_type] for (col, row), tile_type in changes.items()]
+            crop_state = game_map.unloaded_crop_states.get(map_index, {})
+            crops = [[col, row, list(crop_state[(col, row)]) if (col, row) in crop_state else None] for col, row, _ in cells]
+            entries.append({"type": "tiles", "map": map_index, "cells": cells})
+            entries.append({"type": "crops", "map": map_index, "cells": crops})
+        game_map.pending_tile_changes = {}
+
+        for map_index, names in game_map.pending_chunk_changes.items():
+            tilemap = game_map.tilemaps.get(map_index)
+            if tilemap is not None and tilemap.streamed:
+                records = tilemap.journal_records(names)
+            else:
+                saved_chunks = game_map.maps[map_index].get("chunks", {})
+                records = {name: saved_chunks[name] for name in names if name in saved_chunks}
+            names.clear()  # StreamedTileMap과 공유하는 집합이므로 비우기만 함
+            if records:
+                entries.append({"type": "chunks", "map": map_index, "chunks": records})
+
+        for m in game_map.maps:
+            map_index = m["map_index"]
+            version = game_map.get_map_version(map_index)
+            if self.saved_map_versions.get(map_index, 0) != version:
+                self.saved_map_versions[map_index] = version
+                # 아이템 dict는 놓인 뒤 바뀌지 않으므로 리스트만 얕게 복사
+                entries.append({"type": "items", "map": map_index, "items": list(m["items"])})
+
+        player = SaveLoad.player_data(self.player, game_map)
+        if player != self.last_player:
+            self.last_player = player
+            entries.append({"type": "player", "player": player})
+        entries.append({"type": "world", "world": SaveLoad.world_data(self.last_save_time)})
+        entry = self.npc_entry()
+        if entry is not None:
+            entries.append(entry)
+        return entries
+
+    def npc_entry(self):
+        """움직인 NPC만 기록 (NPC 목록 자체가 바뀌었으면 전체 기록)"""
+        npc_manager = self.npc_manager
+        npcs = npc_manager.npcs
+        dirty = npc_manager.dirty_npcs
+        if npcs is not self.saved_npcs or len(npcs) != self.saved_npc_count:
+            self.saved_npcs = npcs
+            self.saved_npc_count = len(npcs)
+            self.npc_slots = {id(npc): i for i, npc in enumerate(npcs)}
+            dirty.clear()
+            return {"type": "npc_updates", "count": len(npcs),
+                    "npcs": [[i, SaveLoad.npc_record(npc)] for i, npc in enumerate(npcs)]}
+        if not dirty:
+            return None
+        changed = []
+        for npc_id in dirty:
+            slot = self.npc_slots.get(npc_id)
+            if slot is not None:
+                changed.append([slot, SaveLoad.npc_record(npcs[slot])])
+        dirty.clear()
+        changed.sort(key=lambda item: item[0])
+        return {"type": "npc_updates", "count": len(npcs), "npcs": changed} if changed else None
+
+    def update(self, game_time):
+        if self.closed or game_time - self.last_save_time < self.interval:
+            return
+        self.last_save_time = game_time
+        self.save()
+
+    def save(self):
+        if self.closed:  # close() 뒤에는 작업 스레드가 없으므로 전체 저장(Game.save)에 맡김
+            return
+        entries = self.snapshot()
+        if entries:
+            self.tasks.put(("append", entries))
+        self.saves_since_compact += 1
+        if self.saves_since_compact >= self.compact_every:
+            self.saves_since_compact = 0
+            self.tasks.put(("compact", None))
+
+    def run_worker(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            action, entries = task
+            try:
+                if action == "append":
+                    lines = [json.dumps(entry) for entry in entries]
+                    with open(self.journal_file, "a", encoding="utf-8") as file:
+                        file.write("\n".join(lines) + "\n")
+                        file.flush()
+                        os.fsync(file.fileno())
+                elif action == "compact":
+                    self.compact_in_process()
+            except OSError as e:
+                print("자동 저장 실패:", e)
+
+    def compact_in_process(self):
+        """별도 프로세스에서 저널을 합치고 끝날 때까지 기다림 (기다리는 동안 작업 스레드는 GIL을 놓음)"""
+        # spawn 방식이므로 실행 스크립트는 if __name__ == "__main__": 아래에서 게임을 시작해야 함
+        process = multiprocessing.get_context("spawn").Process(
+            target=compact_journal, args=(self.save_file, self.map_file, self.journal_file))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print("자동 저장 합치기 실패 (저널은 다음 합치기나 복구 때 반영):", process.exitcode)
+
+    def close(self):
+        """남은 작업을 모두 쓰고 작업 스레드 종료"""
+        if self.closed:
+            return
+        self.closed = True
+        # 저널에 쓰지 못한 변경은 이미 맵 데이터에 반영되어 있으므로 전체 저장(Game.save)에 맡김
+        self.game_map.autosaver = None
+        self.game_map.pending_tile_changes = {}
+        for names in self.game_map.pending_chunk_changes.values():
+            names.clear()
+        self.tasks.put(None)
+        self.worker.join()
+
+    def discard_journal(self):
+        """전체 저장이 끝난 뒤 호출: 저널 내용은 이미 파일에 반영됨"""
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
@@ -1,4 +1,9 @@
 import pygame
+from modules.text import text_renderer
+
+INVENTORY_BOX_WIDTH = 400
+INVENTORY_LINE_HEIGHT = 40  # 라인 높이 늘리기
+INVENTORY_PADDING = 10
 
 # Camera Class
 class Camera:
@@ -9,11 +14,16 @@ class Camera:
         self.camera_y = 0
         self.game_map = game_map
         self.screen = screen  # Screen 객체 추가
-        self.font = pygame.font.SysFont(None, 24)  # Font 초기화
+        self.font = text_renderer.get_font(None, 24, system=True)  # 공용 폰트 캐시 사용
         self.color = (0, 0, 0)
         self.show_inventory = False  # 인벤토리 표시 상태
         self.selected_item = None
         self.select_check = False
+        self.hud_values = None  # 마지막으로 렌더링한 (체력, 경험치, 레벨, 돈)
+        self.hud_surfaces = ()
+        self.dirty_rects = None  # dirty-rect 모드에서 이번 프레임에 그린 화면 영역 목록
+        self.inventory_panel = None  # 미리 그려둔 인벤토리 패널
+        self.inventory_panel_key = None
 
     def update(self, player):
         # Calculate the target position for the camera
@@ -42,6 +52,33 @@ class Camera:
         self.camera_x = max(0, min(self.camera_x, map_width - self.width))
         self.camera_y = max(0, min(self.camera_y, map_height - self.height))
 
+    def viewport(self, margin=0):
+        """화면에 보이는 월드 좌표 영역 (margin만큼 사방으로 넓힘)"""
+        # 카메라 좌표가 소수일 수 있으므로 1px 여유를 둠
+        return pygame.Rect(int(self.camera_x) - margin, int(self.camera_y) - margin,
+                           self.width + 1 + margin * 2, self.height + 1 + margin * 2)
+
+    def is_visible(self, rect, margin=0):
+        return self.viewport(margin).colliderect(rect)
+
+    def query(self, grid, margin=0):
+        """SpatialGrid 항목 중 화면(+margin)에 걸치는 것의 인덱스 (등록 순서)"""
+        view_rect = self.viewport(margin)
+        rects = grid.rects
+        return [i for i in grid.query(view_rect) if view_rect.colliderect(rects[i])]
+
+    def begin_dirty(self):
+        self.dirty_rects = []
+
+    def end_dirty(self):
+        rects, self.dirty_rects = self.dirty_rects, None
+        return rects
+
+    def mark_dirty(self, rect):
+        """그린 영역을 기록 (dirty-rect 모드가 아니면 무시)"""
+        if self.dirty_rects is not None and rect is not None:
+            self.dirty_rects.append(rect)
+
     def toggle_inventory(self, event):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_i:
             self.show_inventory = not self.show_inventory
@@ -50,58 +87,71 @@ class Camera:
             self.show_inventory = False
 
     def draw_ui(self, player):
-        health_text = self.font.render(f"Health: {player.health}", True, (0, 0, 0))
-        exp_text = self.font.render(f"Experience: {player.experience}", True, (0, 0, 0))
-        level_text = self.font.render(f"Level: {player.level}", True, (0, 0, 0))
-        money_text = self.font.render(f"Money: {player.money}", True, (0, 0, 0))
-        self.screen.blit(health_text, (10, 10))
-        self.screen.blit(level_text, (10, 25))
-        self.screen.blit(exp_text, (10, 40))
-        self.screen.blit(money_text, (10, 55))
-
+        hud_values = (player.health, player.experience, player.level, player.money)
+        if hud_values != self.hud_values:  # 값이 바뀐 경우에만 다시 렌더링
+            self.hud_values = hud_values
+            self.hud_surfaces = (
+                text_renderer.render(f"Health: {player.health}", (0, 0, 0), self.font),
+                text_renderer.render(f"Experience: {player.experience}", (0, 0, 0), self.font),
+                text_renderer.render(f"Level: {player.level}", (0, 0, 0), self.font),
+                text_renderer.render(f"Money: {player.money}", (0, 0, 0), self.font),
+            )
+        health_text, exp_text, level_text, money_text = self.hud_surfaces
+        self.mark_dirty(self.screen.blit(health_text, (10, 10)))
+        self.mark_dirty(self.screen.blit(level_text, (10, 25)))
+        self.mark_dirty(self.screen.blit(exp_text, (10, 40)))
+        self.mark_dirty(self.screen.blit(money_text, (10, 55)))
+
+
+    def get_inventory_panel(self, inventory):
+        """인벤토리 배경과 항목을 한 장에 그려두고 inventory.version이 바뀔 때만 다시 그림"""
+        key = (id(inventory), inventory.version)
+        if self.inventory_panel_key == key:
+            return self.inventory_panel
+        padding = INVENTORY_PADDING
+        line_height = INVENTORY_LINE_HEIGHT
+        inventory_height = len(inventory) * line_height + padding * 2
+        # 화면 아래로 넘어가는 항목은 그리지 않음 (항목이 많아도 그리는 양이 화면 크기로 제한됨)
+        panel = pygame.Surface((INVENTORY_BOX_WIDTH, max(1, min(inventory_height, self.height))))
+        panel.fill((200, 200, 200))
+        pygame.draw.rect(panel, (0, 0, 0), (0, 0, INVENTORY_BOX_WIDTH, inventory_height), 2)
+        visible_rows = min(len(inventory), -(-(panel.get_height() - padding) // line_height))
+        for i in range(visible_rows):
+            item = inventory.at(i)
+            if i == inventory.selected:  # 선택된 칸 표시
+                pygame.draw.rect(panel, (215, 215, 215), (padding, padding + i * line_height, INVENTORY_BOX_WIDTH - padding * 2, line_height))
+            panel.blit(text_renderer.render(f"{item.name}: {item.quantity}", (0, 0, 0), self.font),
+                       (padding, padding + i * line_height))
+        self.inventory_panel = panel
+        self.inventory_panel_key = key
+        return panel
 
     def draw_inventory(self, player):
         if self.show_inventory:
-            padding = 10
-            box_width = 400
-            line_height = 40  # 라인 높이 늘리기
-            inventory_height = len(player.inventory) * line_height + padding * 2
+            padding = INVENTORY_PADDING
+            line_height = INVENTORY_LINE_HEIGHT
             box_x = 400
             box_y = 0
+            inventory = player.inventory
+
+            # 배경 박스와 항목 (캐시된 패널)
+            self.mark_dirty(self.screen.blit(self.get_inventory_panel(inventory), (box_x, box_y)))
+
+            # 호버 효과 (마우스가 항목 위에 있을 때): 항목 위치는 마우스 좌표로 바로 계산
+            mouse_x, mouse_y = pygame.mouse.get_pos()
+            i = (mouse_y - box_y - padding) // line_height
+            item = inventory.at(i) if box_x + padding <= mouse_x < box_x + INVENTORY_BOX_WIDTH - padding else None
+            if item is not None:
+                item_rect = pygame.Rect(box_x + padding, box_y + padding + i * line_height, INVENTORY_BOX_WIDTH - padding * 2, line_height)
+                pygame.draw.rect(self.screen, (230, 230, 230), item_rect)  # 호버 색상
+                self.screen.blit(text_renderer.render(f"{item.name}: {item.quantity}", (0, 0, 0), self.font), item_rect.topleft)
+                if player.state == "selling":
+                    price_text = text_renderer.render(f"${item.price}", (0, 0, 0), self.font)
+                    self.mark_dirty(self.screen.blit(price_text, (mouse_x + 10, mouse_y - 10)))
+
+                if pygame.mouse.get_pressed()[0] == 1:  # 클릭 시
+                    self.selected_item = item.id  # 선택된 아이템 ID 추적
 
-            # 배경 박스 그리기
-            pygame.draw.rect(self.screen, (200, 200, 200), (box_x, box_y, box_width, inventory_height))
-            pygame.draw.rect(self.screen, (0, 0, 0), (box_x, box_y, box_width, inventory_height), 2)
-
-            # 인벤토리 항목 렌더링
-            for i, item in enumerate(player.inventory):
-                item_name = item["name"]
-                item_quantity = item["quantity"]
-                item_price = item["price"]
-
-                # 아이템 항목 영역 계산
-                item_rect = pygame.Rect(box_x + padding, box_y + padding + i * line_height, box_width - padding * 2, line_height)
-
-                # 호버 효과 (마우스가 항목 위에 있을 때)
-                if item_rect.collidepoint(pygame.mouse.get_pos()):
-                    pygame.draw.rect(self.screen, (230, 230, 230), item_rect)  # 호버 색상
-                    price_text = self.font.render(f"${item_price}", True, (0, 0, 0)) 
-                    if player.state == "selling":
-                        price_x, price_y = pygame.mouse.get_pos()
-                        self.screen.blit(price_text,(price_x + 10,price_y - 10))
-
-                    if pygame.mouse.get_pressed()[0] == 1:  # 클릭 시
-                        self.selected_item = item["id"]  # 선택된 아이템 인덱스 추적
-                        
-
-                # 텍스트 렌더링
-                inventory_text = self.font.render(f"{item_name}: {item_quantity}", True, (0, 0, 0))
-                text_x = box_x + padding
-                text_y = box_y + padding + i * line_height
-
-                # 텍스트 그리기
-                self.screen.blit(inventory_text, (text_x, text_y))
-                
     def select_item(self):
         return self.selected_item
     
@@ -117,7 +167,7 @@ class Camera:
 
             # 아이템 ID 텍스트 렌더링
             item_id = self.player.hand["id"]
-            text_surface = self.font.render(f"Item: {item_id}", True, (0, 0, 0))  # 아이템 ID 표시
+            text_surface = text_renderer.render(f"Item: {item_id}", (0, 0, 0), self.font)  # 아이템 ID 표시
             text_x = box_x + (self.width - text_surface.get_width()) // 2  # 텍스트 중앙 정렬
             text_y = box_y + (self.height - text_surface.get_height()) // 2
             screen.blit(text_surface, (text_x, text_y))
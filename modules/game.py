@@ -0,0 +1,263 @@
+import os
+import random
+import time
+import pygame
+from modules.player import Player, SpriteSheet
+from modules.map import Map
+from modules.camera import Camera
+from modules.save import SaveLoad
+from modules.map import SeedManager
+from modules.player import CollisionManager
+from modules.npc import NPCManager
+from modules.pathfinding import Pathfinder
+from modules.world_sim import WorldSimulator
+from modules.profiler import FrameProfiler
+from modules.autosave import AutoSaver
+
+####################################
+# 입력 상태
+####################################
+class PressedKeys:
+    """pygame.key.get_pressed()처럼 keys[pygame.K_w] 형태로 조회되는 가상 키 상태"""
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class Inputs:
+    """한 프레임 동안의 이벤트 목록과 눌린 키 상태"""
+    def __init__(self, events=None, keys=None):
+        self.events = events if events is not None else []
+        self.keys = keys if keys is not None else PressedKeys()
+
+    @classmethod
+    def from_pygame(cls):
+        return cls(pygame.event.get(), pygame.key.get_pressed())
+
+####################################
+# 게임 클래스
+####################################
+class Game:
+    """게임 상태와 루프를 담는 객체. step()으로 로직을, render()로 그리기를 각각 실행"""
+    def __init__(self, screen_width=800, screen_height=600, seed=None, headless=False,
+                 map_file="maps_data.json", save_file="game_save.json", load_save=True,
+                 profile=False, trace_file="trace.json", dirty_rects=False,
+                 autosave=None, autosave_interval=60000, offscreen_workers=None, offscreen_interval=1000,
+                 offline_growth=None, sleep_duration=8 * 60 * 60 * 1000):
+        # 창 없이 돌리거나 시드를 고정한 실행은 같은 입력이면 같은 결과가 나오도록
+        # 자동 저장 스레드, 화면 밖 작업 프로세스, 실제 시간 기반 오프라인 성장을 기본으로 끔 (직접 켜면 사용)
+        deterministic = headless or seed is not None
+        if autosave is None:
+            autosave = not deterministic
+        if offscreen_workers is None:
+            offscreen_workers = 0 if deterministic else 1
+        if offline_growth is None:
+            offline_growth = not deterministic
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"  # 창 없이 실행 (CI, 프로파일링용)
+        pygame.init()
+
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.screen = pygame.display.set_mode((screen_width, screen_height))
+        pygame.display.set_caption("게임 타이틀")
+
+        self.save_file = save_file
+        self.clock = pygame.time.Clock()
+        self.running = True
+        self.game_time = 0
+        self.sleep_duration = sleep_duration  # F5(잠자기)로 건너뛰는 게임 시간 (ms)
+        self.rng = random.Random(seed)
+        self.profiler = FrameProfiler(enabled=profile)  # F3: 오버레이 토글, F4: 트레이스 저장
+        self.trace_file = trace_file
+        self.dirty_rects = dirty_rects  # True면 바뀐 영역만 화면에 반영
+        self.background = None  # dirty-rect 모드에서 재사용하는 배경 레이어
+        self.background_key = None
+        self.previous_rects = []
+
+        # 이전 실행이 비정상 종료되었다면 자동 저장 저널부터 복구
+        if autosave:
+            AutoSaver.recover(save_file, map_file)
+
+        # 스프라이트 시트 로드
+        sprite_sheet = SpriteSheet("data/ditto.png")
+
+        # 객체 생성
+        self.player = Player(100, 100, 40, 5, sprite_sheet)
+        self.game_map = Map(map_file, time_source=self.get_game_time)  # 청크 생성 프로세스는 열린 맵에 처음 들어갈 때 띄움
+        self.npc_manager = NPCManager(Pathfinder(self.game_map))
+        self.camera = Camera(screen_width, screen_height, self.game_map, self.screen)
+        self.seed_manager = SeedManager(self.game_map, rng=self.rng, time_source=self.get_game_time)
+        self.collision_manager = CollisionManager(self.game_map)
+
+        # 저장된 데이터 로드
+        if load_save:
+            world = SaveLoad.load_game(self.player, self.game_map, self.npc_manager, save_file)
+            if world:
+                # 저장 당시 게임 시계에서 이어가고, 꺼져 있던 동안의 실제 시간만큼 작물을 한 번에 진행
+                self.game_time = world["time"]
+                if offline_growth:
+                    self.game_time += max(0, int((time.time() - world["saved_at"]) * 1000))
+                self.game_map.advance_crops(self.game_time)
+
+        self.autosaver = None
+        if autosave:
+            self.autosaver = AutoSaver(self.player, self.game_map, self.npc_manager, save_file,
+                                       interval=autosave_interval)
+            self.autosaver.last_save_time = self.game_time
+
+        # 화면 밖 맵은 작업 프로세스에서 offscreen_interval마다 진행 (0이면 사용 안 함)
+        self.simulator = None
+        if offscreen_workers:
+            self.simulator = WorldSimulator(self.game_map, self.npc_manager, self.seed_manager,
+                                            tick_interval=offscreen_interval, workers=offscreen_workers,
+                                            seed=self.rng.random())
+
+    def get_game_time(self):
+        return self.game_time
+
+    def skip_time(self, duration):
+        """duration(ms)만큼 게임 시간을 건너뜀 (작물은 프레임 단위 진행 없이 한 번에 계산)"""
+        if self.simulator:
+            self.simulator.skip()  # 진행 중인 화면 밖 맵 결과부터 반영
+        self.game_time += duration
+        self.game_map.advance_crops(self.game_time)
+        print(f"{duration // 1000}초가 지났습니다.")
+
+    def step(self, dt, inputs):
+        """dt(ms)만큼 게임 로직을 진행"""
+        self.game_time += dt  # 게임 전체의 누적 시간을 업데이트
+        player = self.player
+        game_map = self.game_map
+        profiler = self.profiler
+
+        with profiler.scope("events"):
+            for event in inputs.events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_e:  # 'E' 키를 눌러 작물 수확 및 상호작용
+                        player.plant(event, game_map, self.game_time) # 작물 심기
+                        game_map.harvest_crop(player, player.x, player.y)
+                        player.use_item(event)
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
+                    elif event.key == pygame.K_F4:
+                        profiler.export_chrome_trace(self.trace_file)
+                    elif event.key == pygame.K_F5:  # 잠자기: 시간 건너뛰기
+                        self.skip_time(self.sleep_duration)
+                    elif pygame.K_1 <= event.key <= pygame.K_9:  # 숫자 키로 인벤토리 칸 선택
+                        player.inventory.select(event.key - pygame.K_1)
+                self.camera.toggle_inventory(event)  # 인벤토리 토글
+                player.interact_with_npcs(event, self.npc_manager, self.camera)
+
+        last_event = inputs.events[-1] if inputs.events else None
+        with profiler.scope("player.move"):
+            player.move(inputs.keys, game_map, self.collision_manager, dt, self.npc_manager, self.camera, last_event)
+
+        with profiler.scope("camera.update"):
+            self.camera.update(player)
+        with profiler.scope("world_stream"):
+            game_map.update_streaming(self.camera)
+        with profiler.scope("npc_manager.update"):
+            self.npc_manager.update(game_map, self.camera, dt)
+        with profiler.scope("update_crop"):
+            game_map.update_crop(self.game_time)
+        with profiler.scope("seed_manager.update"):
+            self.seed_manager.update(game_map.get_current_map())
+        if self.simulator:
+            with profiler.scope("world_sim"):
+                self.simulator.update(self.game_time)
+        if self.autosaver:
+            with profiler.scope("autosave"):
+                self.autosaver.update(self.game_time)
+
+    def render(self):
+        if self.dirty_rects:
+            self.render_dirty()
+            return
+        profiler = self.profiler
+        self.screen.fill((0, 0, 0))
+        with profiler.scope("game_map.draw"):
+            self.game_map.draw(self.screen, self.camera, self.seed_manager)
+        self.draw_foreground()
+        with profiler.scope("display.flip"):
+            pygame.display.flip()
+
+    def render_dirty(self):
+        """배경은 카메라/타일이 바뀔 때만 다시 그리고, 그 외에는 바뀐 영역만 화면에 반영"""
+        profiler = self.profiler
+        background_key = self.game_map.background_key(self.camera)
+        full_redraw = background_key != self.background_key or self.background is None
+        with profiler.scope("game_map.draw"):
+            if full_redraw:
+                self.screen.fill((0, 0, 0))
+                self.game_map.draw_background(self.screen, self.camera)
+                # 스크롤 중에는 복사하지 않고, 카메라가 멈춘 다음 프레임에 배경을 저장
+                self.background = self.screen.copy() if background_key == self.background_key else None
+                self.background_key = background_key
+            else:
+                for rect in self.previous_rects:
+                    self.screen.blit(self.background, rect, rect)  # 이전 프레임 스프라이트 지우기
+
+        self.camera.begin_dirty()
+        with profiler.scope("game_map.draw"):
+            self.game_map.draw_items(self.screen, self.camera, self.seed_manager)
+        self.draw_foreground()
+        rects = self.camera.end_dirty()
+
+        with profiler.scope("display.flip"):
+            if full_redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.previous_rects + rects)
+        self.previous_rects = rects
+
+    def draw_foreground(self):
+        profiler = self.profiler
+        with profiler.scope("player.draw"):
+            self.player.draw(self.screen, self.camera)
+
+        with profiler.scope("npc_manager.draw"):
+            self.npc_manager.draw(self.screen, self.camera)
+
+        # UI 표시 (체력, 경험치, 돈, 인벤토리 등)
+        with profiler.scope("camera.draw_ui"):
+            self.camera.draw_ui(self.player)
+        with profiler.scope("camera.draw_inventory"):
+            self.camera.draw_inventory(self.player)
+
+        self.camera.mark_dirty(profiler.draw_overlay(self.screen))
+
+    def tick(self, dt, inputs):
+        """한 프레임 (로직 + 그리기) 실행"""
+        self.profiler.begin_frame()
+        self.step(dt, inputs)
+        self.render()
+        self.profiler.end_frame()
+
+    def run(self, fps=60, fixed_dt=None, max_frames=None):
+        """메인 루프. fixed_dt를 주면 실제 시간 대신 고정 간격으로 진행"""
+        frames = 0
+        while self.running and (max_frames is None or frames < max_frames):
+            dt = self.clock.tick(fps) if fixed_dt is None else fixed_dt  # 프레임별 경과 시간 (밀리초)
+            self.tick(dt, Inputs.from_pygame())
+            frames += 1
+
+    def save(self):
+        if self.simulator:
+            self.simulator.sync()  # 진행 중인 화면 밖 맵 결과부터 반영
+        if self.autosaver:
+            self.autosaver.close()  # 진행 중인 자동 저장을 마친 뒤 전체 저장
+        SaveLoad.save_game(self.player, self.game_map, self.npc_manager, self.save_file, self.game_time)
+        self.game_map.save_maps()
+        if self.autosaver:
+            self.autosaver.discard_journal()
+
+    def quit(self):
+        if self.simulator:
+            self.simulator.close()
+        self.game_map.close()
+        pygame.quit()
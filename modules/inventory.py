@@ -0,0 +1,106 @@
+####################################
+# 플레이어 인벤토리
+####################################
+STACK_KEYS = ("id", "type", "name", "quantity", "price")
+
+
+class ItemStack:
+    """같은 ID 아이템 묶음 (저장 파일의 인벤토리 항목 하나)"""
+    __slots__ = ("id", "type", "name", "quantity", "price", "extra")
+
+    def __init__(self, item_id, item_type=None, name=None, quantity=0, price=0, extra=None):
+        self.id = item_id
+        self.type = item_type
+        self.name = name if name is not None else str(item_type)
+        self.quantity = quantity
+        self.price = price
+        self.extra = extra  # 저장 파일에 있던 그 밖의 키 (그대로 다시 저장)
+
+    def to_dict(self):
+        data = {"id": self.id, "type": self.type, "name": self.name, "quantity": self.quantity, "price": self.price}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {key: value for key, value in data.items() if key not in STACK_KEYS}
+        return cls(data["id"], data.get("type"), data.get("name"), data.get("quantity", 0),
+                   data.get("price", 0), extra or None)
+
+
+class Inventory:
+    """아이템 ID로 바로 찾는 묶음 목록 (표시 순서는 추가된 순서), 바뀔 때마다 version 증가"""
+    def __init__(self, items=()):
+        self.stacks = []  # 표시 순서
+        self.slots = {}   # 아이템 ID -> stacks 안의 위치
+        self.selected = 0  # 선택된 칸 (심기/손에 들기에 사용)
+        self.version = 0   # UI 캐시 무효화 기준
+        self.load(items)
+
+    def __len__(self):
+        return len(self.stacks)
+
+    def __iter__(self):
+        return iter(self.stacks)
+
+    def __contains__(self, item_id):
+        return item_id in self.slots
+
+    def load(self, items):
+        """저장 파일 형식(dict 목록)에서 내용을 교체"""
+        self.stacks = [ItemStack.from_dict(item) for item in items]
+        self.slots = {stack.id: slot for slot, stack in enumerate(self.stacks)}
+        self.selected = 0
+        self.version += 1
+
+    def to_data(self):
+        return [stack.to_dict() for stack in self.stacks]
+
+    def get(self, item_id):
+        slot = self.slots.get(item_id)
+        return self.stacks[slot] if slot is not None else None
+
+    def at(self, slot):
+        return self.stacks[slot] if 0 <= slot < len(self.stacks) else None
+
+    def quantity(self, item_id):
+        stack = self.get(item_id)
+        return stack.quantity if stack else 0
+
+    def add(self, item_id, quantity=1, item_type=None, name=None, price=0):
+        """quantity개 추가 (처음 보는 ID면 맨 뒤에 새 칸을 만듦), 해당 묶음 반환"""
+        stack = self.get(item_id)
+        if stack is None:
+            stack = ItemStack(item_id, item_type, name, 0, price)
+            self.slots[item_id] = len(self.stacks)
+            self.stacks.append(stack)
+        stack.quantity += quantity
+        self.version += 1
+        return stack
+
+    def remove(self, item_id, quantity=1):
+        """quantity개를 뺌 (모자라면 아무것도 바꾸지 않고 False), 빈 칸은 표시용으로 남김"""
+        stack = self.get(item_id)
+        if stack is None or stack.quantity < quantity:
+            return False
+        stack.quantity -= quantity
+        self.version += 1
+        return True
+
+    def transfer(self, other, item_id, quantity=1):
+        """다른 인벤토리로 최대 quantity개를 옮기고 옮긴 개수 반환"""
+        stack = self.get(item_id)
+        moved = min(quantity, stack.quantity) if stack else 0
+        if moved > 0:
+            self.remove(item_id, moved)
+            other.add(item_id, moved, stack.type, stack.name, stack.price)
+        return moved
+
+    def select(self, slot):
+        if 0 <= slot < len(self.stacks) and slot != self.selected:
+            self.selected = slot
+            self.version += 1
+
+    def selected_stack(self):
+        return self.at(self.selected)
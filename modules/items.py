@@ -0,0 +1,137 @@
+import pygame
+
+####################################
+# 맵별 월드 아이템 저장소
+####################################
+def item_rect(item):
+    item_width = 40  # 기본 아이템 크기 (40x40 크기 아이템 가정)
+    return pygame.Rect(
+        item["position"][0] - 20,  # 아이템의 x 좌표
+        item["position"][1],        # 아이템의 y 좌표
+        item_width + 20,            # 아이템의 너비
+        item_width                  # 아이템의 높이
+    )
+
+
+class ItemStore:
+    """맵 데이터의 items 리스트를 그대로 감싸 ID 조회, O(1) 제거, 격자 기반 충돌/화면 조회를 제공
+
+    제거할 때 마지막 아이템을 빈자리로 옮기므로 items 리스트(저장 파일)의 순서는 놓인 순서와 달라질 수 있음.
+    "먼저 놓인" 순서는 이 저장소가 색인한 순서(아이템 ID)이며, 다시 불러오면 리스트 순서로 새로 매겨짐.
+    """
+    def __init__(self, items, cell_size=128, draw_margin=64):
+        self.items = items          # 맵 데이터의 리스트 (저장 시 그대로 직렬화)
+        self.cell_size = cell_size
+        self.draw_margin = draw_margin  # 아이템 이미지가 위치 기준으로 차지할 수 있는 최대 크기
+        self.next_id = 0
+        self.ids = []               # items와 같은 순서의 아이템 ID
+        self.slots = {}             # 아이템 ID -> items 안의 위치
+        self.object_ids = {}        # id(아이템 dict) -> 아이템 ID
+        self.cells = {}             # (cell_x, cell_y) -> {아이템 ID, ...}
+        self.type_counts = {}
+        for item in items:
+            self.index(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def cell_of(self, item):
+        return (int(item["position"][0]) // self.cell_size, int(item["position"][1]) // self.cell_size)
+
+    def index(self, item):
+        item_id = self.next_id
+        self.next_id += 1
+        self.slots[item_id] = len(self.ids)
+        self.ids.append(item_id)
+        self.object_ids[id(item)] = item_id
+        self.cells.setdefault(self.cell_of(item), set()).add(item_id)
+        self.type_counts[item["type"]] = self.type_counts.get(item["type"], 0) + 1
+        return item_id
+
+    def add(self, item):
+        """아이템을 추가하고 ID 반환"""
+        self.items.append(item)
+        return self.index(item)
+
+    def get(self, item_id):
+        slot = self.slots.get(item_id)
+        return self.items[slot] if slot is not None else None
+
+    def id_of(self, item):
+        return self.object_ids.get(id(item))
+
+    def remove(self, item):
+        """아이템 제거 (마지막 아이템을 빈자리로 옮겨 O(1), items 순서가 바뀜), 없는 아이템이면 False"""
+        item_id = self.object_ids.get(id(item))
+        if item_id is None:
+            return False
+        self.remove_id(item_id)
+        return True
+
+    def remove_id(self, item_id):
+        slot = self.slots.pop(item_id)
+        item = self.items[slot]
+        last_id = self.ids[-1]
+        self.items[slot] = self.items[-1]
+        self.ids[slot] = last_id
+        if last_id != item_id:
+            self.slots[last_id] = slot
+        self.items.pop()
+        self.ids.pop()
+
+        del self.object_ids[id(item)]
+        cell = self.cells[self.cell_of(item)]
+        cell.discard(item_id)
+        if not cell:
+            del self.cells[self.cell_of(item)]
+        self.type_counts[item["type"]] -= 1
+        return item
+
+    def count(self, item_type):
+        return self.type_counts.get(item_type, 0)
+
+    def ids_in(self, rect, margin=0):
+        """rect 근처 셀에 위치한 아이템 ID (margin만큼 위/왼쪽으로 넓혀 조회)"""
+        cell_size = self.cell_size
+        x0 = (rect.left - margin) // cell_size
+        x1 = (rect.right - 1) // cell_size
+        y0 = (rect.top - margin) // cell_size
+        y1 = (rect.bottom - 1) // cell_size
+        found = []
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # 조회 범위의 셀 수가 아이템이 있는 셀 수보다 많으면 있는 셀만 돌며 범위 안인지 확인
+            for (cell_x, cell_y), ids in self.cells.items():
+                if x0 <= cell_x <= x1 and y0 <= cell_y <= y1:
+                    found.extend(ids)
+            return found
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                found.extend(self.cells.get((cell_x, cell_y), ()))
+        return found
+
+    def first_collision(self, rect):
+        """rect와 줍기 영역이 겹치는 아이템 중 가장 먼저 놓인 것 (없으면 None)"""
+        # 줍기 영역은 위치 기준 왼쪽 20px, 오른쪽 40px, 아래 40px까지
+        search = pygame.Rect(rect.left - 40, rect.top - 40, rect.width + 60, rect.height + 40)
+        best_id = None
+        for item_id in self.ids_in(search):
+            if (best_id is None or item_id < best_id) and rect.colliderect(item_rect(self.get(item_id))):
+                best_id = item_id
+        return self.get(best_id) if best_id is not None else None
+
+    def visible(self, view_rect):
+        """화면 영역에 걸칠 수 있는 아이템 (놓인 순서대로)"""
+        ids = self.ids_in(view_rect, self.draw_margin)
+        ids.sort()
+        left = view_rect.left - self.draw_margin
+        top = view_rect.top - self.draw_margin
+        visible = []
+        for item_id in ids:
+            item = self.get(item_id)
+            x, y = item["position"]
+            if left <= x < view_rect.right and top <= y < view_rect.bottom:
+                visible.append(item)
+        return visible
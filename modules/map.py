@@ -1,34 +1,102 @@
 import pygame
 import random
 import json
+import heapq
+import itertools
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from modules.save import write_json_atomic
+from modules.assets import assets
+from modules.spatial import FreeSpaceSampler, SpatialGrid, rect_from_dict, zone_rect
+from modules.items import ItemStore
+from modules.map_binary import CompiledMaps, TileRows, compiled_path, is_fresh, plain_maps, refresh_compiled
 
 seed_path = "data/ditto.png"
 shop_path = "data/shop.png"
 
+CHUNK_SIZE = 8          # 청크 한 변의 타일 수
+MAX_CACHED_CHUNKS = 64  # 캐시에 유지할 청크 서피스 최대 개수
+OPEN_MAP_SIZE = 10000000           # 열린 맵 한 변 (px), 사실상 끝없이 걸을 수 있는 크기
+OPEN_MAP_START = [5000000, 5000000]  # 열린 맵 도착 지점 (가운데)
+
+# 작물 정의: 단계별 성장 시간(ms). 단계 수 = len(stage_durations) + 1, 마지막 단계가 수확 가능
+CROP_TYPES = {
+    "default": {"stage_durations": [5000, 5000]},
+    "Corn Seed": {"stage_durations": [5000, 5000]},
+    "apple Seed": {"stage_durations": [5000, 5000]},
+    "carrot Seed": {"stage_durations": [5000, 5000]},
+}
+
+def get_crop_definition(crop_type):
+    return CROP_TYPES.get(crop_type, CROP_TYPES["default"])
+
+def crop_stage_at(crop_type, planted_time, growth_stage, current_game_time):
+    """current_game_time 시점의 성장 단계 (단계는 줄어들지 않음)"""
+    elapsed = current_game_time - planted_time
+    threshold = 0
+    for stage, duration in enumerate(get_crop_definition(crop_type)["stage_durations"], 1):
+        threshold += duration
+        if elapsed < threshold:
+            break
+        growth_stage = max(growth_stage, stage)
+    return growth_stage
+
+def crop_rows(state):
+    """작물 상태 dict를 맵 데이터에 저장하는 [col, row, planted_time, growth_stage, crop_type] 목록으로 변환"""
+    return [
+        [col, row, planted_time, growth_stage, crop_type]
+        for (col, row), (planted_time, growth_stage, crop_type) in sorted(state.items())
+    ]
+
+def saved_map(map_data):
+    """저장할 맵 데이터 (열린 맵은 불러온 청크의 장애물/아이템을 뺌, 청크를 불러올 때 생성/청크 기록으로 다시 추가됨)"""
+    if not map_data.get("generator"):
+        return map_data
+    return dict(map_data,
+                obstacles=[o for o in map_data["obstacles"] if "chunk" not in o],
+                items=[item for item in map_data["items"] if "chunk" not in item])
+
+
+def make_seed_item(map_index, seed_position, rng):
+    seed_id = rng.choices([0, 1, 2], weights=[0.6, 0.3, 0.1])[0]
+    return {
+        "map_index": map_index,
+        "position": seed_position,
+        "type": "seed",
+        "id": seed_id,
+    }
+
+TILE_COLORS = {
+    'grass': (34, 139, 34),
+    'stone': (169, 169, 169),
+    'water': (0, 0, 255),
+    'soil': (139, 69, 19),
+    'planted soil': (139, 69, 19),
+}
+UNKNOWN_TILE_COLOR = (255, 255, 255)
+CROP_COLOR_GROWING = (255, 165, 0)
+CROP_COLOR_MATURE = (0, 255, 0)
+
 ####################################
 # 타일 클래스
 ####################################
 class Tile:
-    def __init__(self, x, y, tile_type, tile_size):
+    def __init__(self, x, y, tile_type, tile_size, current_time=None):
         self.x = x
         self.y = y
         self.tile_type = tile_type
         self.tile_size = tile_size
         self.walkable = tile_type not in ['water']
         self.rect = pygame.Rect(x, y, tile_size, tile_size)
-        self.planted_time = pygame.time.get_ticks() if tile_type == "planted soil" else None
+        if current_time is None:
+            current_time = pygame.time.get_ticks()
+        self.planted_time = current_time if tile_type == "planted soil" else None  # 게임 시계 기준 (TileMap이 넘겨줌)
         self.growth_stage = 0
         self.crop_type = 1 if tile_type == "planted soil" else None
 
     def draw(self, screen, tile_size, camera_x, camera_y):
-        types = {
-            'grass': (34, 139, 34),
-            'stone': (169, 169, 169),
-            'water': (0, 0, 255),
-            'soil': (139, 69, 19),
-            'planted soil': (139, 69, 19),
-        }
-        color = types.get(self.tile_type, (255, 255, 255))
+        color = TILE_COLORS.get(self.tile_type, UNKNOWN_TILE_COLOR)
         pygame.draw.rect(
             screen,
             color,
@@ -37,7 +105,7 @@ class Tile:
 
         # 작물이 심어진 경우
         if self.tile_type == 'planted soil' and self.crop_type:
-            crop_color = (0, 255, 0) if self.growth_stage == 2 else (255, 165, 0)
+            crop_color = CROP_COLOR_MATURE if self.is_mature() else CROP_COLOR_GROWING
             pygame.draw.circle(
                 screen,
                 crop_color,
@@ -45,17 +113,30 @@ class Tile:
                 tile_size // 4
             )
 
+    def max_stage(self):
+        return len(get_crop_definition(self.crop_type)["stage_durations"])
+
+    def is_mature(self):
+        return self.growth_stage >= self.max_stage()
+
+    def next_stage_time(self):
+        """다음 성장 단계로 넘어가는 절대 시간 (성장 중이 아니면 None)"""
+        if self.tile_type != 'planted soil' or not self.crop_type or self.planted_time is None:
+            return None
+        durations = get_crop_definition(self.crop_type)["stage_durations"]
+        if self.growth_stage >= len(durations):
+            return None
+        return self.planted_time + sum(durations[:self.growth_stage + 1])
+
     def update_growth(self, current_game_time):
-        """절대 시간 기반으로 성장 단계 업데이트"""
+        """절대 시간 기반으로 성장 단계 업데이트 (단계가 바뀌면 True 반환)"""
+        previous_stage = self.growth_stage
         if self.tile_type == 'planted soil' and self.crop_type and self.planted_time is not None:
-            elapsed = current_game_time - self.planted_time
-            if elapsed >= 10000:  # 10초 이상 경과 시
-                self.growth_stage = 2  # 완전히 성장
-            elif elapsed >= 5000:  # 5초 이상 경과 시
-                self.growth_stage = 1  # 중간 성장 단계
+            self.growth_stage = crop_stage_at(self.crop_type, self.planted_time, self.growth_stage, current_game_time)
+        return self.growth_stage != previous_stage
 
     def harvest(self):
-        if self.tile_type == 'planted soil' and self.growth_stage == 2:
+        if self.tile_type == 'planted soil' and self.is_mature():
             self.tile_type = 'soil'
             self.planted_time = None
             self.growth_stage = 0
@@ -63,6 +144,10 @@ class Tile:
             return True
         return False
     
+    def refresh_walkable(self):
+        """tile_type을 바꾼 뒤 통행 여부를 다시 계산"""
+        self.walkable = self.tile_type not in ['water']
+
     def update_position(self, new_x, new_y):
         self.x = new_x
         self.y = new_y
@@ -71,87 +156,483 @@ class Tile:
 ####################################
 # 타일맵 클래스
 ####################################
+def find_cells(data, tile_types):
+    """타일 행 목록에서 tile_types 중 하나인 칸의 (열, 행) 목록 (컴파일된 맵은 코드 격자에서 바로 찾음)"""
+    if isinstance(data, TileRows):
+        return data.find_cells(tile_types)
+    return [(col, row) for row, tile_types_in_row in enumerate(data)
+            for col, tile_type in enumerate(tile_types_in_row) if tile_type in tile_types]
+
+
+class TileGrid:
+    """grid[row][col] -> Tile 로 쓰는 행 목록 (행의 Tile 객체는 처음 접근할 때 맵 데이터에서 만듦)"""
+    def __init__(self, tilemap, data):
+        self.tilemap = tilemap
+        self.data = data  # 맵 데이터의 tilemap (컴파일된 맵이면 mmap 위의 TileRows)
+        self.rows = [None] * len(data)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self.rows)))]
+        if index < 0:
+            index += len(self.rows)
+        row = self.rows[index]
+        if row is None:
+            row = self.tilemap.make_row(index, self.data[index])
+            self.rows[index] = row
+        return row
+
+    def __iter__(self):
+        for row in range(len(self.rows)):
+            yield self[row]
+
+    def decoded_types(self):
+        """만든 행의 (행 번호, 타일 종류 목록) (만들지 않은 행은 맵 데이터와 같으므로 생략)"""
+        return [(row_idx, [tile.tile_type for tile in row]) for row_idx, row in enumerate(self.rows) if row is not None]
+
+
 class TileMap:
-    def __init__(self, map_width, map_height, tile_size=50):
+    vectorized_growth = False  # True면 GrowthScheduler 대신 update_growth()로 일괄 성장
+    streamed = False  # True면 청크 단위로 생성/언로드되는 열린 맵 (modules.world_gen)
+
+    def __init__(self, map_width, map_height, tile_size=50, time_source=None):
         self.map_width = map_width
         self.map_height = map_height
         self.tile_size = tile_size
-        self.tiles = []
+        self.time_source = time_source or pygame.time.get_ticks  # 미리 심어진 작물의 심은 시간 (게임 시계)
+        self.grid = TileGrid(self, [])  # grid[row][col] -> Tile (열/행 기반 공간 인덱스)
         self.obstacles = []
+        self.blocked_rects = {}  # (col, row) -> 아직 만들지 않은 행의 통행 불가 타일 Rect (obstacles와 같은 객체)
+        self.generated_time = None  # generate 시점의 게임 시간 (미리 심어진 작물의 심은 시간)
+        self.chunk_surfaces = {}  # (chunk_col, chunk_row) -> 미리 그려둔 pygame.Surface
+        self.version = 0  # 타일이 바뀔 때마다 증가 (화면 배경 캐시 무효화 기준)
+        self.changed_cells = set()  # 마지막 자동 저장 이후 바뀐 (col, row)
+        self.layout_version = 0  # 타일 종류/배치가 바뀔 때 증가 (길찾기 격자 무효화 기준)
+        self.planted = set()  # 작물이 심어진 타일 (작물 상태 저장/성장 예약이 전체 타일을 돌지 않도록)
+        self.scheduled = True  # False면 언로드된 TileMap (성장 큐에 남은 항목은 꺼낼 때 버림)
 
     def generate(self, data):
-        self.tiles = []     # 이전 타일 초기화
-        self.obstacles = [] # 이전 장애물 초기화
-        for row_idx, row in enumerate(data):
-            for col_idx, tile_type in enumerate(row):
-                x = col_idx * self.tile_size
-                y = row_idx * self.tile_size
-                tile = Tile(x, y, tile_type, self.tile_size)
-                self.tiles.append(tile)
-                if not tile.walkable:
-                    self.obstacles.append(tile.rect)
+        """타일 행은 처음 접근할 때 만듦 (통행 불가 칸의 충돌 Rect와 작물이 심어진 행만 미리 준비)"""
+        self.grid = TileGrid(self, data)
+        self.obstacles = []
+        self.blocked_rects = {}
+        self.chunk_surfaces = {}
+        self.planted = set()
+        self.generated_time = self.time_source()
+        for col_idx, row_idx in find_cells(data, ['water']):
+            rect = pygame.Rect(col_idx * self.tile_size, row_idx * self.tile_size, self.tile_size, self.tile_size)
+            self.obstacles.append(rect)
+            self.blocked_rects[(col_idx, row_idx)] = rect
+        # 작물 색인(planted)과 성장 예약은 전체 목록이 필요하므로 심어진 행은 바로 만듦
+        for row_idx in sorted({row_idx for _, row_idx in find_cells(data, ['planted soil'])}):
+            self.grid[row_idx]
+
+    def make_row(self, row_idx, tile_types):
+        """맵 데이터의 한 행으로 Tile 객체 행을 만듦 (TileGrid가 처음 접근할 때 호출)"""
+        y = row_idx * self.tile_size
+        row = []
+        for col_idx, tile_type in enumerate(tile_types):
+            tile = Tile(col_idx * self.tile_size, y, tile_type, self.tile_size, self.generated_time)
+            rect = self.blocked_rects.pop((col_idx, row_idx), None)
+            if rect is not None:
+                tile.rect = rect  # 충돌 목록의 Rect를 공유 (타일을 옮기거나 종류를 바꿀 때 함께 반영)
+            if tile.planted_time is not None:
+                self.planted.add(tile)
+            row.append(tile)
+        return row
+
+    @property
+    def tiles(self):
+        """모든 타일 (아직 만들지 않은 행도 모두 만듦)"""
+        return [tile for row in self.grid for tile in row]
+
+    def tile_count(self):
+        """메모리에 올라와 있는 타일 수 (TileMap 언로드 한도 기준)"""
+        return self.map_width * self.map_height
+
+    def to_data(self):
+        """maps_data.json 형식의 타일 타입 2차원 리스트 반환"""
+        return [[tile.tile_type for tile in row] for row in self.grid]
+
+    def row_types(self):
+        """맵 데이터와 다를 수 있는 행의 (행 번호, 타일 종류 목록) (맵 데이터에 반영할 때 사용)"""
+        return self.grid.decoded_types()
+
+    def crop_state(self):
+        """심어진 작물 상태 {(col, row): (planted_time, growth_stage, crop_type)}"""
+        return {
+            (tile.x // self.tile_size, tile.y // self.tile_size): (tile.planted_time, tile.growth_stage, tile.crop_type)
+            for tile in self.planted
+        }
+
+    def track_crop(self, tile):
+        """작물 색인(planted) 갱신 (심기/수확 등으로 planted_time이 바뀐 뒤 호출, mark_dirty가 대신 호출함)"""
+        if tile.planted_time is not None:
+            self.planted.add(tile)
+        else:
+            self.planted.discard(tile)
+
+    def apply_crop_state(self, state):
+        for (col, row), (planted_time, growth_stage, crop_type) in state.items():
+            tile = self.get_tile(col, row)
+            if tile is not None and tile.tile_type == "planted soil":
+                tile.planted_time = planted_time
+                tile.growth_stage = growth_stage
+                tile.crop_type = crop_type
+                self.track_crop(tile)
+
+    def visible_range(self, camera_x, camera_y, view_width, view_height):
+        """카메라 뷰포트와 겹치는 (col_start, col_end, row_start, row_end) 반환 (end는 미포함)"""
+        col_start = max(0, int(camera_x) // self.tile_size)
+        row_start = max(0, int(camera_y) // self.tile_size)
+        col_end = min(self.map_width, (int(camera_x) + view_width) // self.tile_size + 1)
+        row_end = min(self.map_height, (int(camera_y) + view_height) // self.tile_size + 1)
+        return col_start, col_end, row_start, row_end
+
+    def query_visible(self, camera_x, camera_y, view_width, view_height):
+        """뷰포트 안의 타일만 반환 (맵 전체 크기와 무관하게 화면 크기에 비례)"""
+        col_start, col_end, row_start, row_end = self.visible_range(camera_x, camera_y, view_width, view_height)
+        visible_tiles = []
+        for row in self.grid[row_start:row_end]:
+            visible_tiles.extend(row[col_start:col_end])
+        return visible_tiles
+
+    def mark_dirty(self, tile):
+        """타일이 바뀌면 해당 청크 캐시를 폐기 (다음 draw에서 다시 그림)"""
+        chunk_key = (tile.x // self.tile_size // CHUNK_SIZE, tile.y // self.tile_size // CHUNK_SIZE)
+        self.chunk_surfaces.pop(chunk_key, None)
+        self.version += 1
+        self.changed_cells.add((tile.x // self.tile_size, tile.y // self.tile_size))
+        self.track_crop(tile)
+
+    def render_chunk(self, chunk_col, chunk_row):
+        """청크 하나를 서피스에 미리 그려서 반환"""
+        col_start = chunk_col * CHUNK_SIZE
+        row_start = chunk_row * CHUNK_SIZE
+        cols = min(CHUNK_SIZE, self.map_width - col_start)
+        rows = min(CHUNK_SIZE, self.map_height - row_start)
+        surface = pygame.Surface((cols * self.tile_size, rows * self.tile_size))
+        origin_x = col_start * self.tile_size
+        origin_y = row_start * self.tile_size
+        for row in self.grid[row_start:row_start + rows]:
+            for tile in row[col_start:col_start + cols]:
+                tile.draw(surface, self.tile_size, origin_x, origin_y)
+        return surface
+
+    def get_chunk_surface(self, chunk_col, chunk_row):
+        chunk_key = (chunk_col, chunk_row)
+        surface = self.chunk_surfaces.pop(chunk_key, None)
+        if surface is None:
+            surface = self.render_chunk(chunk_col, chunk_row)
+            if len(self.chunk_surfaces) >= MAX_CACHED_CHUNKS:
+                # 가장 오래 사용하지 않은 청크 제거
+                del self.chunk_surfaces[next(iter(self.chunk_surfaces))]
+        self.chunk_surfaces[chunk_key] = surface  # 최근 사용 순서로 재삽입
+        return surface
 
     def draw(self, screen, camera_x, camera_y):
         screen_width = screen.get_width()
         screen_height = screen.get_height()
-        visible_tiles = [
-            tile for tile in self.tiles
-            if (camera_x - screen_width * 0.25 <= tile.rect.x < camera_x + screen_width * 1.25 and
-                camera_y - screen_height * 0.25 <= tile.rect.y < camera_y + screen_height * 1.25)
-        ]
-        for tile in visible_tiles:
-            tile.draw(screen, self.tile_size, camera_x, camera_y)
+        col_start, col_end, row_start, row_end = self.visible_range(camera_x, camera_y, screen_width, screen_height)
+        if col_start >= col_end or row_start >= row_end:
+            return
+        chunk_pixels = CHUNK_SIZE * self.tile_size
+        for chunk_row in range(row_start // CHUNK_SIZE, (row_end - 1) // CHUNK_SIZE + 1):
+            for chunk_col in range(col_start // CHUNK_SIZE, (col_end - 1) // CHUNK_SIZE + 1):
+                surface = self.get_chunk_surface(chunk_col, chunk_row)
+                screen.blit(surface, (chunk_col * chunk_pixels - camera_x, chunk_row * chunk_pixels - camera_y))
+
+    def get_tile(self, col, row):
+        """(열, 행)으로 타일을 O(1)에 조회 (범위 밖이면 None)"""
+        if 0 <= row < len(self.grid) and 0 <= col < len(self.grid[row]):
+            return self.grid[row][col]
+        return None
+
+    def tile_at_world(self, x, y):
+        """월드 좌표 (x, y)가 속한 타일 반환"""
+        # int()는 음수를 0 쪽으로 자르므로 (-10 -> 0열) 내림으로 계산
+        return self.get_tile(math.floor(x) // self.tile_size, math.floor(y) // self.tile_size)
 
     def update_tile_position(self, old_x, old_y, new_x, new_y):
-        for tile in self.tiles:
-            if tile.x == old_x and tile.y == old_y:
-                tile.update_position(new_x, new_y)
-                break
+        tile = self.tile_at_world(old_x, old_y)
+        if tile is None or tile.x != old_x or tile.y != old_y:
+            return
+        new_col, new_row = math.floor(new_x) // self.tile_size, math.floor(new_y) // self.tile_size
+        displaced = self.get_tile(new_col, new_row)
+        if displaced is None:
+            return  # 그리드 밖으로는 옮기지 않음 (그리드 인덱스와 위치가 어긋나지 않도록)
+        old_col, old_row = old_x // self.tile_size, old_y // self.tile_size
+        tile.update_position(new_x, new_y)
+        if displaced is not tile:
+            # 그리드 인덱스 유지: 밀려난 타일은 비워진 칸으로 이동
+            displaced.update_position(old_col * self.tile_size, old_row * self.tile_size)
+            self.grid[new_row][new_col] = tile
+            self.grid[old_row][old_col] = displaced
+            self.mark_dirty(displaced)  # 비워진 칸(이전 청크)도 다시 그림
+        self.mark_dirty(tile)
+        self.layout_version += 1
 
     def update_tile_type(self, x, y, new_type, tile_map, game_map):
         current_map = game_map.get_current_map()
-        for row_idx, row in enumerate(tile_map):
-            for col_idx, tile_type in enumerate(row):
-                if col_idx * self.tile_size == x and row_idx * self.tile_size == y:
-                    tile_map[row_idx][col_idx] = new_type
-                    current_map["tilemap"][row_idx][col_idx] = new_type
-                    break
+        col_idx, row_idx = x // self.tile_size, y // self.tile_size
+        if x % self.tile_size or y % self.tile_size:
+            return
+        tile = self.get_tile(col_idx, row_idx)  # 맵 데이터를 바꾸기 전에 (행을 처음 만드는 경우 이전 종류로 만들어지도록)
+        if 0 <= row_idx < len(tile_map) and 0 <= col_idx < len(tile_map[row_idx]):
+            tile_map[row_idx][col_idx] = new_type
+            current_map["tilemap"][row_idx][col_idx] = new_type
+            game_map.tile_edits += 1
+        if tile is not None:
+            was_walkable = tile.walkable
+            tile.tile_type = new_type
+            tile.refresh_walkable()
+            # 충돌용 장애물 목록도 통행 여부에 맞춤 (Rect는 값으로 비교되므로 뷰 타일도 같은 방식으로 제거)
+            if was_walkable and not tile.walkable:
+                self.obstacles.append(tile.rect)
+            elif not was_walkable and tile.walkable:
+                self.obstacles.remove(tile.rect)
+            self.mark_dirty(tile)
+            self.layout_version += 1
+
+####################################
+# 작물 성장 스케줄러
+####################################
+class GrowthScheduler:
+    """다음 성장 단계 시간을 우선순위 큐로 관리해 기한이 지난 타일만 갱신 (무효가 된 항목은 꺼낼 때 버림)"""
+    def __init__(self):
+        self.queue = []  # (due_time, seq, tilemap, tile)
+        self.counter = itertools.count()
+        self.paused = {}  # TileMap -> {기한이 됐지만 갱신을 미룬 타일: None} (화면 밖 맵 작업 프로세스로 보냄)
+
+    def schedule(self, tilemap, tile):
+        if tilemap.vectorized_growth:
+            return
+        due_time = tile.next_stage_time()
+        if due_time is not None:
+            heapq.heappush(self.queue, (due_time, next(self.counter), tilemap, tile))
+
+    def schedule_tilemap(self, tilemap):
+        for tile in tilemap.planted:
+            self.schedule(tilemap, tile)
+
+    def clear(self):
+        self.queue = []
+        for tiles in self.paused.values():
+            tiles.clear()
+
+    def remove_tilemap(self, tilemap):
+        """언로드된 TileMap의 예약을 무효로 표시 (큐를 다시 만들지 않고 꺼낼 때 버림)"""
+        tilemap.scheduled = False
+        self.paused.pop(tilemap, None)
+
+    def pause(self, tilemap):
+        """이후 기한이 된 타일은 갱신하지 않고 take_paused로 넘겨줌"""
+        self.paused.setdefault(tilemap, {})
+
+    def take_paused(self, tilemap):
+        """미뤄둔 타일 목록을 꺼냄 (미룬 순서, 중복 없음)"""
+        tiles = self.paused.get(tilemap)
+        if not tiles:
+            return []
+        self.paused[tilemap] = {}
+        return list(tiles)
+
+    def resume(self, tilemap):
+        """미뤄둔 타일을 다시 예약하고 평소처럼 갱신"""
+        for tile in self.paused.pop(tilemap, ()):
+            self.schedule(tilemap, tile)
+
+    def update(self, current_game_time):
+        while self.queue and self.queue[0][0] <= current_game_time:
+            due_time, _, tilemap, tile = heapq.heappop(self.queue)
+            # 언로드된 맵/청크이거나 수확/재파종으로 무효가 된 항목은 건너뜀
+            if not tilemap.scheduled or tile not in tilemap.planted or tile.next_stage_time() != due_time:
+                continue
+            deferred = self.paused.get(tilemap)
+            if deferred is not None:
+                deferred[tile] = None
+                continue
+            if tile.update_growth(current_game_time):
+                tilemap.mark_dirty(tile)
+            self.schedule(tilemap, tile)
 
 ####################################
 # 맵 클래스 (배경 이미지 처리 포함)
 ####################################
 class Map:
-    def __init__(self, json_file="maps_data.json"):
+    def __init__(self, json_file="maps_data.json", tile_backend="object", max_loaded_maps=4, max_loaded_tiles=None,
+                 time_source=None):
         self.json_file = json_file
+        self.time_source = time_source or pygame.time.get_ticks  # 게임 시계 (TileMap에 전달)
+        self.compiled_file = compiled_path(json_file)  # 있으면 JSON 대신 mmap으로 읽음 (python -m modules.map_binary로 생성)
+        self.compiled_maps = None  # 열어둔 CompiledMaps (타일 행을 필요할 때 읽음)
+        self.compiled_layout = None  # 컴파일된 파일에 들어 있는 배치의 layout_signature (모르면 None)
+        self.tile_edits = 0  # 맵 데이터의 타일 종류를 바꾼 횟수 (layout_signature에 포함)
+        self.tile_backend = tile_backend  # "object" (Tile 객체) 또는 "numpy" (배열 기반)
         self.maps = []
         self.current_map_index = 0
         self.tile_size = 50
-        self.tilemaps = {}  # 모든 맵의 TileMap 저장
+        self.tilemaps = {}  # 생성된 TileMap (최근 사용 순서, 처음 진입할 때 생성)
+        self.max_loaded_maps = max_loaded_maps    # 메모리에 유지할 TileMap 최대 개수
+        self.max_loaded_tiles = max_loaded_tiles  # 메모리에 유지할 타일 총 개수 한도 (None이면 제한 없음)
+        self.unloaded_crop_states = {}  # 언로드된 맵의 작물 상태
+        self.autosaver = None  # AutoSaver (붙어 있을 때만 아래 두 변경 목록을 저널용으로 모아둠)
+        self.pending_tile_changes = {}  # 언로드된 맵에서 자동 저장되지 않은 타일 변경 {map_index: {(col, row): tile_type}}
+        self.pending_chunk_changes = {}  # 열린 맵에서 자동 저장되지 않은 청크 {map_index: {"col,row", ...}}
+        self.chunk_executor = None  # 열린 맵 청크 생성 작업 프로세스 (열린 맵에 처음 들어갈 때 생성)
         self.background_images = {}  # 캐싱용
+        self.growth_scheduler = GrowthScheduler()
+        self.simulator = None  # WorldSimulator (화면 밖 맵을 작업 프로세스에서 진행)
+        self.item_stores = {}  # map_index -> ItemStore (맵 데이터의 items 리스트를 감쌈)
+        self.map_versions = {}  # 맵별 장애물/존/아이템 변경 횟수 (충돌 인덱스 재생성 기준)
+        self.layout_versions = {}  # 맵별 장애물/존 변경 횟수 (아이템 변경은 세지 않음)
+        self.spatial_indexes = {}  # (종류, map_index) -> (버전, 원본 리스트, 길이, SpatialGrid)
         self.load_maps()
 
     def load_maps(self):
+        previous = self.compiled_maps
+        self.compiled_maps = None
+        self.compiled_layout = None
+        if not self.load_compiled_maps():
+            try:
+                with open(self.json_file, 'r') as file:
+                    data = json.load(file)
+                    self.maps = data["maps"]
+                    print("맵 데이터 로드 완료")
+            except FileNotFoundError:
+                print("맵 데이터 파일이 없으므로 새로 생성합니다.")
+                self.initialize_maps()
+                self.save_maps()
+        self.rebind_tilemaps()
+        if previous is not None:
+            previous.close()  # 맵 데이터를 새로 읽었으므로 이전 파일의 mmap은 해제
+        self.load_crop_data()
+
+        # TileMap은 현재 맵만 생성 (나머지는 처음 진입할 때 생성)
+        self.select_map(self.current_map_index)
+
+    def rebind_tilemaps(self):
+        """이미 만든 TileMap의 아직 만들지 않은 행은 새로 읽은 맵 데이터에서 만들도록 연결 (이전 mmap을 닫기 전에 호출)"""
+        for map_index in list(self.tilemaps):
+            tilemap = self.tilemaps[map_index]
+            if tilemap.streamed or not len(tilemap.grid):  # 열린 맵과 배열 백엔드는 행을 나중에 읽지 않음
+                continue
+            data = self.maps[map_index]["tilemap"] if map_index < len(self.maps) else []
+            if len(data) == len(tilemap.grid):
+                tilemap.grid.data = data
+            else:  # 크기가 달라졌으면 다음 진입 때 새로 만듦
+                tilemap.scheduled = False
+                del self.tilemaps[map_index]
+
+    def load_compiled_maps(self):
+        """JSON보다 새로운 컴파일된 맵 파일이 있으면 mmap으로 열어 사용 (실패하면 False를 반환해 JSON으로 로드)"""
+        if not is_fresh(self.compiled_file, self.json_file):
+            return False
         try:
-            with open(self.json_file, 'r') as file:
-                data = json.load(file)
-                self.maps = data["maps"]
-                print("맵 데이터 로드 완료")
-        except FileNotFoundError:
-            print("맵 데이터 파일이 없으므로 새로 생성합니다.")
-            self.initialize_maps()
-            self.save_maps()
-
-        # 모든 맵에 대해 TileMap 객체 생성 후 저장
+            compiled_maps = CompiledMaps(self.compiled_file)
+            self.maps = compiled_maps.load_maps()
+        except (OSError, ValueError, KeyError) as e:
+            print("컴파일된 맵 파일을 읽을 수 없어 JSON으로 로드합니다:", e)
+            return False
+        self.compiled_maps = compiled_maps
+        self.compiled_layout = self.layout_signature()
+        print("컴파일된 맵 데이터 로드 완료")
+        return True
+
+    def load_crop_data(self):
+        """맵 데이터에 저장된 작물 상태는 TileMap을 처음 만들 때 적용"""
         for m in self.maps:
-            map_index = m["map_index"]
-            if m["tilemap"]:
-                tilemap_obj = TileMap(len(m["tilemap"][0]), len(m["tilemap"]), self.tile_size)
-                tilemap_obj.generate(m["tilemap"])
-                self.tilemaps[map_index] = tilemap_obj
-            else:
-                self.tilemaps[map_index] = None
+            if m.get("crops"):
+                self.unloaded_crop_states[m["map_index"]] = {
+                    (col, row): (planted_time, growth_stage, crop_type)
+                    for col, row, planted_time, growth_stage, crop_type in m["crops"]
+                }
+
+    def select_map(self, map_index):
+        self.current_map_index = map_index
+        self.tile_map = self.get_tilemap(map_index)
+
+    def get_tilemap(self, map_index):
+        """맵의 TileMap 반환 (없으면 생성, 한도를 넘으면 오래 쓰지 않은 맵을 언로드)"""
+        tilemap = self.tilemaps.pop(map_index, None)
+        if tilemap is None and self.maps[map_index].get("generator"):
+            tilemap = self.create_streamed_tilemap(self.maps[map_index])
+        elif tilemap is None:
+            map_tiles = self.maps[map_index]["tilemap"]
+            if not map_tiles:
+                return None
+            tilemap = self.create_tilemap(map_tiles, self.unloaded_crop_states.pop(map_index, None))
+        self.tilemaps[map_index] = tilemap  # 최근 사용 순서로 재삽입
+        self.evict_tilemaps()
+        return tilemap
+
+    def evict_tilemaps(self):
+        while len(self.tilemaps) > 1:
+            loaded_tiles = sum(t.tile_count() for t in self.tilemaps.values())
+            over_count = len(self.tilemaps) > self.max_loaded_maps
+            over_tiles = self.max_loaded_tiles is not None and loaded_tiles > self.max_loaded_tiles
+            if not (over_count or over_tiles):
+                break
+            victim = next((i for i in self.tilemaps if i != self.current_map_index), None)
+            if victim is None:
+                break
+            self.unload_tilemap(victim)
+
+    def unload_tilemap(self, map_index):
+        """TileMap 상태를 맵 데이터로 되돌린 뒤 메모리에서 제거"""
+        tilemap = self.tilemaps.pop(map_index)
+        self.sync_tilemap(map_index, tilemap)
+        if tilemap.streamed:
+            tilemap.unload_all()  # 바뀐 청크는 맵 데이터의 chunks에 남음
+            return
+        self.unloaded_crop_states[map_index] = tilemap.crop_state()
+        # 타일 변경은 위 sync_tilemap에서 맵 데이터에 이미 반영됨 (자동 저장 저널에 쓸 목록만 따로 보관)
+        if tilemap.changed_cells and self.autosaver is not None:
+            changes = self.pending_tile_changes.setdefault(map_index, {})
+            for col, row in tilemap.changed_cells:
+                changes[(col, row)] = tilemap.get_tile(col, row).tile_type
+        self.growth_scheduler.remove_tilemap(tilemap)
+
+    def create_tilemap(self, tilemap_data, crop_state=None):
+        """설정된 백엔드로 TileMap 생성 후 성장 스케줄 등록"""
+        tilemap_class = TileMap
+        if self.tile_backend == "numpy":
+            try:
+                from modules.tile_array import ArrayTileMap
+                tilemap_class = ArrayTileMap
+            except ImportError as e:
+                print("numpy 타일 백엔드를 사용할 수 없어 기본 TileMap을 사용합니다:", e)
+                self.tile_backend = "object"
+        tilemap_obj = tilemap_class(len(tilemap_data[0]), len(tilemap_data), self.tile_size, self.time_source)
+        tilemap_obj.generate(tilemap_data)
+        if crop_state:
+            tilemap_obj.apply_crop_state(crop_state)
+        self.growth_scheduler.schedule_tilemap(tilemap_obj)
+        return tilemap_obj
+
+    def create_streamed_tilemap(self, map_data):
+        """generator 설정이 있는 열린 맵의 TileMap (청크는 카메라를 따라 생성)"""
+        from modules.world_gen import StreamedTileMap
+        self.start_chunk_executor()  # 열린 맵에 들어가지 않는 실행은 작업 프로세스를 띄우지 않음
+        return StreamedTileMap(self, map_data, self.tile_size, self.chunk_executor)
+
+    def start_chunk_executor(self):
+        """열린 맵이 있으면 청크 생성 작업 프로세스를 띄움 (첫 청크는 같은 프레임에 직접 생성하므로 기다리지 않음)"""
+        if self.chunk_executor is not None or not any(m.get("generator") for m in self.maps):
+            return
+        # 생성은 순수 파이썬 연산이라 스레드로는 GIL을 두고 프레임과 경쟁하므로 별도 프로세스에서 실행
+        # (spawn 방식이므로 실행 스크립트는 if __name__ == "__main__": 아래에서 게임을 시작해야 함)
+        self.chunk_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.chunk_executor.submit(int)  # 작업 프로세스는 첫 요청 때 생기므로 빈 작업으로 미리 띄움
 
-        self.tile_map = self.tilemaps[self.current_map_index]
+    def close(self):
+        """열린 맵 청크 생성 프로세스 종료"""
+        if self.chunk_executor is not None:
+            self.chunk_executor.shutdown(cancel_futures=True)
+            self.chunk_executor = None
 
     def initialize_maps(self):
         # 예시로 세 개의 맵 데이터를 정의합니다.
@@ -165,6 +646,8 @@ class Map:
         ]
         map1_data = []  # seed map은 tilemap 없이 (아이템 중심)
         map2_data = []  # shop map은 tilemap 없이 단순 배경 이미지로 처리
+        # open map은 generator 설정으로 카메라 주변 청크만 생성 (modules.world_gen)
+        open_x, open_y = OPEN_MAP_START
 
         self.maps = [
             {
@@ -178,7 +661,8 @@ class Map:
                 ],
                 "transition_zones": [
                     {"zone": {"x": 1950, "y": 950, "width": 50, "height": 100}, "target_map": 1, "start_pos": [80, 725]},
-                    {"zone": {"x": 400, "y": 490, "width": 20, "height": 10}, "target_map": 2, "start_pos": [0, 450]}
+                    {"zone": {"x": 400, "y": 490, "width": 20, "height": 10}, "target_map": 2, "start_pos": [0, 450]},
+                    {"zone": {"x": 950, "y": 1950, "width": 100, "height": 50}, "target_map": 3, "start_pos": OPEN_MAP_START}
                 ],
                 "map_index": 0,
                 "items": []
@@ -217,34 +701,73 @@ class Map:
                 ],
                 "map_index": 2,
                 "items": []
+            },
+            {
+                "type": "open map",
+                "size": [OPEN_MAP_SIZE, OPEN_MAP_SIZE],
+                "background_path": None,
+                "tilemap": [],
+                "generator": {
+                    "seed": 20240,
+                    "max_obstacles": 2,
+                    "max_items": 1,
+                    "clear": [{"x": open_x - 400, "y": open_y - 400, "width": 800, "height": 800}],
+                },
+                "obstacles": [],
+                "transition_zones": [
+                    {"zone": {"x": open_x - 50, "y": open_y - 200, "width": 100, "height": 50}, "target_map": 0, "start_pos": [1000, 1880]}
+                ],
+                "map_index": 3,
+                "items": [],
+                "chunks": {}
             }
         ]
 
     def save_maps(self):
         self.sync_tilemap_data()
-        data = {"maps": self.maps}
-        with open(self.json_file, 'w') as file:
-            json.dump(data, file, indent=4)
+        data = {"maps": [saved_map(m) for m in plain_maps(self.maps)]}
+        # 컴파일된 파일이 최신이고 그 뒤로 배치가 그대로면 타일/장애물/전환 존 구역은 다시 만들지 않음
+        layout = self.layout_signature()
+        layout_changed = layout != self.compiled_layout or not is_fresh(self.compiled_file, self.json_file)
+        write_json_atomic(self.json_file, data)
+        refresh_compiled(self.json_file, data, layout_changed)
+        self.compiled_layout = layout
         print("맵 데이터 저장 완료")
 
+    def layout_signature(self):
+        """컴파일된 파일의 배치(타일, 장애물, 전환 존)가 낡았는지 비교하는 값 (열린 맵은 청크 장애물을 저장하지 않으므로 제외)"""
+        return (self.tile_edits, tuple(self.get_layout_version(map_index) for map_index, m in enumerate(self.maps)
+                                       if not m.get("generator")))
+
     def sync_tilemap_data(self):
-        current_map = self.get_current_map()
-        num_rows = len(current_map["tilemap"])
-        num_cols = len(current_map["tilemap"][0]) if num_rows > 0 else 0
-        if self.tile_map is None:
+        # 현재 맵뿐 아니라 생성된 모든 TileMap의 타일/작물 상태를 맵 데이터에 반영
+        for map_index, tilemap in self.tilemaps.items():
+            self.sync_tilemap(map_index, tilemap)
+        for map_index, state in self.unloaded_crop_states.items():
+            self.maps[map_index]["crops"] = crop_rows(state)
+
+    def sync_tilemap(self, map_index, tilemap):
+        if tilemap.streamed:
+            tilemap.save_chunks()
             return
-        for tile in self.tile_map.tiles:
-            col_idx = tile.x // self.tile_map.tile_size
-            row_idx = tile.y // self.tile_map.tile_size
-            if 0 <= row_idx < num_rows and 0 <= col_idx < num_cols:
-                current_map["tilemap"][row_idx][col_idx] = tile.tile_type
+        map_tiles = self.maps[map_index]["tilemap"]
+        num_rows = len(map_tiles)
+        num_cols = len(map_tiles[0]) if num_rows > 0 else 0
+        for row_idx, row in tilemap.row_types():
+            if row_idx >= num_rows:
+                continue
+            map_row = map_tiles[row_idx]  # 컴파일된 맵에서는 바뀐 행만 메모리에 남도록 다른 칸만 씀
+            for col_idx, tile_type in enumerate(row[:num_cols]):
+                if map_row[col_idx] != tile_type:
+                    map_row[col_idx] = tile_type
+                    self.tile_edits += 1
+        self.maps[map_index]["crops"] = crop_rows(tilemap.crop_state())
 
     def load_background_image(self, path, screen_size):
         if path in self.background_images:
             return self.background_images[path]
         try:
-            image = pygame.image.load(path).convert()
-            image = pygame.transform.scale(image, screen_size)
+            image = assets.get_image(path, size=screen_size, alpha=False)
             self.background_images[path] = image
             print(f"배경 이미지 로드 완료: {path}")
             return image
@@ -256,26 +779,72 @@ class Map:
         return self.maps[self.current_map_index]
 
     def change_map(self, target_map_index, start_pos, player):
-        self.current_map_index = target_map_index
         player.set_position(*start_pos)
-        # 이미 생성된 TileMap이 있으면 그대로 사용
-        if target_map_index in self.tilemaps and self.tilemaps[target_map_index] is not None:
-            self.tile_map = self.tilemaps[target_map_index]
-        else:
-            current_map = self.get_current_map()
-            if current_map["tilemap"]:
-                tilemap_obj = TileMap(len(current_map["tilemap"][0]), len(current_map["tilemap"]), self.tile_size)
-                tilemap_obj.generate(current_map["tilemap"])
-                self.tile_map = tilemap_obj
-                self.tilemaps[target_map_index] = tilemap_obj
+        if self.simulator:
+            self.simulator.pull(target_map_index)  # 작업 프로세스에서 진행 중이던 상태를 먼저 반영
+        # 이미 생성된 TileMap이 있으면 그대로 사용, 없으면 이때 생성
+        self.select_map(target_map_index)
+
+    def get_map_version(self, map_index):
+        return self.map_versions.get(map_index, 0)
+
+    def get_layout_version(self, map_index):
+        return self.layout_versions.get(map_index, 0)
+
+    def mark_map_changed(self, map_index=None, items_only=False):
+        """장애물, 전환 존, 아이템을 바꾼 뒤 호출하면 충돌 인덱스가 다시 만들어짐 (아이템만 바꿨으면 items_only=True)"""
+        if map_index is None:
+            map_index = self.current_map_index
+        self.map_versions[map_index] = self.get_map_version(map_index) + 1
+        if not items_only:
+            self.layout_versions[map_index] = self.get_layout_version(map_index) + 1
+
+    def get_spatial_index(self, kind, source, make_rect, map_index=None):
+        """장애물/전환 존의 SpatialGrid (배치 버전이 바뀌었을 때만 다시 생성, 아이템 변경은 무시, 충돌 판정과 그리기가 공유)"""
+        map_index = self.current_map_index if map_index is None else map_index
+        version = self.get_layout_version(map_index)
+        cached = self.spatial_indexes.get((kind, map_index))
+        if cached and cached[0] == version and cached[1] is source and cached[2] == len(source):
+            return cached[3]
+        grid = SpatialGrid()
+        grid.build([make_rect(entry) for entry in source])
+        self.spatial_indexes[(kind, map_index)] = (version, source, len(source), grid)
+        return grid
+
+    def get_item_store(self, map_index=None):
+        """맵의 ItemStore (items 리스트가 밖에서 바뀌었으면 다시 생성)"""
+        if map_index is None:
+            map_index = self.current_map_index
+        items = self.maps[map_index]["items"]
+        store = self.item_stores.get(map_index)
+        if store is None or store.items is not items or len(store.ids) != len(items):
+            store = ItemStore(items)
+            self.item_stores[map_index] = store
+        return store
 
     def add_item(self, item):
-        self.get_current_map()["items"].append(item)
+        self.get_item_store().add(item)
+        self.mark_map_changed(items_only=True)
 
     def remove_item(self, item):
-        self.get_current_map()["items"].remove(item)
+        if self.get_item_store().remove(item):
+            self.mark_map_changed(items_only=True)
 
     def draw(self, screen, camera, seed_manager):
+        self.draw_background(screen, camera)
+        self.draw_items(screen, camera, seed_manager)
+
+    def background_key(self, camera):
+        """배경 레이어(타일, 장애물, 전환 존)가 그대로인지 판단하는 값"""
+        return (
+            self.current_map_index,
+            int(camera.camera_x),
+            int(camera.camera_y),
+            self.tile_map.version if self.tile_map else 0,
+            self.get_map_version(self.current_map_index),
+        )
+
+    def draw_background(self, screen, camera):
         current_map = self.get_current_map()
         screen_size = (screen.get_width(), screen.get_height())
         
@@ -288,8 +857,10 @@ class Map:
             if self.tile_map:
                 self.tile_map.draw(screen, camera.camera_x, camera.camera_y)
         
-        # 장애물 그리기
-        for obstacle in current_map["obstacles"]:
+        # 장애물 그리기 (화면에 걸치는 것만)
+        obstacles = current_map["obstacles"]
+        for i in camera.query(self.get_spatial_index("obstacles", obstacles, rect_from_dict)):
+            obstacle = obstacles[i]
             pygame.draw.rect(
                 screen,
                 (255, 0, 0),
@@ -297,59 +868,80 @@ class Map:
                  obstacle["width"], obstacle["height"])
             )
         
-        # 전환 존 그리기
-        for zone in current_map["transition_zones"]:
+        # 전환 존 그리기 (화면에 걸치는 것만)
+        transition_zones = current_map["transition_zones"]
+        for i in camera.query(self.get_spatial_index("transition_zones", transition_zones, zone_rect)):
+            zone = transition_zones[i]
             pygame.draw.rect(
                 screen,
                 (0, 255, 0),
                 (zone["zone"]["x"] - camera.camera_x, zone["zone"]["y"] - camera.camera_y,
                  zone["zone"]["width"], zone["zone"]["height"])
             )
-        
-        # 아이템 (씨앗) 그리기
-        for item in current_map["items"]:
+
+    def draw_items(self, screen, camera, seed_manager):
+        # 화면에 걸치는 아이템 (씨앗)만 그리기
+        view_rect = camera.viewport()
+        frame = seed_manager.seed_frames[seed_manager.frame_index]
+        for item in self.get_item_store().visible(view_rect):
             if item["type"] == "seed":
-                frame = seed_manager.seed_frames[seed_manager.frame_index]
-                screen.blit(
+                camera.mark_dirty(screen.blit(
                     frame,
                     (item["position"][0] - camera.camera_x, item["position"][1] - camera.camera_y)
-                )
-        
-        seed_manager.update(current_map)
+                ))
 
     def plant_seed(self, player, x, y, current_game_time):
-        tile_x = (x + 20) // self.tile_size
-        tile_y = (y + 20) // self.tile_size
         if self.tile_map:
-            for tile in self.tile_map.tiles:
-                if tile.x // self.tile_size == tile_x and tile.y // self.tile_size == tile_y:
-                    if tile.tile_type == "soil":
-                        tile.tile_type = "planted soil"
-                        tile.crop_type = player.inventory[0]["name"]
-                        tile.planted_time = current_game_time  # 절대 시간 저장
-                        tile.growth_stage = 0
-                        return True
+            tile = self.tile_map.tile_at_world(x + 20, y + 20)
+            if tile and tile.tile_type == "soil":
+                tile.tile_type = "planted soil"
+                tile.crop_type = player.inventory.selected_stack().name
+                tile.planted_time = current_game_time  # 절대 시간 저장
+                tile.growth_stage = 0
+                self.tile_map.mark_dirty(tile)
+                self.growth_scheduler.schedule(self.tile_map, tile)
+                return True
         return False
     
+    def update_streaming(self, camera):
+        """열린 맵이면 카메라 주변 청크를 생성하고 먼 청크를 언로드"""
+        if self.tile_map is not None and self.tile_map.streamed:
+            self.tile_map.stream(camera.viewport())
+
     def update_crop(self, current_game_time):
-        # 모든 맵의 TileMap에 대해 작물 성장 업데이트
+        # 모든 맵의 작물 중 성장 기한이 지난 타일만 업데이트
+        self.growth_scheduler.update(current_game_time)
+        for tilemap in self.tilemaps.values():
+            if tilemap.vectorized_growth:
+                tilemap.update_growth(current_game_time)
+
+    def advance_crops(self, current_game_time):
+        """모든 맵의 작물을 current_game_time 시점의 단계로 한 번에 맞춤 (오프라인 경과/시간 건너뛰기용)"""
+        self.growth_scheduler.clear()
         for tilemap in self.tilemaps.values():
-            if tilemap:
-                for tile in tilemap.tiles:
-                    tile.update_growth(current_game_time)
+            if tilemap.vectorized_growth:
+                tilemap.update_growth(current_game_time)
+                continue
+            # 작물이 심어진 타일만 돌며 단계를 맞추고 다시 예약 (화면 밖 맵이면 기한이 된 뒤 작업 프로세스로 넘어감)
+            for tile in tilemap.planted:
+                if tile.update_growth(current_game_time):
+                    tilemap.mark_dirty(tile)
+                self.growth_scheduler.schedule(tilemap, tile)
+        for state in self.unloaded_crop_states.values():
+            for cell, (planted_time, growth_stage, crop_type) in state.items():
+                state[cell] = (planted_time, crop_stage_at(crop_type, planted_time, growth_stage, current_game_time), crop_type)
 
     def harvest_crop(self, player, x, y):
-        tile_x = (x + 20) // self.tile_size
-        tile_y = (y + 20) // self.tile_size
         if self.tile_map:
-            for tile in self.tile_map.tiles:
-                if tile.x // self.tile_size == tile_x and tile.y // self.tile_size == tile_y:
-                    if tile.harvest():
-                        player.add_item({"type": "crop", "id": 3}, self)
-                        return True
-                    else:
-                        print("수확할 작물이 없습니다.")
-                        return False
+            tile = self.tile_map.tile_at_world(x + 20, y + 20)
+            if tile:
+                if tile.harvest():
+                    self.tile_map.mark_dirty(tile)
+                    player.add_item({"type": "crop", "id": 3}, self)
+                    return True
+                else:
+                    print("수확할 작물이 없습니다.")
+                    return False
         print("해당 위치에 타일이 없습니다.")
         return False
 
@@ -358,48 +950,42 @@ class Map:
 ####################################
 class Item_Sheet:
     def __init__(self, file_path, scale_factor=0.2):
-        self.sheet = pygame.image.load(file_path)
+        self.file_path = file_path
+        self.sheet = assets.load(file_path)
         self.scale_factor = scale_factor
 
     def get_image(self, x, y, width, height):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(self.sheet, (0, 0), (x, y, width, height))
-        if self.scale_factor != 1:
-            new_width = int(width * self.scale_factor)
-            new_height = int(height * self.scale_factor)
-            image = pygame.transform.scale(image, (new_width, new_height))
-        return image
+        return assets.get_image(self.file_path, (x, y, width, height), self.scale_factor)
 
     def get_animation_frames(self, start_x, start_y, frame_width, frame_height, num_frames):
-        frames = []
-        for i in range(num_frames):
-            frame_x = start_x + i * frame_width
-            frames.append(self.get_image(frame_x, start_y, frame_width, frame_height))
-        return frames
+        # 프레임들은 하나의 아틀라스 서피스를 공유
+        return assets.get_frames(self.file_path, start_x, start_y, frame_width, frame_height, num_frames, self.scale_factor)
 
 class SeedManager:
-    def __init__(self, game_map):
-        self.global_timer = pygame.time.get_ticks()
+    def __init__(self, game_map, rng=None, time_source=None):
+        self.rng = rng if rng is not None else random.Random()  # 시드 고정 시 결정적 생성
+        self.time_source = time_source or pygame.time.get_ticks  # 현재 시간(ms)을 반환하는 함수
+        self.global_timer = self.time_source()
         self.spawn_interval = 5000  # 5초 간격
         self.max_seeds = 5
         self.game_map = game_map
         self.sheet = Item_Sheet(seed_path)
         self.seed_frames = self.sheet.get_animation_frames(0, 128 * 13, 128, 128, 8)
         self.frame_index = 0
-        self.animation_timer = pygame.time.get_ticks()
+        self.animation_timer = self.time_source()
         self.animation_interval = 200
+        self.samplers = {}  # map_index -> ((맵 크기, 맵 버전), FreeSpaceSampler)
 
     def update(self, current_map):
-        current_time = pygame.time.get_ticks()
+        current_time = self.time_source()
         if current_map["type"] == "seed map":
-            current_map_seeds = [seed for seed in current_map["items"] if seed["type"] == "seed"]
-            if len(current_map_seeds) == 0:
+            seed_count = self.game_map.get_item_store(current_map["map_index"]).count("seed")
+            if seed_count == 0:
                 print("맵에 씨앗이 없어 초기화 중...")
-                for _ in range(self.max_seeds):
-                    self.spawn_seed(current_map)
+                self.spawn_seeds(current_map, self.max_seeds)
                 self.global_timer = current_time
                 return
-            if len(current_map_seeds) < self.max_seeds and current_time - self.global_timer >= self.spawn_interval:
+            if seed_count < self.max_seeds and current_time - self.global_timer >= self.spawn_interval:
                 self.spawn_seed(current_map)
                 self.global_timer = current_time
 
@@ -407,39 +993,31 @@ class SeedManager:
             self.frame_index = (self.frame_index + 1) % len(self.seed_frames)
             self.animation_timer = current_time
 
-    def spawn_seed(self, current_map):
+    def get_sampler(self, current_map):
+        """장애물/전환 존의 배치 버전이 바뀌었을 때만 빈 공간 샘플러를 다시 생성 (아이템 추가/줍기로는 다시 만들지 않음)"""
         map_index = current_map["map_index"]
-        map_size = current_map["size"]
-        obstacles = current_map["obstacles"]
-        transition_zones = current_map["transition_zones"]
+        key = (tuple(current_map["size"]), self.game_map.get_layout_version(map_index))
+        cached = self.samplers.get(map_index)
+        if cached and cached[0] == key:
+            return cached[1]
+        blocked = [rect_from_dict(obstacle) for obstacle in current_map["obstacles"]]
+        blocked += [rect_from_dict(zone["zone"]) for zone in current_map["transition_zones"]]
+        sampler = FreeSpaceSampler(current_map["size"], blocked)
+        self.samplers[map_index] = (key, sampler)
+        return sampler
+
+    def spawn_seeds(self, current_map, count):
+        for seed_position in self.get_sampler(current_map).sample_many(self.rng, count):
+            self.add_seed(current_map, seed_position)
 
-        while True:
-            seed_position = (random.randint(0, map_size[0]), random.randint(0, map_size[1]))
-            valid = True
-            for obstacle in obstacles:
-                obstacle_rect = pygame.Rect(obstacle["x"], obstacle["y"], obstacle["width"], obstacle["height"])
-                if obstacle_rect.collidepoint(seed_position):
-                    valid = False
-                    break
-            if not valid:
-                continue
-            for zone in transition_zones:
-                zone_rect = pygame.Rect(zone["zone"]["x"], zone["zone"]["y"], zone["zone"]["width"], zone["zone"]["height"])
-                if zone_rect.collidepoint(seed_position):
-                    valid = False
-                    break
-            if not valid:
-                continue
-            if not (0 <= seed_position[0] <= map_size[0] and 0 <= seed_position[1] <= map_size[1]):
-                continue
-            break
+    def spawn_seed(self, current_map):
+        seed_position = self.get_sampler(current_map).sample(self.rng)
+        if seed_position is None:
+            print("씨앗을 놓을 빈 공간이 없습니다.")
+            return
+        self.add_seed(current_map, seed_position)
 
-        seed_id = random.choices([0, 1, 2], weights=[0.6, 0.3, 0.1])[0]
-        seed_item = {
-            "map_index": map_index,
-            "position": seed_position,
-            "type": "seed",
-            "id": seed_id,
-        }
+    def add_seed(self, current_map, seed_position):
+        seed_item = make_seed_item(current_map["map_index"], seed_position, self.rng)
         self.game_map.add_item(seed_item)
         print(f"씨앗 생성: {seed_position}")
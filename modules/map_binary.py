@@ -0,0 +1,409 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+####################################
+# 컴파일된 맵 파일 (maps_data.json -> maps_data.bin)
+####################################
+# 구조: 헤더 | 맵별 데이터 구역 (8바이트 정렬) | 메타데이터 JSON
+#   헤더: 매직, 형식 버전, 헤더 크기, 메타데이터 위치/길이
+#   타일: 행 우선 uint8 종류 코드 격자 (코드 -> 이름 표는 메타데이터에)
+#   장애물/전환 존/아이템: 고정 크기 int32 레코드 배열
+#   메타데이터: 맵 dict를 키 순서 그대로 두고, 구역으로 옮긴 값만 {"$packed": ...} 표시로 바꿈
+# 사용법: python -m modules.map_binary [maps_data.json] [-o maps_data.bin]
+MAGIC = b"FMAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")          # 매직, 버전, 헤더 크기, 메타데이터 위치, 메타데이터 길이
+OBSTACLE = struct.Struct("<iiii")          # x, y, width, height
+ZONE = struct.Struct("<iiiiiii")           # x, y, width, height, target_map, start_x, start_y
+ITEM = struct.Struct("<iiiii")             # x, y, id, map_index, 종류 문자열 번호
+PACKED = "$packed"
+INT32_RANGE = range(-2 ** 31, 2 ** 31)
+MAX_TILE_TYPES = 256
+
+LAYOUT_KEYS = ("tilemap", "obstacles", "transition_zones")  # 배치가 그대로면 기존 파일에서 복사하는 구역
+OBSTACLE_KEYS = ["x", "y", "width", "height"]
+ZONE_KEYS = ["zone", "target_map", "start_pos"]
+ITEM_KEYS = ["map_index", "position", "type", "id"]
+
+
+def compiled_path(json_file):
+    """JSON 맵 파일에 대응하는 컴파일된 파일 경로"""
+    return os.path.splitext(json_file)[0] + ".bin"
+
+
+def is_int32(value):
+    return type(value) is int and value in INT32_RANGE
+
+
+def is_rect(data):
+    return isinstance(data, dict) and list(data) == OBSTACLE_KEYS and all(is_int32(data[key]) for key in OBSTACLE_KEYS)
+
+
+def is_point(data):
+    return isinstance(data, list) and len(data) == 2 and all(is_int32(value) for value in data)
+
+
+def is_zone(data):
+    return (isinstance(data, dict) and list(data) == ZONE_KEYS and is_rect(data["zone"])
+            and is_int32(data["target_map"]) and is_point(data["start_pos"]))
+
+
+def is_item(data):
+    return (isinstance(data, dict) and list(data) == ITEM_KEYS and is_int32(data["map_index"])
+            and is_point(data["position"]) and isinstance(data["type"], str) and is_int32(data["id"]))
+
+
+####################################
+# 컴파일
+####################################
+class MapCompiler:
+    """맵 데이터를 구역별 바이트로 쌓고 위치를 메타데이터에 기록"""
+    def __init__(self):
+        self.body = bytearray(HEADER.size)
+        self.tile_names = []
+        self.tile_codes = {}
+        self.strings = []
+        self.string_codes = {}
+
+    def section(self, data):
+        while len(self.body) % 8:
+            self.body.append(0)
+        offset = len(self.body)
+        self.body += data
+        return offset
+
+    def tile_code(self, tile_type):
+        code = self.tile_codes.get(tile_type)
+        if code is None:
+            if len(self.tile_names) >= MAX_TILE_TYPES:
+                raise ValueError(f"타일 종류가 {MAX_TILE_TYPES}개를 넘습니다")
+            code = len(self.tile_names)
+            self.tile_names.append(tile_type)
+            self.tile_codes[tile_type] = code
+        return code
+
+    def string_code(self, text):
+        code = self.string_codes.get(text)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(text)
+            self.string_codes[text] = code
+        return code
+
+    def pack_tiles(self, rows):
+        """직사각형 문자열 격자만 코드 격자로 저장 (그 밖의 형태는 JSON으로 남김)"""
+        if not rows:
+            return None
+        cols = len(rows[0])
+        grid = bytearray()
+        for row in rows:
+            if len(row) != cols or not all(isinstance(tile_type, str) for tile_type in row):
+                return None
+            grid += bytes(self.tile_code(tile_type) for tile_type in row)
+        return {PACKED: "tiles", "offset": self.section(grid), "cols": cols, "rows": len(rows)}
+
+    def pack_records(self, kind, entries):
+        """모든 항목이 고정 레코드 형식에 맞는 목록만 배열로 저장"""
+        if not entries:
+            return None
+        if kind == "obstacles" and all(is_rect(o) for o in entries):
+            data = b"".join(OBSTACLE.pack(o["x"], o["y"], o["width"], o["height"]) for o in entries)
+        elif kind == "transition_zones" and all(is_zone(z) for z in entries):
+            data = b"".join(
+                ZONE.pack(z["zone"]["x"], z["zone"]["y"], z["zone"]["width"], z["zone"]["height"],
+                          z["target_map"], *z["start_pos"])
+                for z in entries
+            )
+        elif kind == "items" and all(is_item(item) for item in entries):
+            data = b"".join(
+                ITEM.pack(*item["position"], item["id"], item["map_index"], self.string_code(item["type"]))
+                for item in entries
+            )
+        else:
+            return None
+        return {PACKED: kind, "offset": self.section(data), "count": len(entries)}
+
+    def copy_section(self, source, packed):
+        """source(CompiledMaps)의 구역 바이트를 그대로 옮겨 담음 (구역이 아니었으면 None)"""
+        if not isinstance(packed, dict) or PACKED not in packed:
+            return None
+        if packed[PACKED] == "tiles":
+            length = packed["cols"] * packed["rows"]
+        else:
+            length = packed["count"] * (OBSTACLE if packed[PACKED] == "obstacles" else ZONE).size
+        start = packed["offset"]
+        return dict(packed, offset=self.section(source.buffer[start:start + length]))
+
+    def compile(self, maps_data, layout_source=None):
+        """layout_source(CompiledMaps)를 주면 타일/장애물/전환 존은 그 파일의 구역을 그대로 복사 (배치가 같을 때만 사용)"""
+        source_maps = None
+        if layout_source is not None:
+            source_maps = layout_source.meta["maps"]
+            self.tile_names = list(layout_source.meta["tile_types"])  # 복사한 타일 구역의 코드를 그대로 유지
+            self.tile_codes = {tile_type: code for code, tile_type in enumerate(self.tile_names)}
+        maps = []
+        for index, m in enumerate(maps_data["maps"]):
+            entry = {}
+            for key, value in m.items():
+                packed = None
+                if source_maps is not None and key in LAYOUT_KEYS:
+                    packed = self.copy_section(layout_source, source_maps[index].get(key))
+                elif key == "tilemap":
+                    packed = self.pack_tiles(value)
+                elif key in ("obstacles", "transition_zones", "items"):
+                    packed = self.pack_records(key, value)
+                entry[key] = value if packed is None else packed
+            maps.append(entry)
+        meta = json.dumps({"tile_types": self.tile_names, "strings": self.strings, "maps": maps}).encode("utf-8")
+        meta_offset = self.section(meta)
+        self.body[:HEADER.size] = HEADER.pack(MAGIC, FORMAT_VERSION, HEADER.size, meta_offset, len(meta))
+        return bytes(self.body)
+
+
+def compile_maps(maps_data, output_path, layout_source=None):
+    """maps_data.json 형식 데이터를 컴파일된 파일로 저장 (임시 파일에 쓴 뒤 교체하므로 열려 있는 mmap은 그대로 유효)"""
+    data = MapCompiler().compile(maps_data, layout_source)
+    # 자동 저장 스레드와 메인 스레드가 동시에 갱신할 수 있으므로 같은 디렉터리에 겹치지 않는 임시 파일을 만듦
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(output_path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return len(data)
+
+
+def refresh_compiled(json_file, maps_data, layout_changed=True):
+    """컴파일된 파일이 이미 있으면 방금 저장한 JSON과 같은 내용으로 다시 만듦
+
+    layout_changed가 False면 (호출한 쪽이 타일/장애물/전환 존이 기존 파일과 같다고 확인한 경우)
+    그 구역은 기존 파일에서 복사하고 아이템과 나머지 값만 새로 기록함.
+    """
+    output_path = compiled_path(json_file)
+    if not os.path.exists(output_path):
+        return
+    layout_source = None
+    try:
+        if not layout_changed:
+            layout_source = CompiledMaps(output_path)
+            if len(layout_source.meta["maps"]) != len(maps_data["maps"]):
+                layout_source.close()
+                layout_source = None
+        compile_maps(maps_data, output_path, layout_source)
+    except (OSError, ValueError, KeyError) as e:
+        print("컴파일된 맵 파일 갱신 실패 (다음 실행은 JSON으로 로드):", e)
+    finally:
+        if layout_source is not None:
+            layout_source.close()
+
+
+def is_fresh(compiled_file, json_file):
+    """컴파일된 파일이 있고 JSON보다 오래되지 않았는지 (JSON이 나중에 바뀌었으면 JSON을 사용)"""
+    try:
+        compiled_time = os.path.getmtime(compiled_file)
+    except OSError:
+        return False
+    try:
+        return compiled_time >= os.path.getmtime(json_file)
+    except OSError:
+        return True
+
+
+####################################
+# 런타임 (mmap)
+####################################
+class TileRow(list):
+    """TileRows의 한 행 (값을 바꾸면 TileRows가 이 행을 보관해 다음에 읽을 때도 유지)"""
+    def __init__(self, owner, index, values):
+        super().__init__(values)
+        self.owner = owner
+        self.index = index
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.owner.changed[self.index] = self
+
+
+class TileRows:
+    """maps_data.json의 tilemap(행 리스트)처럼 쓰는 mmap 위 타일 코드 격자 (행은 읽을 때 디코딩)"""
+    def __init__(self, source, offset, cols, rows, type_names):
+        self.source = source  # CompiledMaps
+        self.offset = offset
+        self.cols = cols
+        self.rows = rows
+        self.type_names = type_names
+        self.changed = {}  # 행 번호 -> 값을 바꾼 TileRow
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(self.rows))]
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("타일 행 번호가 범위를 벗어났습니다")
+        row = self.changed.get(index)
+        if row is None:
+            start = self.offset + index * self.cols
+            row = TileRow(self, index, map(self.type_names.__getitem__, self.source.buffer[start:start + self.cols]))
+        return row
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def to_list(self):
+        return [list(row) for row in self]
+
+    def find_cells(self, tile_types):
+        """tile_types 중 하나인 칸의 (열, 행) 목록 (행을 디코딩하지 않고 코드 격자에서 찾음)"""
+        cells = []
+        region = self.source.buffer[self.offset:self.offset + self.rows * self.cols]
+        for code, tile_type in enumerate(self.type_names):
+            if tile_type not in tile_types:
+                continue
+            position = region.find(code)
+            while position != -1:
+                row, col = divmod(position, self.cols)
+                if row not in self.changed:
+                    cells.append((col, row))
+                position = region.find(code, position + 1)
+        for row, values in self.changed.items():  # 값을 바꾼 행은 파일이 아니라 보관한 행에서 찾음
+            cells += [(col, row) for col, tile_type in enumerate(values) if tile_type in tile_types]
+        return cells
+
+    def __reduce__(self):
+        # 작업 프로세스로 보낼 때: 파일이 그대로면 경로만 보내 다시 mmap (페이지 공유), 바뀌었으면 리스트로 보냄
+        if self.source.unchanged():
+            changed = {row: list(values) for row, values in self.changed.items()}
+            return (open_tile_rows, (self.source.path, self.offset, self.cols, self.rows, self.type_names, changed))
+        return (list, (self.to_list(),))
+
+
+class CompiledMaps:
+    """읽기 전용 mmap으로 연 컴파일된 맵 파일"""
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(self.path, "rb") as file:
+            self.file_id = self.stat_id(os.fstat(file.fileno()))
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buffer) < HEADER.size:
+            raise ValueError(f"맵 파일이 너무 짧습니다: {path}")
+        magic, version, header_size, meta_offset, meta_length = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"컴파일된 맵 파일이 아닙니다: {path}")
+        if version != FORMAT_VERSION or header_size != HEADER.size:
+            raise ValueError(f"지원하지 않는 맵 파일 버전입니다: {version}")
+        if meta_offset + meta_length > len(self.buffer):
+            raise ValueError(f"맵 파일이 잘렸습니다: {path}")
+        self.meta = json.loads(self.buffer[meta_offset:meta_offset + meta_length])
+
+    @staticmethod
+    def stat_id(stat):
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def unchanged(self):
+        """연 뒤로 같은 경로의 파일이 교체되지 않았는지"""
+        try:
+            return self.stat_id(os.stat(self.path)) == self.file_id
+        except OSError:
+            return False
+
+    def close(self):
+        """mmap 해제 (이 파일에서 읽은 TileRows는 더 이상 쓸 수 없음)"""
+        try:
+            self.buffer.close()
+        except BufferError:  # 아직 버퍼를 참조하는 뷰가 있으면 해제는 가비지 컬렉션에 맡김
+            pass
+
+    def records(self, packed, record):
+        start = packed["offset"]
+        return record.iter_unpack(self.buffer[start:start + packed["count"] * record.size])
+
+    def unpack(self, packed):
+        kind = packed[PACKED]
+        if kind == "tiles":
+            return TileRows(self, packed["offset"], packed["cols"], packed["rows"], self.meta["tile_types"])
+        if kind == "obstacles":
+            return [{"x": x, "y": y, "width": w, "height": h} for x, y, w, h in self.records(packed, OBSTACLE)]
+        if kind == "transition_zones":
+            return [
+                {"zone": {"x": x, "y": y, "width": w, "height": h}, "target_map": target, "start_pos": [start_x, start_y]}
+                for x, y, w, h, target, start_x, start_y in self.records(packed, ZONE)
+            ]
+        strings = self.meta["strings"]
+        return [
+            {"map_index": map_index, "position": [x, y], "type": strings[type_code], "id": item_id}
+            for x, y, item_id, map_index, type_code in self.records(packed, ITEM)
+        ]
+
+    def load_maps(self):
+        """maps_data.json의 "maps"와 같은 구조 (tilemap은 TileRows, 나머지는 일반 리스트/dict)"""
+        maps = []
+        for entry in self.meta["maps"]:
+            maps.append({
+                key: self.unpack(value) if isinstance(value, dict) and PACKED in value else value
+                for key, value in entry.items()
+            })
+        return maps
+
+
+OPEN_FILES = {}  # 경로 -> CompiledMaps (작업 프로세스에서 같은 파일을 한 번만 mmap)
+
+
+def open_tile_rows(path, offset, cols, rows, type_names, changed):
+    source = OPEN_FILES.get(path)
+    if source is None or not source.unchanged():
+        source = CompiledMaps(path)
+        OPEN_FILES[path] = source
+    tile_rows = TileRows(source, offset, cols, rows, type_names)
+    for row, values in changed.items():
+        tile_rows.changed[row] = TileRow(tile_rows, row, values)
+    return tile_rows
+
+
+def plain_maps(maps):
+    """JSON으로 저장할 수 있도록 TileRows를 일반 리스트로 바꾼 맵 목록"""
+    return [
+        dict(m, tilemap=m["tilemap"].to_list()) if isinstance(m.get("tilemap"), TileRows) else m
+        for m in maps
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="maps_data.json을 mmap으로 읽는 바이너리 맵 파일로 컴파일")
+    parser.add_argument("input", nargs="?", default="maps_data.json", help="JSON 맵 파일 경로")
+    parser.add_argument("-o", "--output", help="출력 파일 경로 (기본값: 입력 파일 이름.bin)")
+    args = parser.parse_args(argv)
+
+    output = args.output or compiled_path(args.input)
+    try:
+        with open(args.input, "r") as file:
+            maps_data = json.load(file)
+        size = compile_maps(maps_data, output)
+    except (OSError, ValueError) as e:
+        print("맵 컴파일 실패:", e)
+        return 1
+    maps = CompiledMaps(output).load_maps()
+    tiles = sum(len(m["tilemap"]) * len(m["tilemap"][0]) for m in maps if isinstance(m["tilemap"], TileRows))
+    print(f"맵 {len(maps)}개, 타일 {tiles}개 -> {output} ({size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
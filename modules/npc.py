@@ -1,10 +1,14 @@
 import pygame
 import time
+from modules.text import text_renderer
+from modules.assets import assets
+from modules.spatial import SpatialGrid
+from modules.pathfinding import follow_route
 
 npc1_path = "data/Leah.png"
 
 class NPC:
-    def __init__(self, id, name, type, map_index, x, y, dialogue):
+    def __init__(self, id, name, type, map_index, x, y, dialogue, route=None):
         self.id = id
         self.name = name
         self.type = type
@@ -23,6 +27,10 @@ class NPC:
         self.last_dialogue_end_time = 0  # 대화 종료 시간 기록
         self.dialogue_interval = 500  # 대화 간격 (밀리초)
         self.interaction = False
+        self.last_update_frame = 0  # 마지막으로 update된 NPCManager 프레임
+        self.route = route or []  # 순서대로 돌아다닐 월드 좌표 목록 (비어 있으면 제자리)
+        self.route_index = 0
+        self.speed = 60  # 이동 속도 (px/초)
 
     def interact(self, player, camera, event):
         """플레이어와 상호작용 시 대화 상자를 활성화하고 대사를 순환"""
@@ -67,24 +75,27 @@ class NPC:
             selected_item_id = camera.select_item()  # 선택된 아이템의 ID를 반환
     
             if selected_item_id is not None:  # 선택된 아이템이 있는 경우
-                selected_item = next((item for item in player.inventory if item["id"] == selected_item_id), None)
+                selected_item = player.inventory.get(selected_item_id)
                 
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  #마우스 클릭 확인
-                    if selected_item and selected_item["id"] in items:  # 판매 가능한 품목인지 확인
-                        sell_price = selected_item.get("price", 0)  # 가격 정보 가져오기 (기본값 0)
-                        if sell_price > 0 and selected_item["quantity"] > 0:
+                    if selected_item and selected_item.id in items:  # 판매 가능한 품목인지 확인
+                        sell_price = selected_item.price  # 가격 정보 (기본값 0)
+                        if sell_price > 0 and player.inventory.remove(selected_item.id):  # 아이템 개수 감소
                             player.money += sell_price  # 플레이어 돈 증가
-                            selected_item["quantity"] -= 1  # 아이템 개수 감소
 
                     
 
 
+    def draw_rect(self):
+        """스프라이트가 그려지는 월드 좌표 영역"""
+        return self.image.get_rect(topleft=(self.x, self.y - 30))
+
     def draw(self, screen, camera):
         draw_x = self.x - camera.camera_x
         draw_y = self.y - camera.camera_y
 
         #pygame.draw.rect(screen, (0, 255, 0), (draw_x, draw_y, self.width, self.height))
-        screen.blit(self.image, (draw_x, draw_y - 30))
+        camera.mark_dirty(screen.blit(self.image, (draw_x, draw_y - 30)))
 
         if self.show_dialogue:
             self.draw_dialogue_box(screen, camera)
@@ -100,13 +111,13 @@ class NPC:
         box_x = 150
         box_y = 450
 
-        pygame.draw.rect(screen, (0, 0, 0), (box_x, box_y, box_width, box_height))
+        camera.mark_dirty(pygame.draw.rect(screen, (0, 0, 0), (box_x, box_y, box_width, box_height)))
         pygame.draw.rect(screen, (255, 255, 255), (box_x, box_y, box_width, box_height), 2)
 
-        font = pygame.font.Font(None, 24)
+        font = text_renderer.get_font(None, 24)
         current_text = self.print_dialogue()
 
-        text_surface = font.render(current_text, True, (255, 255, 255))
+        text_surface = text_renderer.render(current_text, (255, 255, 255), font)
         screen.blit(text_surface, (box_x + 10, box_y + 10))
 
     def print_dialogue(self, text=None):
@@ -116,44 +127,160 @@ class NPC:
             return "...?"  # 기본값 설정
         return self.dialogue[self.current_dialogue_index]
 
-    def update(self):
-        pass
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def update(self, dt=0, pathfinder=None):
+        """경로(route)가 있으면 길찾기 서비스를 따라 다음 지점으로 이동"""
+        if pathfinder is None or self.show_dialogue:
+            return
+        follow_route(self, dt, pathfinder)
 
     def load_sprite(self):
-        sprite_sheet = pygame.image.load(self.sprite_path).convert_alpha()
+        # 같은 스프라이트를 쓰는 NPC끼리는 한 번 로드한 이미지를 공유
         frame_width = 16
         frame_height = 32
-        idle_image = pygame.Surface((frame_width, frame_height), pygame.SRCALPHA)
-        idle_image.blit(sprite_sheet, (0, 0), (0, 0, frame_width, frame_height))
-
         scale_factor = 2
-        new_width = int(frame_width * scale_factor)
-        new_height = int(frame_height * scale_factor)
-        scaled_image = pygame.transform.scale(idle_image, (new_width, new_height))
-
-        return scaled_image
+        return assets.get_image(self.sprite_path, (0, 0, frame_width, frame_height), scale_factor)
 
 
 class NPCManager:
-    def __init__(self):
+    """NPC를 맵별로 나누고 격자로 색인해, 화면 안은 매 프레임 / 근처는 몇 프레임마다 / 나머지는 드물게 update"""
+    def __init__(self, pathfinder=None, near_margin=400, near_interval=4, far_interval=60, interact_margin=5,
+                 draw_margin=64):
         self.npcs = []
-        self.updated_npcs = []
+        self.pathfinder = pathfinder  # NPC 이동에 쓰는 Pathfinder (없으면 NPC는 제자리)
+        self.updated_npcs = []  # 이번 프레임에 화면 안에 있는 현재 맵 NPC (거래 처리 대상)
         self.last_interact_time = 0
         self.interact_cooldown = 500  # 상호작용 쿨타임 (밀리초 단위, 500ms)
         self.interacting = False  # 상호작용 상태 변수 추가
+        self.near_margin = near_margin      # 화면 밖 이 거리(px)까지는 근처로 취급
+        self.near_interval = near_interval  # 근처 NPC update 간격 (프레임)
+        self.far_interval = far_interval    # 먼 NPC와 다른 맵 NPC update 간격 (프레임)
+        self.interact_margin = interact_margin  # 상호작용 판정을 충돌 판정보다 넓히는 정도
+        self.draw_margin = draw_margin  # 스프라이트가 충돌 영역 밖으로 나갈 수 있는 최대 거리
+        self.frame = 0
+        self.indexed = None  # 색인을 만든 시점의 npcs 리스트 (다시 대입되면 재색인)
+        self.indexed_count = 0
+        self.by_map = {}     # map_index -> [NPC, ...]
+        self.slots = {}
+        self.grids = {}      # map_index -> SpatialGrid (상호작용 범위 사각형)
+        self.other_maps = (None, [])  # (현재 맵, 다른 맵 NPC 목록)
+        self.current_map = None  # 마지막 update 기준 현재 맵 인덱스
+        self.simulated_maps = set()  # 작업 프로세스가 진행 중인 맵 (여기서는 update하지 않음)
+        self.dirty_npcs = set()  # 마지막 자동 저장 이후 움직인 NPC의 id (AutoSaver가 비움)
 
     def add_npc(self, npc):
+        npc.last_update_frame = self.frame  # 등록 전 프레임만큼 한꺼번에 이동하지 않도록
         self.npcs.append(npc)
 
-    def update(self, game_map):
+    def reindex(self):
+        old_slots = self.slots
+        self.indexed = self.npcs
+        self.indexed_count = len(self.npcs)
+        self.by_map = {}
+        self.slots = {}  # id(NPC) -> 맵 목록 안의 위치
+        for npc in self.npcs:
+            if id(npc) not in old_slots:  # add_npc를 거치지 않고 npcs에 들어온 NPC
+                npc.last_update_frame = self.frame
+            npcs = self.by_map.setdefault(npc.map_index, [])
+            self.slots[id(npc)] = len(npcs)
+            npcs.append(npc)
+        self.grids = {}
+        self.other_maps = (None, [])
+
+    def ensure_index(self):
+        if self.npcs is not self.indexed or len(self.npcs) != self.indexed_count:
+            self.reindex()
+
+    def npcs_on_map(self, map_index):
+        self.ensure_index()
+        return self.by_map.get(map_index, [])
+
+    def move_npc(self, npc, x, y):
+        """NPC 위치를 바꾸고 해당 맵의 격자에 반영"""
+        npc.x = x
+        npc.y = y
+        self.moved(npc)
+
+    def moved(self, npc):
+        self.dirty_npcs.add(id(npc))
+        grid = self.grids.get(npc.map_index)
+        if grid is not None and id(npc) in self.slots:
+            margin = self.interact_margin
+            grid.move(self.slots[id(npc)], npc.get_rect().inflate(margin * 2, margin * 2))
+
+    def get_grid(self, map_index):
+        self.ensure_index()
+        grid = self.grids.get(map_index)
+        if grid is None:
+            margin = self.interact_margin
+            grid = SpatialGrid()
+            grid.build([npc.get_rect().inflate(margin * 2, margin * 2) for npc in self.by_map.get(map_index, ())])
+            self.grids[map_index] = grid
+        return grid
+
+    def find_interactable(self, rect, map_index):
+        """상호작용 범위가 rect와 겹치는 첫 번째 NPC (없으면 None)"""
+        grid = self.get_grid(map_index)
+        for i in grid.query(rect):
+            if rect.colliderect(grid.rects[i]):
+                return self.by_map[map_index][i]
+        return None
+
+    def tick(self, npc, dt):
+        x, y = npc.x, npc.y
+        # 밀린 프레임은 먼 NPC의 최대 update 간격까지만 한 번에 진행 (순간이동 방지)
+        frames = min(self.frame - npc.last_update_frame, 2 * self.far_interval)
+        npc.update(dt * frames, self.pathfinder)
+        npc.last_update_frame = self.frame
+        if (npc.x, npc.y) != (x, y):
+            self.moved(npc)
+
+    def update(self, game_map, camera=None, dt=16):
+        self.ensure_index()
+        self.frame += 1
+        if self.pathfinder:
+            self.pathfinder.begin_frame()
+        frame = self.frame
         current_map = game_map.get_current_map()["map_index"]
-        self.updated_npcs.clear()
+        self.current_map = current_map
+        npcs = self.by_map.get(current_map, [])
+        grid = self.get_grid(current_map)
 
-        for npc in self.npcs:
-            if npc.map_index == current_map:
-                npc.update()
-                self.updated_npcs.append(npc)
+        # 화면 안: 매 프레임 (카메라가 없으면 현재 맵 전체)
+        if camera is None:
+            visible = list(npcs)
+        else:
+            view_rect = camera.viewport()
+            visible = [npcs[i] for i in camera.query(grid)]
+        for npc in visible:
+            self.tick(npc, dt)
+        self.updated_npcs = visible
+
+        # 화면 근처: near_interval 프레임마다 (인덱스별로 나눠서)
+        if camera is not None:
+            phase = frame % self.near_interval
+            for i in grid.query(view_rect.inflate(self.near_margin * 2, self.near_margin * 2)):
+                if i % self.near_interval == phase and npcs[i].last_update_frame != frame:
+                    self.tick(npcs[i], dt)
+
+        # 같은 맵의 먼 NPC와 다른 맵 NPC: far_interval 프레임에 걸쳐 조금씩 돌아가며
+        if self.other_maps[0] != current_map:
+            self.other_maps = (current_map, [npc for npc in self.npcs if npc.map_index != current_map])
+        phase = frame % self.far_interval
+        for group in (npcs, self.other_maps[1]):
+            for i in range(phase, len(group), self.far_interval):
+                if group[i].map_index in self.simulated_maps:
+                    continue
+                if frame - group[i].last_update_frame >= self.far_interval:
+                    self.tick(group[i], dt)
 
     def draw(self, screen, camera):
-        for npc in self.updated_npcs:
-            npc.draw(screen, camera)
\ No newline at end of file
+        """현재 맵 NPC 중 스프라이트가 화면에 걸치는 것만 그림"""
+        if self.current_map is None:
+            return
+        npcs = self.npcs_on_map(self.current_map)
+        for i in camera.query(self.get_grid(self.current_map), self.draw_margin):
+            if camera.is_visible(npcs[i].draw_rect()):
+                npcs[i].draw(screen, camera)
\ No newline at end of file
@@ -0,0 +1,305 @@
+import heapq
+import math
+from collections import OrderedDict, deque
+import pygame
+
+####################################
+# NPC 길찾기 (내비게이션 격자 + A* / 흐름장 캐시)
+####################################
+BLOCKED_TILES = {"water"}  # 걸어서 지나갈 수 없는 타일 종류
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+PENDING = "pending"  # 이번 프레임 탐색 예산을 다 써서 다음 프레임에 다시 요청해야 함
+
+
+class NavGrid:
+    """맵(또는 window 영역)을 칸으로 나눠 장애물/막힌 타일이 있는 칸을 표시한 격자
+
+    tile_rows는 격자 왼쪽 위 칸부터의 타일 종류 (None은 아직 모르는 칸으로 막힌 것으로 처리).
+    """
+    def __init__(self, map_size, cell_size, obstacle_rects, tile_rows=None, window=None):
+        self.cell_size = cell_size
+        self.bounded = window is not None  # True면 창 밖 좌표는 격자에 없음 (contains로 확인)
+        if window is None:
+            window = pygame.Rect(0, 0, map_size[0], map_size[1])
+        self.origin_col = window.left // cell_size
+        self.origin_row = window.top // cell_size
+        self.cols = max(1, -(-window.right // cell_size) - self.origin_col)
+        self.rows = max(1, -(-window.bottom // cell_size) - self.origin_row)
+        self.bounds = pygame.Rect(self.origin_col * cell_size, self.origin_row * cell_size,
+                                  self.cols * cell_size, self.rows * cell_size)
+        self.blocked = bytearray(self.cols * self.rows)
+
+        if tile_rows:
+            for row, tile_types in enumerate(tile_rows[:self.rows]):
+                for col, tile_type in enumerate(tile_types[:self.cols]):
+                    if tile_type is None or tile_type in BLOCKED_TILES:
+                        self.blocked[row * self.cols + col] = 1
+        for rect in obstacle_rects:
+            x0 = max(0, rect.left // cell_size - self.origin_col)
+            x1 = min(self.cols - 1, (rect.right - 1) // cell_size - self.origin_col)
+            y0 = max(0, rect.top // cell_size - self.origin_row)
+            y1 = min(self.rows - 1, (rect.bottom - 1) // cell_size - self.origin_row)
+            for row in range(y0, y1 + 1):
+                self.blocked[row * self.cols + x0:row * self.cols + x1 + 1] = b"\x01" * max(0, x1 - x0 + 1)
+
+    def contains(self, x, y):
+        return self.bounds.collidepoint(int(x), int(y))
+
+    def cell_at(self, x, y):
+        col = min(self.cols - 1, max(0, int(x) // self.cell_size - self.origin_col))
+        row = min(self.rows - 1, max(0, int(y) // self.cell_size - self.origin_row))
+        return row * self.cols + col
+
+    def center(self, cell):
+        row, col = divmod(cell, self.cols)
+        half = self.cell_size / 2
+        return ((self.origin_col + col) * self.cell_size + half, (self.origin_row + row) * self.cell_size + half)
+
+    def neighbors(self, cell):
+        row, col = divmod(cell, self.cols)
+        for dx, dy in NEIGHBORS:
+            x, y = col + dx, row + dy
+            if 0 <= x < self.cols and 0 <= y < self.rows:
+                neighbor = y * self.cols + x
+                if not self.blocked[neighbor]:
+                    yield neighbor
+
+    def heuristic(self, a, b):
+        row_a, col_a = divmod(a, self.cols)
+        row_b, col_b = divmod(b, self.cols)
+        return abs(col_a - col_b) + abs(row_a - row_b)
+
+
+class Pathfinder:
+    """맵별 NavGrid와 목적지별 다음 칸 표를 캐시해 여러 NPC가 공유하는 길찾기 서비스"""
+    def __init__(self, game_map, cell_size=50, max_routes=256, flow_field_requests=8,
+                 max_flow_cells=250000, frame_budget=4000, max_nodes=20000, max_grid_cells=1000000):
+        self.game_map = game_map
+        self.cell_size = cell_size                      # 타일맵이 없는 맵에서 쓰는 칸 크기
+        self.max_routes = max_routes                    # 캐시하는 목적지 수
+        self.flow_field_requests = flow_field_requests  # 이만큼 서로 다른 출발지에서 요청되면 흐름장을 생성
+        self.max_flow_cells = max_flow_cells
+        self.frame_budget = frame_budget  # 프레임당 A* 확장/흐름장 탐색에 쓸 칸 수 (남은 탐색은 다음 프레임에 이어서)
+        self.max_nodes = max_nodes        # 탐색 한 번의 노드 상한 (넘으면 도달 불가로 처리)
+        self.max_grid_cells = max_grid_cells  # 타일맵이 없는 맵은 칸 수가 이를 넘지 않게 칸을 키움
+        self.budget = frame_budget
+        self.grids = {}   # map_index -> (무효화 키, NavGrid)
+        self.routes = OrderedDict()  # (map_index, 목적지 칸) -> {칸: 다음 칸 또는 None}
+        self.flow_fields = set()     # 흐름장이 완성된 (map_index, 목적지 칸)
+        self.flow_builds = {}        # (map_index, 목적지 칸) -> 진행 중인 흐름장 (다음 칸 표, 탐색할 칸 큐)
+        self.searches = OrderedDict()  # ((map_index, 목적지 칸), 출발 칸) -> 예산이 떨어져 멈춘 A* 상태
+        self.misses = {}             # (map_index, 목적지 칸) -> 캐시 미스 횟수
+
+    def begin_frame(self):
+        self.budget = self.frame_budget
+
+    def grid_key(self, map_index):
+        """장애물 목록이나 타일 배치가 바뀌었을 때만 달라지는 값"""
+        current_map = self.game_map.maps[map_index]
+        obstacles = current_map["obstacles"]
+        tilemap = self.game_map.tilemaps.get(map_index)
+        layout = (id(tilemap), tilemap.layout_version) if tilemap else None
+        # 열린 맵은 같은 장애물 리스트에 청크 장애물을 넣고 빼므로 배치 버전도 함께 비교
+        return (tuple(current_map["size"]), self.game_map.get_layout_version(map_index), id(obstacles), len(obstacles), layout)
+
+    def get_grid(self, map_index):
+        key = self.grid_key(map_index)
+        cached = self.grids.get(map_index)
+        if cached and cached[0] == key:
+            return cached[1]
+        current_map = self.game_map.maps[map_index]
+        tilemap = self.game_map.tilemaps.get(map_index)
+        obstacle_rects = [pygame.Rect(o["x"], o["y"], o["width"], o["height"]) for o in current_map["obstacles"]]
+        if tilemap and tilemap.streamed:
+            window, tile_rows = self.loaded_window(tilemap)
+            grid = NavGrid(current_map["size"], tilemap.tile_size, obstacle_rects, tile_rows, window)
+        elif tilemap:
+            grid = NavGrid(current_map["size"], tilemap.tile_size, obstacle_rects, tilemap.to_data())
+        else:
+            cell_size = self.cell_size
+            if not current_map["tilemap"]:
+                width, height = current_map["size"]
+                cell_size = max(cell_size, math.ceil(math.sqrt(width * height / self.max_grid_cells)))
+            grid = NavGrid(current_map["size"], cell_size, obstacle_rects, current_map["tilemap"])
+        self.grids[map_index] = (key, grid)
+        self.invalidate(map_index)
+        return grid
+
+    @staticmethod
+    def loaded_window(tilemap):
+        """열린 맵은 불러온 청크를 감싸는 영역만 격자로 만듦 (그 사이의 빈 청크는 모르는 칸)"""
+        if not tilemap.chunks:
+            return pygame.Rect(0, 0, 0, 0), []
+        chunk_size = len(next(iter(tilemap.chunks.values())))  # 청크 한 변의 타일 수 (modules.map은 순환 import)
+        col_start = min(key[0] for key in tilemap.chunks)
+        row_start = min(key[1] for key in tilemap.chunks)
+        cols = (max(key[0] for key in tilemap.chunks) - col_start + 1) * chunk_size
+        rows = (max(key[1] for key in tilemap.chunks) - row_start + 1) * chunk_size
+        tile_rows = [[None] * cols for _ in range(rows)]
+        for (chunk_col, chunk_row), chunk_rows in tilemap.chunks.items():
+            col = (chunk_col - col_start) * chunk_size
+            for row, tiles in enumerate(chunk_rows, (chunk_row - row_start) * chunk_size):
+                tile_rows[row][col:col + chunk_size] = [tile.tile_type for tile in tiles]
+        chunk_pixels = chunk_size * tilemap.tile_size
+        window = pygame.Rect(col_start * chunk_pixels, row_start * chunk_pixels,
+                             cols * tilemap.tile_size, rows * tilemap.tile_size)
+        return window, tile_rows
+
+    def invalidate(self, map_index):
+        """해당 맵의 경로/흐름장 캐시를 모두 폐기"""
+        for route_key in [k for k in self.routes if k[0] == map_index]:
+            del self.routes[route_key]
+            self.forget(route_key)
+        for route_key in [k for k in self.flow_builds if k[0] == map_index]:
+            del self.flow_builds[route_key]
+        for search_key in [k for k in self.searches if k[0][0] == map_index]:
+            del self.searches[search_key]
+
+    def forget(self, route_key):
+        self.flow_fields.discard(route_key)
+        self.flow_builds.pop(route_key, None)
+        self.misses.pop(route_key, None)
+        self.drop_searches(route_key)
+
+    def drop_searches(self, route_key):
+        for search_key in [k for k in self.searches if k[0] == route_key]:
+            del self.searches[search_key]
+
+    def get_routes(self, route_key):
+        table = self.routes.get(route_key)
+        if table is None:
+            table = {route_key[1]: None}
+            self.routes[route_key] = table
+            if len(self.routes) > self.max_routes:
+                old_key, _ = self.routes.popitem(last=False)
+                self.forget(old_key)
+        else:
+            self.routes.move_to_end(route_key)
+        return table
+
+    def next_cell(self, map_index, start, goal):
+        """start 칸에서 goal 칸으로 가는 다음 칸 (도착했거나 갈 수 없으면 None, 예산 초과면 PENDING)"""
+        grid = self.get_grid(map_index)
+        route_key = (map_index, goal)
+        table = self.get_routes(route_key)
+        if start in table:
+            return table[start]
+        if route_key in self.flow_fields:
+            return None  # 흐름장에 없는 칸은 목적지와 연결되지 않음
+
+        self.misses[route_key] = self.misses.get(route_key, 0) + 1
+        if self.misses[route_key] >= self.flow_field_requests and len(grid.blocked) <= self.max_flow_cells:
+            if self.build_flow_field(grid, route_key, table):
+                return table.get(start)
+        if self.budget <= 0:
+            return PENDING
+        return self.search(grid, route_key, start, table)
+
+    def search(self, grid, route_key, start, table):
+        """A* 탐색 결과 경로 위의 모든 칸을 다음 칸 표에 기록하고 start의 다음 칸 반환
+
+        프레임 예산을 다 쓰면 탐색 상태를 남겨두고 PENDING (다음 프레임의 같은 요청이 이어서 탐색).
+        """
+        goal = route_key[1]
+        search_key = (route_key, start)
+        state = self.searches.pop(search_key, None)
+        if state is None:
+            state = ({start: None}, {start: 0}, [(grid.heuristic(start, goal), 0, start)], 0)
+        came_from, cost, queue, expanded = state
+        found = None
+        while queue and expanded < self.max_nodes:
+            if self.budget <= 0:
+                self.searches[search_key] = (came_from, cost, queue, expanded)
+                if len(self.searches) > self.max_routes:
+                    self.searches.popitem(last=False)
+                return PENDING
+            _, g, cell = heapq.heappop(queue)
+            if g > cost[cell]:
+                continue
+            expanded += 1
+            self.budget -= 1
+            if cell == goal or table.get(cell) is not None:
+                found = cell  # 목적지 또는 이미 아는 경로에 합류
+                break
+            for neighbor in grid.neighbors(cell):
+                new_cost = g + 1
+                if new_cost < cost.get(neighbor, new_cost + 1):
+                    cost[neighbor] = new_cost
+                    came_from[neighbor] = cell
+                    heapq.heappush(queue, (new_cost + grid.heuristic(neighbor, goal), new_cost, neighbor))
+
+        if found is None:
+            table[start] = None  # 도달 불가도 캐시
+            return None
+        cell = found
+        while came_from[cell] is not None:
+            table[came_from[cell]] = cell
+            cell = came_from[cell]
+        return table[start]
+
+    def build_flow_field(self, grid, route_key, table):
+        """goal에서 거꾸로 너비 우선 탐색해 연결된 모든 칸의 다음 칸을 계산
+
+        프레임 예산만큼씩 나눠 진행하고 끝나면 다음 칸 표를 바꾸고 True (그 전까지는 기존 A* 결과를 그대로 사용).
+        """
+        build = self.flow_builds.get(route_key)
+        if build is None:
+            goal = route_key[1]
+            build = ({goal: None}, deque([goal]))
+            self.flow_builds[route_key] = build
+        field, frontier = build
+        while frontier and self.budget > 0:
+            cell = frontier.popleft()
+            self.budget -= 1
+            for neighbor in grid.neighbors(cell):
+                if neighbor not in field:
+                    field[neighbor] = cell
+                    frontier.append(neighbor)
+        if frontier:
+            return False
+        del self.flow_builds[route_key]
+        table.clear()
+        table.update(field)
+        self.flow_fields.add(route_key)
+        self.drop_searches(route_key)  # 멈춰 있던 A*는 흐름장이 대신함
+        return True
+
+    def next_waypoint(self, map_index, position, goal_position):
+        """월드 좌표 기준 다음으로 향할 칸 중심 (None: 도착/도달 불가, PENDING: 다음 프레임에 재시도)"""
+        grid = self.get_grid(map_index)
+        if grid.bounded and not (grid.contains(*position) and grid.contains(*goal_position)):
+            # 격자 밖(아직 불러오지 않은 청크)은 길찾기 정보가 없으므로 목적지로 곧장 이동
+            if math.hypot(goal_position[0] - position[0], goal_position[1] - position[1]) < grid.cell_size / 2:
+                return None
+            return goal_position
+        start = grid.cell_at(*position)
+        goal = grid.cell_at(*goal_position)
+        if start == goal or grid.blocked[goal]:
+            return None
+        cell = self.next_cell(map_index, start, goal)
+        if cell is None or cell == PENDING:
+            return cell
+        return grid.center(cell)
+
+
+def follow_route(walker, dt, pathfinder):
+    """route 좌표들을 차례로 향해 dt(ms)만큼 이동 (walker: x, y, width, height, map_index, route, route_index, speed)"""
+    if not walker.route:
+        return
+    distance = walker.speed * dt / 1000
+    for _ in range(4):  # 한 번에 여러 칸을 지나치는 경우 대비
+        if distance <= 0:
+            break
+        center = (walker.x + walker.width / 2, walker.y + walker.height / 2)
+        waypoint = pathfinder.next_waypoint(walker.map_index, center, walker.route[walker.route_index])
+        if waypoint == PENDING:
+            break
+        if waypoint is None:  # 도착했거나 갈 수 없으면 다음 지점으로
+            walker.route_index = (walker.route_index + 1) % len(walker.route)
+            break
+        dx, dy = waypoint[0] - center[0], waypoint[1] - center[1]
+        length = math.hypot(dx, dy)
+        step = min(distance, length)
+        walker.x += dx / length * step
+        walker.y += dy / length * step
+        distance -= step
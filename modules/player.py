@@ -1,25 +1,69 @@
 import pygame
+from modules.assets import assets
+from modules.inventory import Inventory
 
 class SpriteSheet:
     def __init__(self, file_path, scale_factor=0.5):
-        self.sheet = pygame.image.load(file_path)
+        self.file_path = file_path
+        self.sheet = assets.load(file_path)
         self.scale_factor = scale_factor
 
-    def get_image(self, x, y, width, height):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(self.sheet, (0, 0), (x, y, width, height))
-
-        # 축소된 이미지 반환
-        if self.scale_factor != 1:
-            new_width = int(width * self.scale_factor)
-            new_height = int(height * self.scale_factor)
-            image = pygame.transform.scale(image, (new_width, new_height))
-        return image
+    def get_image(self, x, y, width, height, flip_x=False):
+        # 축소된 이미지 반환 (같은 영역은 에셋 관리자에서 재사용)
+        return assets.get_image(self.file_path, (x, y, width, height), self.scale_factor, flip_x=flip_x)
+
+# 클립 이름 -> 프레임 목록 [(x, y, 좌우 반전 여부), ...] (128x128 프레임 기준)
+PLAYER_CLIPS = {
+    "stand": [(0, 0, False), (128, 0, False), (128*2, 0, False)],
+    "walk_down": [(0, 0, False), (128, 0, False), (128*2, 0, False)],
+    "walk_up": [(0, 128*5, False), (0, 128*6, False), (128*3, 128*7, False), (128*2, 128*7, False)],
+    "walk_left": [(0, 0, True), (128, 0, True), (128*2, 0, True)],
+    "walk_right": [(0, 0, False), (128, 0, False), (128*2, 0, False)],
+    "pick_up_right": [(0, 128, False), (128, 128, False)],
+    "pick_up_left": [(0, 128, True), (128, 128, True)],
+    "level_up": [(128*i, 128*8, flip) for i in range(5) for flip in (False, True)],
+}
+
+class ClipSet:
+    """시트 하나에서 잘라낸 클립 묶음 (클립은 정수 ID로 접근)"""
+    def __init__(self, sprite_sheet, clip_frames, frame_size=128):
+        self.names = list(clip_frames)
+        self.ids = {name: clip_id for clip_id, name in enumerate(self.names)}
+        self.frames = [
+            tuple(sprite_sheet.get_image(x, y, frame_size, frame_size, flip_x=flip) for x, y, flip in frames)
+            for frames in clip_frames.values()
+        ]
+
+class ClipRegistry:
+    """같은 시트와 클립 정의를 쓰는 엔티티끼리 ClipSet을 공유"""
+    def __init__(self):
+        self.clip_sets = {}
+
+    def get(self, name, sprite_sheet, clip_frames, frame_size=128):
+        key = (name, sprite_sheet.file_path, sprite_sheet.scale_factor, frame_size)
+        clip_set = self.clip_sets.get(key)
+        if clip_set is None:
+            clip_set = ClipSet(sprite_sheet, clip_frames, frame_size)
+            self.clip_sets[key] = clip_set
+        return clip_set
+
+clip_registry = ClipRegistry()  # 게임 전체에서 공유
 
 class Animation:
-    def __init__(self, images, frame_duration):
-        self.images = images
+    def __init__(self, clip_set, clip_id, frame_duration):
+        self.clip_set = clip_set
         self.frame_duration = frame_duration
+        self.clip_id = None
+        self.play(clip_id)
+
+    def play(self, clip_id, frame_duration=None):
+        """다른 클립으로 바꿀 때만 처음 프레임부터 재생 (새 객체를 만들지 않음)"""
+        if clip_id == self.clip_id:
+            return
+        self.clip_id = clip_id
+        self.images = self.clip_set.frames[clip_id]
+        if frame_duration is not None:
+            self.frame_duration = frame_duration
         self.current_frame = 0
         self.time_counter = 0
 
@@ -33,51 +77,42 @@ class Animation:
         return self.images[self.current_frame]
 
 import pygame
+from modules.spatial import rect_from_dict, zone_rect
 
 class CollisionManager:
     def __init__(self, game_map):
         self.game_map = game_map
 
+    def get_index(self, kind, source, make_rect):
+        """현재 맵의 충돌 그리드 (그리기와 같은 인덱스를 공유)"""
+        return self.game_map.get_spatial_index(kind, source, make_rect)
+
     def check_obstacle_collision(self, player_rect, obstacles):
         """플레이어와 장애물 충돌 판정"""
-        for obstacle in obstacles:
-            # 장애물의 위치와 크기를 이용하여 pygame.Rect 객체 생성
-            obstacle_rect = pygame.Rect(obstacle["x"], obstacle["y"], obstacle["width"], obstacle["height"])
-            if player_rect.colliderect(obstacle_rect):
-                return True  # 충돌 발생
-        return False  # 충돌 없음
+        grid = self.get_index("obstacles", obstacles, rect_from_dict)
+        return grid.first_collision(player_rect) != -1
 
     def check_item_collision(self, player_rect, items):
-        """플레이어와 충돌한 아이템 반환"""
-        for item in items:
-            item_width = 40  # 기본 아이템 크기 (40x40 크기 아이템 가정)
-            item_rect = pygame.Rect(
-                item["position"][0] - 20,  # 아이템의 x 좌표
-                item["position"][1],        # 아이템의 y 좌표
-                item_width + 20,            # 아이템의 너비
-                item_width                  # 아이템의 높이
-            )
-            if player_rect.colliderect(item_rect):
-                return item  # 충돌한 아이템 반환
-        return None  # 충돌한 아이템 없음
+        """플레이어와 충돌한 아이템 반환 (items는 맵의 ItemStore)"""
+        return items.first_collision(player_rect)  # 충돌한 아이템 (없으면 None)
 
     def check_transition_zone(self, player_rect, transition_zones):
         """플레이어가 전환 존에 진입했는지 확인"""
-        for zone in transition_zones:
-            # 전환 존의 영역을 나타내는 사각형과 충돌 검사
-            zone_rect = pygame.Rect(zone["zone"]["x"], zone["zone"]["y"], zone["zone"]["width"], zone["zone"]["height"])
-            if player_rect.colliderect(zone_rect):
-                return zone  # 충돌한 전환 존 반환
-        return None  # 전환 존과 충돌 없음
+        grid = self.get_index("transition_zones", transition_zones, zone_rect)
+        index = grid.first_collision(player_rect)
+        return transition_zones[index] if index != -1 else None  # 충돌한 전환 존 (없으면 None)
 
     
-    def check_npc_collision(self, player_rect, npcs):
-        for npc in npcs:
-            npc_rect = pygame.Rect(npc.x, npc.y, npc.width, npc.height)
-            if player_rect.colliderect(npc_rect):
+    def check_npc_collision(self, player_rect, npc_manager, map_index):
+        """NPC 격자 조회 결과(인덱스)를 그대로 순회 (프레임마다 후보 리스트를 만들지 않음)"""
+        npcs = npc_manager.npcs_on_map(map_index)
+        for i in npc_manager.get_grid(map_index).query(player_rect):
+            npc = npcs[i]
+            if player_rect.colliderect(npc.x, npc.y, npc.width, npc.height):
                 return True
         return False
 
+
 class Player:
     def __init__(self, x, y, size, speed, sprite_sheet):
         self.x = x
@@ -90,7 +125,7 @@ class Player:
         self.experience = 0
         self.exp_MAX = 100
         self.money = 0
-        self.inventory = []
+        self.inventory = Inventory()
         self.color = (0, 255, 0)
         self.current_animation = "stand"
         self.hand = None  # 손에 든 아이템
@@ -101,64 +136,9 @@ class Player:
         self.pick_up_timer = 0
         self.level_up_timer = 0
 
-        # 애니메이션 초기화
-        self.animations = {
-            "stand": [
-                sprite_sheet.get_image(0, 0, 128, 128),
-                sprite_sheet.get_image(128, 0, 128, 128),
-                sprite_sheet.get_image(128*2, 0, 128, 128),
-            ],
-            "walk_down": [
-                sprite_sheet.get_image(0, 0, 128, 128),
-                sprite_sheet.get_image(128, 0, 128, 128),
-                sprite_sheet.get_image(128*2, 0, 128, 128),
-            ],
-            "walk_up": [
-                sprite_sheet.get_image(0, 128*5, 128, 128),
-                sprite_sheet.get_image(0, 128*6, 128, 128),
-                sprite_sheet.get_image(128*3, 128*7, 128, 128),
-                sprite_sheet.get_image(128*2, 128*7, 128, 128)
-            ],
-            "walk_left": [
-                pygame.transform.flip(img, True, False)
-                for img in [
-                    sprite_sheet.get_image(0, 0, 128, 128),
-                    sprite_sheet.get_image(128, 0, 128, 128),
-                    sprite_sheet.get_image(128*2, 0, 128, 128),
-                ]
-            ],
-            "walk_right": [
-                sprite_sheet.get_image(0, 0, 128, 128),
-                sprite_sheet.get_image(128, 0, 128, 128),
-                sprite_sheet.get_image(128*2, 0, 128, 128),
-            ],
-            "pick_up_right": [
-                sprite_sheet.get_image(0, 128, 128, 128),
-                sprite_sheet.get_image(128, 128, 128, 128),
-            ],
-            "pick_up_left": [
-                pygame.transform.flip(img, True, False)
-                for img in [
-                    sprite_sheet.get_image(0, 128, 128, 128),
-                    sprite_sheet.get_image(128, 128, 128, 128),
-                ]
-            ],
-            "level_up": [
-                    sprite_sheet.get_image(128*0, 128*8, 128, 128),
-                    pygame.transform.flip(sprite_sheet.get_image(128*0, 128*8, 128, 128), True, False),
-                    sprite_sheet.get_image(128*1, 128*8, 128, 128),
-                    pygame.transform.flip(sprite_sheet.get_image(128*1, 128*8, 128, 128), True, False),
-                    sprite_sheet.get_image(128*2, 128*8, 128, 128),
-                    pygame.transform.flip(sprite_sheet.get_image(128*2, 128*8, 128, 128), True, False),
-                    sprite_sheet.get_image(128*3, 128*8, 128, 128),
-                    pygame.transform.flip(sprite_sheet.get_image(128*3, 128*8, 128, 128), True, False),
-                    sprite_sheet.get_image(128*4, 128*8, 128, 128),
-                    pygame.transform.flip(sprite_sheet.get_image(128*4, 128*8, 128, 128), True, False),
-    
-            ],
-        
-        }
-        self.animator = Animation(self.animations[self.current_animation], 100)
+        # 애니메이션 초기화 (프레임은 같은 시트를 쓰는 모든 엔티티가 공유)
+        self.clips = clip_registry.get("player", sprite_sheet, PLAYER_CLIPS)
+        self.animator = Animation(self.clips, self.clips.ids[self.current_animation], 100)
 
     def move(self, keys, game_map, collision_manager, dt, npc_manager,camera,event):
     
@@ -166,7 +146,7 @@ class Player:
         map_width, map_height = current_map["size"]
         obstacles = current_map["obstacles"]
         transition_zones = current_map["transition_zones"]
-        items = current_map["items"]
+        items = game_map.get_item_store()
 
         new_x, new_y = self.x, self.y
 
@@ -211,13 +191,12 @@ class Player:
                     self.size 
                     )
 
-        if self.animator.images != self.animations[self.current_animation]:
-            self.animator = Animation(self.animations[self.current_animation], 200)
+        self.animator.play(self.clips.ids[self.current_animation], 200)
         self.animator.update(dt)
 
         # 충돌 검사: 장애물 + NPC
         if not collision_manager.check_obstacle_collision(player_rect, obstacles) and \
-            not collision_manager.check_npc_collision(player_rect, npc_manager.updated_npcs):
+            not collision_manager.check_npc_collision(player_rect, npc_manager, game_map.current_map_index):
                 self.x = new_x
                 self.y = new_y
 
@@ -255,38 +234,36 @@ class Player:
     
     def plant(self, event, game_map, current_game_time):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-            if self.inventory[0]["quantity"] > 0:
+            seed = self.inventory.selected_stack()  # 선택된 칸의 씨앗을 심음
+            if seed and seed.type == "seed" and seed.quantity > 0:
                 if game_map.plant_seed(self, self.x, self.y, current_game_time):
-                    self.inventory[0]["quantity"] -= 1
+                    self.inventory.remove(seed.id)
                     self.current_animation = "pick_up_right"
 
     def use_item(self,event):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-            self.hand = self.inventory[0]
+            self.hand = self.inventory.selected_stack()
 
     def interact_with_npcs(self, event, npc_manager,camera):
         """NPC와 상호작용을 처리"""
-        
-        for npc in npc_manager.updated_npcs:
-            npc_rect = pygame.Rect(npc.x - 5 , npc.y - 5, npc.width + 10, npc.height + 10) #충돌 판정보다 크게
-            player_rect = pygame.Rect(self.x, self.y, self.size, self.size)
-
-            if player_rect.colliderect(npc_rect):  # 충돌 감지
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_e:  # 'E' 키를 눌렀을 때
-                    if self.state == "idle" or self.state == "moving" or self.state == "talking":
-                        self.state = "talking"
-                        npc.interact(self,camera,event)  # 해당 NPC와 상호작용 호출
-                        
-                        break
-            if self.state == "selling":
+        if self.state == "selling":
+            # 거래 중이면 거래 상태인 NPC만 처리
+            for npc in npc_manager.updated_npcs:
                 npc.sell(self, camera, event)
-                        
+            return
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_e:  # 'E' 키를 눌렀을 때
+            if self.state == "idle" or self.state == "moving" or self.state == "talking":
+                player_rect = pygame.Rect(self.x, self.y, self.size, self.size)
+                npc = npc_manager.find_interactable(player_rect, npc_manager.current_map)  # 충돌 판정보다 크게
+                if npc:
+                    self.state = "talking"
+                    npc.interact(self,camera,event)  # 해당 NPC와 상호작용 호출
 
-        
     def draw(self, screen, camera):
         # 현재 애니메이션 이미지 가져오기
         current_image = self.animator.get_current_image()
-        screen.blit(current_image, (self.x - camera.camera_x - 16, self.y - camera.camera_y - 16))
+        camera.mark_dirty(screen.blit(current_image, (self.x - camera.camera_x - 16, self.y - camera.camera_y - 16)))
         
         # # 줍는 범위 사각형 계산
         # pick_up_rect = pygame.Rect(
@@ -338,18 +315,5 @@ class Player:
             self.add_experience(10)
             game_map.remove_item(item)
 
-        add_check = False
-
-        for inventory_item in self.inventory:
-            if inventory_item["id"] == item_id:
-                inventory_item["quantity"] += 1
-                add_check = True
-                break
-            
-        # inventory에 아이템이 없으면 새로 추가
-        if add_check == False:
-            self.inventory.append({
-                "id": item_id,
-                "type": item_type,
-                "quantity": 1
-            })
+        # inventory에 아이템이 없으면 새 칸으로 추가
+        self.inventory.add(item_id, 1, item_type)
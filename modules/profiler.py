@@ -0,0 +1,133 @@
+import json
+import time
+from collections import deque
+import pygame
+from modules.text import text_renderer
+
+####################################
+# 프레임 구간별 시간 측정
+####################################
+class NullScope:
+    """프로파일러가 꺼져 있을 때 쓰는 아무 일도 하지 않는 스코프"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SCOPE = NullScope()
+
+
+class TimingScope:
+    __slots__ = ("records", "name", "start")
+
+    def __init__(self, records, name):
+        self.records = records
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.records.append((self.name, self.start, time.perf_counter() - self.start))
+        return False
+
+
+class FrameProfiler:
+    """이름 붙인 구간 시간을 링 버퍼에 모아 오버레이와 Chrome trace로 보여줌"""
+    def __init__(self, capacity=300, enabled=False):
+        self.enabled = enabled
+        self.frames = deque(maxlen=capacity)  # (프레임 시작, 프레임 길이, [(이름, 시작, 길이), ...])
+        self.current = None
+        self.frame_start = 0
+        self.font = None
+        self.overlay = None
+        self.overlay_interval = 30  # 오버레이 텍스트를 다시 그리는 프레임 간격
+        self.frames_since_overlay = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = None
+        self.overlay = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = time.perf_counter()
+        self.current = []
+
+    def end_frame(self):
+        if self.current is None:
+            return
+        self.frames.append((self.frame_start, time.perf_counter() - self.frame_start, self.current))
+        self.current = None
+
+    def scope(self, name):
+        """with profiler.scope("이름"): 형태로 구간 측정 (꺼져 있으면 비용 거의 없음)"""
+        if self.current is None:
+            return NULL_SCOPE
+        return TimingScope(self.current, name)
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """버퍼에 있는 프레임 시간의 백분위수 (ms)"""
+        durations = sorted(duration for _, duration, _ in self.frames)
+        if not durations:
+            return {p: 0.0 for p in percents}
+        last = len(durations) - 1
+        return {p: durations[min(last, int(round(p / 100 * last)))] * 1000 for p in percents}
+
+    def scope_averages(self):
+        """구간별 프레임당 평균 시간 (ms)"""
+        totals = {}
+        for _, _, records in self.frames:
+            for name, _, duration in records:
+                totals[name] = totals.get(name, 0) + duration
+        count = max(1, len(self.frames))
+        return {name: total / count * 1000 for name, total in totals.items()}
+
+    def export_chrome_trace(self, path):
+        """chrome://tracing 또는 Perfetto에서 열 수 있는 trace-event JSON 저장"""
+        if not self.frames:
+            return
+        origin = self.frames[0][0]
+        events = []
+        for frame_start, frame_duration, records in self.frames:
+            events.append({
+                "name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                "ts": (frame_start - origin) * 1e6, "dur": frame_duration * 1e6,
+            })
+            for name, start, duration in records:
+                events.append({
+                    "name": name, "ph": "X", "pid": 0, "tid": 0,
+                    "ts": (start - origin) * 1e6, "dur": duration * 1e6,
+                })
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        print(f"트레이스 저장 완료: {path}")
+
+    def draw_overlay(self, screen):
+        """오버레이를 그리고 그린 영역을 반환 (꺼져 있으면 None)"""
+        if not self.enabled or not self.frames:
+            return None
+        self.frames_since_overlay += 1
+        if self.overlay is None or self.frames_since_overlay >= self.overlay_interval:
+            self.overlay = self.render_overlay()
+            self.frames_since_overlay = 0
+        return screen.blit(self.overlay, (0, screen.get_height() - self.overlay.get_height()))
+
+    def render_overlay(self):
+        if self.font is None:
+            self.font = text_renderer.get_font(None, 18, system=True)
+
+        p = self.percentiles()
+        lines = [f"frame p50 {p[50]:.2f}  p95 {p[95]:.2f}  p99 {p[99]:.2f} ms"]
+        averages = sorted(self.scope_averages().items(), key=lambda entry: entry[1], reverse=True)
+        lines += [f"{name}: {ms:.2f} ms" for name, ms in averages]
+
+        line_height = 16
+        overlay = pygame.Surface((300, len(lines) * line_height + 10), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        for i, line in enumerate(lines):
+            overlay.blit(self.font.render(line, True, (255, 255, 255)), (5, 5 + i * line_height))
+        return overlay
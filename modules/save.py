@@ -1,38 +1,76 @@
 import json
+import os
+import tempfile
+import time
 from modules.npc import NPC
 
 map_data = "game_map.json"
 
+
+def write_json_atomic(file_path, data, indent=4):
+    """임시 파일에 쓴 뒤 이름을 바꿔서, 저장 도중 종료되어도 기존 파일이 깨지지 않게 함
+    (자동 저장 스레드와 메인 스레드가 같은 파일을 저장할 수 있어 임시 파일 이름은 매번 새로 만듦)"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(file_path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
 class SaveLoad:
     @staticmethod
-    def save_game(player, map, npc_manager, file_path="game_save.json"):
+    def player_data(player, map):
+        return {
+            "map": map.current_map_index,
+            "x": player.x,
+            "y": player.y,
+            "level": getattr(player, "level", 1),
+            "experience": getattr(player, "experience", 0),
+            "health": getattr(player, "health", 100),
+            "money": getattr(player, "money", 100),
+            "inventory": player.inventory.to_data()
+        }
+
+    @staticmethod
+    def npc_data(npc_manager):
+        return [SaveLoad.npc_record(npc) for npc in npc_manager.npcs]
+
+    @staticmethod
+    def npc_record(npc):
+        return {
+            "id": npc.id,
+            "name": npc.name,
+            "type": npc.type,
+            "map": npc.map_index,
+            "x": npc.x,
+            "y": npc.y,
+            "dialogue": npc.dialogue,  # 오타 수정
+            "route": npc.route,
+        }
+
+    @staticmethod
+    def world_data(game_time):
+        """게임 시계와 저장한 실제 시각 (불러올 때 그 사이 지난 시간만큼 작물을 진행)"""
+        return {"time": game_time, "saved_at": time.time()}
+
+    @staticmethod
+    def save_game(player, map, npc_manager, file_path="game_save.json", game_time=None):
         # 플레이어 상태와 NPC 정보를 JSON 형식으로 저장
         data = {
-            "player": {
-                "map": map.current_map_index,
-                "x": player.x,
-                "y": player.y,
-                "level": getattr(player, "level", 1),
-                "experience": getattr(player, "experience", 0),
-                "health": getattr(player, "health", 100),
-                "money": getattr(player, "money", 100),
-                "inventory": getattr(player, "inventory", [])
-            },
-            "npcs": [
-                {
-                    "id": npc.id,
-                    "name": npc.name,
-                    "type": npc.type,
-                    "map": npc.map_index,
-                    "x": npc.x,
-                    "y": npc.y,
-                    "dialogue": npc.dialogue,  # 오타 수정
-                }
-                for npc in npc_manager.npcs
-            ]
+            "player": SaveLoad.player_data(player, map),
+            "npcs": SaveLoad.npc_data(npc_manager)
         }
-        with open(file_path, "w", encoding="utf-8") as file: 
-            json.dump(data, file, indent=4)
+        if game_time is not None:
+            data["world"] = SaveLoad.world_data(game_time)
+        write_json_atomic(file_path, data)
         print("게임과 NPC 정보가 저장되었습니다!")
 
     # def save_map(map, file_path=map_data):
@@ -44,19 +82,20 @@ class SaveLoad:
 
     @staticmethod
     def load_game(player, map, npc_manager, file_path="game_save.json"):
+        """저장된 게임을 불러오고 저장 당시의 world 정보를 반환 (없으면 None)"""
         try:
             with open(file_path, "r", encoding="utf-8") as file:  # UTF-8 인코딩 지정
                 data = json.load(file)
 
             # 게임 상태 로드
-            map.current_map_index = data["player"]["map"]
+            map.select_map(data["player"]["map"])
             player.x = data["player"]["x"]
             player.y = data["player"]["y"]
             player.level = data["player"].get("level", 1)
             player.experience = data["player"].get("experience", 0)
             player.health = data["player"].get("health", 100)
             player.money = data["player"].get("money", 100)
-            player.inventory = data["player"].get("inventory", [])
+            player.inventory.load(data["player"].get("inventory", []))
 
             # NPC 로드
             npc_manager.npcs = []  # 기존 NPC 리스트 초기화
@@ -69,12 +108,15 @@ class SaveLoad:
                     npc_data["map"], 
                     npc_data["x"], 
                     npc_data["y"],
-                    npc_data.get("dialogue", ["..."])  # 올바른 키로 로드
+                    npc_data.get("dialogue", ["..."]),  # 올바른 키로 로드
+                    npc_data.get("route")
                 )
                 npc_manager.add_npc(npc)  # NPC를 NPCManager에 추가
 
             print("게임과 NPC 정보가 로드되었습니다!")
+            return data.get("world")
         except FileNotFoundError:
             print("저장된 게임 파일이 없습니다.")
         except json.JSONDecodeError:
             print("저장 파일이 손상되었습니다.")
+        return None
@@ -0,0 +1,173 @@
+import bisect
+import itertools
+import pygame
+
+####################################
+# 균일 그리드 공간 인덱스
+####################################
+class SpatialGrid:
+    """사각형들을 고정 크기 셀에 등록해 주어진 영역 근처의 후보만 조회하는 균일 그리드"""
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> [entry index, ...]
+        self.rects = []
+
+    def cell_range(self, rect):
+        cell_size = self.cell_size
+        return (
+            rect.left // cell_size, (rect.right - 1) // cell_size,
+            rect.top // cell_size, (rect.bottom - 1) // cell_size,
+        )
+
+    def build(self, rects):
+        self.cells = {}
+        self.rects = list(rects)
+        for index, rect in enumerate(self.rects):
+            self.insert_cells(index, rect)
+
+    def insert_cells(self, index, rect):
+        x0, x1, y0, y1 = self.cell_range(rect)
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                self.cells.setdefault((cell_x, cell_y), []).append(index)
+
+    def move(self, index, rect):
+        """항목 하나의 사각형을 바꾸고 걸친 셀만 갱신"""
+        old_cells = self.cell_range(self.rects[index])
+        self.rects[index] = rect
+        if self.cell_range(rect) == old_cells:
+            return
+        x0, x1, y0, y1 = old_cells
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                cell = self.cells[(cell_x, cell_y)]
+                cell.remove(index)
+                if not cell:
+                    del self.cells[(cell_x, cell_y)]
+        self.insert_cells(index, rect)
+
+    def query(self, rect):
+        """rect와 같은 셀에 걸친 후보 인덱스를 등록 순서대로 반환"""
+        x0, x1, y0, y1 = self.cell_range(rect)
+        if x0 == x1 and y0 == y1:
+            return self.cells.get((x0, y0), [])
+        candidates = set()
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                candidates.update(self.cells.get((cell_x, cell_y), ()))
+        return sorted(candidates)
+
+    def first_collision(self, rect):
+        """rect와 겹치는 첫 번째 항목의 인덱스 (없으면 -1)"""
+        for index in self.query(rect):
+            if rect.colliderect(self.rects[index]):
+                return index
+        return -1
+
+
+def rect_from_dict(data):
+    return pygame.Rect(data["x"], data["y"], data["width"], data["height"])
+
+
+def zone_rect(zone):
+    return rect_from_dict(zone["zone"])
+
+
+####################################
+# 빈 공간 샘플러 (아이템 생성 위치 선택)
+####################################
+class FreeSpaceSampler:
+    """맵을 격자로 나눠 칸별 빈 면적을 미리 계산하고, 빈 면적에 비례해 칸을 고른 뒤 그 안에서 위치를 뽑는 샘플러"""
+    def __init__(self, map_size, blocked_rects, cell_size=32, max_cells=65536, max_attempts=16):
+        width, height = map_size
+        # 큰 맵에서도 칸 수가 max_cells를 넘지 않도록 칸 크기를 키움
+        while ((width // cell_size) + 1) * ((height // cell_size) + 1) > max_cells:
+            cell_size *= 2
+        self.cell_size = cell_size
+        self.cols = width // cell_size + 1   # 좌표 범위가 0~width (양 끝 포함)
+        self.rows = height // cell_size + 1
+        self.max_attempts = max_attempts
+        bounds = pygame.Rect(0, 0, width + 1, height + 1)
+
+        # 사각형과 겹치거나 맵 경계에 걸친 칸만 비트마스크로 정확히 계산
+        overlaps = {}
+        for rect in blocked_rects:
+            rect = rect.clip(bounds)
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            for cell in self.cells_in(rect):
+                overlaps.setdefault(cell, []).append(rect)
+        for col in range(self.cols):
+            overlaps.setdefault((self.rows - 1) * self.cols + col, [])
+        for row in range(self.rows):
+            overlaps.setdefault(row * self.cols + self.cols - 1, [])
+
+        self.masks = {}  # 일부만 비어 있는 칸 -> 빈 점이 1인 Mask
+        self.free_cells = []
+        weights = []
+        full_area = cell_size * cell_size
+        for cell in range(self.cols * self.rows):
+            rects = overlaps.get(cell)
+            if rects is None:
+                self.free_cells.append(cell)
+                weights.append(full_area)
+                continue
+            cell_rect = self.cell_rect(cell)
+            mask = pygame.mask.Mask((cell_size, cell_size))
+            free_rect = cell_rect.clip(bounds).move(-cell_rect.x, -cell_rect.y)
+            mask.draw(pygame.mask.Mask(free_rect.size, fill=True), free_rect.topleft)
+            for rect in rects:
+                blocked = rect.clip(cell_rect).move(-cell_rect.x, -cell_rect.y)
+                if blocked.width > 0 and blocked.height > 0:
+                    mask.erase(pygame.mask.Mask(blocked.size, fill=True), blocked.topleft)
+            count = mask.count()
+            if count == 0:
+                continue  # 완전히 막힌 칸은 후보에서 제외
+            if count < full_area:
+                self.masks[cell] = mask
+            self.free_cells.append(cell)
+            weights.append(count)
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def cells_in(self, rect):
+        cell_size = self.cell_size
+        for row in range(rect.top // cell_size, (rect.bottom - 1) // cell_size + 1):
+            for col in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+                yield row * self.cols + col
+
+    def cell_rect(self, cell):
+        row, col = divmod(cell, self.cols)
+        return pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+
+    def sample(self, rng):
+        """막히지 않은 정수 좌표 하나 (빈 곳이 전혀 없으면 None)"""
+        if not self.cumulative:
+            return None
+        index = bisect.bisect_right(self.cumulative, rng.randrange(self.cumulative[-1]))
+        cell = self.free_cells[index]
+        row, col = divmod(cell, self.cols)
+        cell_x, cell_y = col * self.cell_size, row * self.cell_size
+        mask = self.masks.get(cell)
+        if mask is None:
+            return (cell_x + rng.randrange(self.cell_size), cell_y + rng.randrange(self.cell_size))
+        for _ in range(self.max_attempts):
+            x, y = rng.randrange(self.cell_size), rng.randrange(self.cell_size)
+            if mask.get_at((x, y)):
+                return (cell_x + x, cell_y + y)
+        # 빈 점이 아주 적은 칸: 빈 점 중 하나를 직접 고름 (칸 크기에 비례하는 유한 시간)
+        target = rng.randrange(mask.count())
+        for y in range(self.cell_size):
+            for x in range(self.cell_size):
+                if mask.get_at((x, y)):
+                    if target == 0:
+                        return (cell_x + x, cell_y + y)
+                    target -= 1
+        return None
+
+    def sample_many(self, rng, count):
+        positions = []
+        for _ in range(count):
+            position = self.sample(rng)
+            if position is not None:
+                positions.append(position)
+        return positions
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+import pygame
+
+####################################
+# 공용 텍스트 렌더링 (폰트 + 렌더 결과 캐시)
+####################################
+class TextRenderer:
+    """폰트를 한 번만 로드하고, (폰트, 텍스트, 색상)별로 렌더링한 서피스를 LRU로 보관"""
+    def __init__(self, max_surfaces=512):
+        self.fonts = {}  # (이름, 크기, 시스템 폰트 여부) -> pygame.font.Font
+        self.surfaces = OrderedDict()
+        self.max_surfaces = max_surfaces
+
+    def get_font(self, name=None, size=24, system=False):
+        key = (name, size, system)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.SysFont(name, size) if system else pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, font, antialias=True):
+        """font.render와 같지만 같은 내용이면 이전 결과를 재사용"""
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)  # 가장 오래 사용하지 않은 항목 제거
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+text_renderer = TextRenderer()  # 게임 전체에서 공유
@@ -0,0 +1,290 @@
+import numpy as np
+import pygame
+
+from modules.map import (
+    TileMap, Tile, CHUNK_SIZE, TILE_COLORS, UNKNOWN_TILE_COLOR,
+    CROP_COLOR_GROWING, CROP_COLOR_MATURE, get_crop_definition,
+)
+from modules.map_binary import TileRows
+
+NO_TIME = np.iinfo(np.int64).min  # planted_time 없음
+NEVER = np.iinfo(np.int64).max    # 더 이상 성장 단계가 없음
+
+####################################
+# 배열 기반 타일 뷰
+####################################
+class TileView(Tile):
+    """ArrayTileMap의 한 칸을 Tile처럼 다루기 위한 뷰 (값은 배열에 저장)"""
+    def __init__(self, tilemap, col, row):
+        self.tilemap = tilemap
+        self.col = col
+        self.row = row
+        self.tile_size = tilemap.tile_size
+        self.x = col * tilemap.tile_size
+        self.y = row * tilemap.tile_size
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.tile_size, self.tile_size)
+
+    @property
+    def walkable(self):
+        return self.tile_type not in ['water']
+
+    def refresh_walkable(self):
+        pass  # walkable은 tile_type에서 바로 계산됨
+
+    @property
+    def tile_type(self):
+        return self.tilemap.type_names[self.tilemap.tile_types[self.row, self.col]]
+
+    @tile_type.setter
+    def tile_type(self, value):
+        self.tilemap.tile_types[self.row, self.col] = self.tilemap.type_code(value)
+        self.tilemap.refresh_cell(self.col, self.row)
+
+    @property
+    def planted_time(self):
+        value = self.tilemap.planted_times[self.row, self.col]
+        return None if value == NO_TIME else int(value)
+
+    @planted_time.setter
+    def planted_time(self, value):
+        self.tilemap.planted_times[self.row, self.col] = NO_TIME if value is None else value
+        self.tilemap.refresh_cell(self.col, self.row)
+
+    @property
+    def growth_stage(self):
+        return int(self.tilemap.growth_stages[self.row, self.col])
+
+    @growth_stage.setter
+    def growth_stage(self, value):
+        self.tilemap.growth_stages[self.row, self.col] = value
+        self.tilemap.refresh_cell(self.col, self.row)
+
+    @property
+    def crop_type(self):
+        return self.tilemap.crop_names[self.tilemap.crop_types[self.row, self.col]]
+
+    @crop_type.setter
+    def crop_type(self, value):
+        self.tilemap.crop_types[self.row, self.col] = self.tilemap.crop_code(value)
+        self.tilemap.refresh_cell(self.col, self.row)
+
+    def update_position(self, new_x, new_y):
+        self.tilemap.update_tile_position(self.x, self.y, new_x, new_y)
+
+####################################
+# 배열 기반 타일맵 (numpy structure-of-arrays)
+####################################
+class ArrayTileMap(TileMap):
+    """타일 상태를 numpy 배열에 저장하고 성장/렌더링을 벡터 연산으로 처리하는 TileMap"""
+    vectorized_growth = True
+
+    def __init__(self, map_width, map_height, tile_size=50, time_source=None):
+        super().__init__(map_width, map_height, tile_size, time_source)
+        self.type_names = list(TILE_COLORS)
+        self.type_codes = {name: code for code, name in enumerate(self.type_names)}
+        self.crop_names = [None]  # 코드 0 = 작물 없음
+        self.crop_codes = {None: 0}
+
+        shape = (map_height, map_width)
+        self.tile_types = np.zeros(shape, np.uint8)
+        self.planted_times = np.full(shape, NO_TIME, np.int64)
+        self.growth_stages = np.zeros(shape, np.uint8)
+        self.crop_types = np.zeros(shape, np.uint8)
+        self.next_stage_times = np.full(shape, NEVER, np.int64)
+        self.next_due_time = NEVER  # next_stage_times의 최솟값 (이보다 이르면 성장 검사 생략)
+        self.due_mask = np.zeros(map_width * map_height, bool)
+
+        self.rebuild_palette()
+        self.rebuild_crop_tables()
+
+    def type_code(self, tile_type):
+        code = self.type_codes.get(tile_type)
+        if code is None:
+            code = len(self.type_names)
+            self.type_names.append(tile_type)
+            self.type_codes[tile_type] = code
+            self.rebuild_palette()
+        return code
+
+    def crop_code(self, crop_type):
+        code = self.crop_codes.get(crop_type)
+        if code is None:
+            code = len(self.crop_names)
+            self.crop_names.append(crop_type)
+            self.crop_codes[crop_type] = code
+            self.rebuild_crop_tables()
+        return code
+
+    def rebuild_palette(self):
+        self.palette = np.array(
+            [TILE_COLORS.get(name, UNKNOWN_TILE_COLOR) for name in self.type_names], np.uint8
+        )
+
+    def rebuild_crop_tables(self):
+        """작물 코드별 누적 성장 시간표 (crop_code, stage) 와 단계 수"""
+        durations = [
+            get_crop_definition(name)["stage_durations"] if name is not None else []
+            for name in self.crop_names
+        ]
+        max_stages = max([len(d) for d in durations] + [1])
+        self.stage_thresholds = np.zeros((len(durations), max_stages), np.int64)
+        self.stage_counts = np.zeros(len(durations), np.int64)
+        for code, stage_durations in enumerate(durations):
+            self.stage_counts[code] = len(stage_durations)
+            self.stage_thresholds[code, :len(stage_durations)] = np.cumsum(stage_durations)
+
+    def generate(self, data):
+        self.obstacles = []
+        self.chunk_surfaces = {}
+        if isinstance(data, TileRows):
+            # 컴파일된 맵: mmap의 코드 격자를 그대로 읽고 파일의 종류 코드만 이 타일맵의 코드로 바꿈
+            lookup = np.array([self.type_code(tile_type) for tile_type in data.type_names], np.uint8)
+            codes = np.frombuffer(data.source.buffer, np.uint8, data.rows * data.cols, data.offset)
+            self.tile_types[:data.rows, :data.cols] = lookup[codes.reshape(data.rows, data.cols)]
+            rows = data.changed.items()
+        else:
+            rows = enumerate(data)
+        for row_idx, row in rows:
+            self.tile_types[row_idx, :len(row)] = [self.type_code(tile_type) for tile_type in row]
+
+        planted = self.tile_types == self.type_codes['planted soil']
+        self.planted_times[:] = NO_TIME
+        self.planted_times[planted] = self.time_source()
+        self.growth_stages[:] = 0
+        self.crop_types[:] = 0
+        self.crop_types[planted] = self.crop_code(1)
+        self.refresh_all()
+
+        if 'water' in self.type_codes:
+            for row_idx, col_idx in zip(*np.nonzero(self.tile_types == self.type_codes['water'])):
+                self.obstacles.append(pygame.Rect(
+                    int(col_idx) * self.tile_size, int(row_idx) * self.tile_size, self.tile_size, self.tile_size
+                ))
+
+    def to_data(self):
+        return np.array(self.type_names, dtype=object)[self.tile_types].tolist()
+
+    def row_types(self):
+        return enumerate(self.to_data())
+
+    def track_crop(self, tile):
+        pass  # 작물 상태가 배열에 있으므로 별도 색인이 필요 없음
+
+    def crop_state(self):
+        rows, cols = np.nonzero(self.planted_times != NO_TIME)
+        return {
+            (col, row): (int(self.planted_times[row, col]), int(self.growth_stages[row, col]),
+                         self.crop_names[self.crop_types[row, col]])
+            for row, col in zip(rows.tolist(), cols.tolist())
+        }
+
+    def get_tile(self, col, row):
+        if 0 <= row < self.map_height and 0 <= col < self.map_width:
+            return TileView(self, col, row)
+        return None
+
+    def query_visible(self, camera_x, camera_y, view_width, view_height):
+        col_start, col_end, row_start, row_end = self.visible_range(camera_x, camera_y, view_width, view_height)
+        return [TileView(self, col, row) for row in range(row_start, row_end) for col in range(col_start, col_end)]
+
+    def update_tile_position(self, old_x, old_y, new_x, new_y):
+        # 배열에서는 위치가 곧 인덱스이므로 두 칸의 상태를 교환
+        if old_x % self.tile_size or old_y % self.tile_size or new_x % self.tile_size or new_y % self.tile_size:
+            return
+        old = self.get_tile(old_x // self.tile_size, old_y // self.tile_size)
+        new = self.get_tile(new_x // self.tile_size, new_y // self.tile_size)
+        if old is None or new is None:
+            return
+        for array in (self.tile_types, self.planted_times, self.growth_stages, self.crop_types, self.next_stage_times):
+            array[old.row, old.col], array[new.row, new.col] = array[new.row, new.col], array[old.row, old.col]
+        self.mark_dirty(old)
+        self.mark_dirty(new)
+        self.layout_version += 1
+
+    def compute_next_stage_times(self, tile_types, planted_times, growth_stages, crop_types):
+        growing = (
+            (tile_types == self.type_codes['planted soil'])
+            & (crop_types != 0)
+            & (planted_times != NO_TIME)
+            & (growth_stages < self.stage_counts[crop_types])
+        )
+        stage_index = np.minimum(growth_stages, self.stage_thresholds.shape[1] - 1)
+        due = planted_times + self.stage_thresholds[crop_types, stage_index]
+        return np.where(growing, due, NEVER)
+
+    def refresh_all(self):
+        self.next_stage_times[:] = self.compute_next_stage_times(
+            self.tile_types, self.planted_times, self.growth_stages, self.crop_types
+        )
+        self.next_due_time = int(self.next_stage_times.min()) if self.next_stage_times.size else NEVER
+
+    def refresh_cell(self, col, row):
+        cell = (slice(row, row + 1), slice(col, col + 1))
+        self.next_stage_times[cell] = self.compute_next_stage_times(
+            self.tile_types[cell], self.planted_times[cell], self.growth_stages[cell], self.crop_types[cell]
+        )
+        self.next_due_time = min(self.next_due_time, int(self.next_stage_times[row, col]))
+
+    def update_growth(self, current_game_time):
+        """기한이 지난 칸만 골라 성장 단계를 한 번에 갱신"""
+        if current_game_time < self.next_due_time:
+            return
+        np.less_equal(self.next_stage_times.ravel(), current_game_time, out=self.due_mask)
+        due = np.flatnonzero(self.due_mask)
+
+        tile_types = self.tile_types.ravel()[due]
+        planted_times = self.planted_times.ravel()[due]
+        crop_types = self.crop_types.ravel()[due]
+        old_stages = self.growth_stages.ravel()[due]
+
+        elapsed = current_game_time - planted_times
+        thresholds = self.stage_thresholds[crop_types]
+        reached = (elapsed[:, None] >= thresholds) & (
+            np.arange(thresholds.shape[1]) < self.stage_counts[crop_types][:, None]
+        )
+        new_stages = np.maximum(old_stages, reached.sum(axis=1)).astype(np.uint8)
+
+        self.growth_stages.ravel()[due] = new_stages
+        self.next_stage_times.ravel()[due] = self.compute_next_stage_times(
+            tile_types, planted_times, new_stages, crop_types
+        )
+
+        self.next_due_time = int(self.next_stage_times.min())
+
+        changed = due[new_stages != old_stages]
+        rows, cols = np.divmod(changed, self.map_width)
+        chunks_per_row = -(-self.map_width // CHUNK_SIZE)
+        for chunk_id in np.unique((rows // CHUNK_SIZE) * chunks_per_row + cols // CHUNK_SIZE).tolist():
+            self.chunk_surfaces.pop((chunk_id % chunks_per_row, chunk_id // chunks_per_row), None)
+        if changed.size:
+            self.version += 1
+
+    def render_chunk(self, chunk_col, chunk_row):
+        """팔레트 조회로 청크 전체 픽셀을 한 번에 만들고 작물만 원으로 덧그림"""
+        col_start = chunk_col * CHUNK_SIZE
+        row_start = chunk_row * CHUNK_SIZE
+        cells = (slice(row_start, row_start + CHUNK_SIZE), slice(col_start, col_start + CHUNK_SIZE))
+        tile_types = self.tile_types[cells]
+
+        pixels = self.palette[tile_types.T]  # (cols, rows, 3): surfarray는 x축이 먼저
+        pixels = np.repeat(np.repeat(pixels, self.tile_size, axis=0), self.tile_size, axis=1)
+        surface = pygame.surfarray.make_surface(pixels)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+
+        crop_types = self.crop_types[cells]
+        planted = (tile_types == self.type_codes['planted soil']) & (crop_types != 0)
+        mature = self.growth_stages[cells] >= self.stage_counts[crop_types]
+        half = self.tile_size // 2
+        for row, col in zip(*np.nonzero(planted)):
+            crop_color = CROP_COLOR_MATURE if mature[row, col] else CROP_COLOR_GROWING
+            pygame.draw.circle(
+                surface,
+                crop_color,
+                (int(col) * self.tile_size + half, int(row) * self.tile_size + half),
+                self.tile_size // 4
+            )
+        return surface
@@ -0,0 +1,357 @@
+import math
+import random
+from concurrent.futures import Future
+import pygame
+from modules.map import CHUNK_SIZE, TileMap, Tile, crop_rows, make_seed_item
+from modules.spatial import rect_from_dict
+
+####################################
+# 절차적 열린 맵 (청크 단위 생성 + 스트리밍)
+####################################
+UNLOADED_CHUNK_COLOR = (20, 20, 20)  # 아직 생성되지 않은 청크 자리
+
+
+def chunk_name(chunk_key):
+    """맵 데이터(JSON)에 쓰는 청크 키 "col,row\""""
+    return f"{chunk_key[0]},{chunk_key[1]}"
+
+
+def chunk_key_of(name):
+    col, row = name.split(",")
+    return int(col), int(row)
+
+
+def hash_noise(seed, x, y):
+    """정수 좌표마다 고정된 0~1 난수 (프로세스/실행과 무관하게 같은 값)"""
+    h = (seed * 0x9E3779B1 + x * 0x85EBCA77 + y * 0xC2B2AE3D) & 0xFFFFFFFF
+    h ^= h >> 15
+    h = (h * 0x2C1B3C6D) & 0xFFFFFFFF
+    h ^= h >> 12
+    h = (h * 0x297A2D39) & 0xFFFFFFFF
+    h ^= h >> 15
+    return h / 4294967296
+
+
+def value_noise(seed, x, y, scale):
+    """scale칸 간격 격자점의 난수를 부드럽게 보간한 0~1 값"""
+    gx, gy = x / scale, y / scale
+    x0, y0 = math.floor(gx), math.floor(gy)
+    tx, ty = gx - x0, gy - y0
+    tx = tx * tx * (3 - 2 * tx)
+    ty = ty * ty * (3 - 2 * ty)
+    top = hash_noise(seed, x0, y0) + (hash_noise(seed, x0 + 1, y0) - hash_noise(seed, x0, y0)) * tx
+    bottom = hash_noise(seed, x0, y0 + 1) + (hash_noise(seed, x0 + 1, y0 + 1) - hash_noise(seed, x0, y0 + 1)) * tx
+    return top + (bottom - top) * ty
+
+
+def terrain_at(seed, col, row):
+    height = value_noise(seed, col, row, 12) * 0.7 + value_noise(seed + 1, col, row, 4) * 0.3
+    if height < 0.25:
+        return "water"
+    if height > 0.78:
+        return "stone"
+    if value_noise(seed + 2, col, row, 6) > 0.72:
+        return "soil"
+    return "grass"
+
+
+def generate_chunk(generator, map_index, chunk_col, chunk_row, tile_size):
+    """청크 하나의 타일/장애물/씨앗 아이템 (같은 seed와 좌표면 항상 같은 결과, 작업 프로세스에서 실행)"""
+    seed = generator["seed"]
+    name = chunk_name((chunk_col, chunk_row))
+    col_start, row_start = chunk_col * CHUNK_SIZE, chunk_row * CHUNK_SIZE
+    tiles = [
+        [terrain_at(seed, col_start + col, row_start + row) for col in range(CHUNK_SIZE)]
+        for row in range(CHUNK_SIZE)
+    ]
+
+    rng = random.Random(f"{seed}:{name}")
+    chunk_pixels = CHUNK_SIZE * tile_size
+    chunk_rect = pygame.Rect(col_start * tile_size, row_start * tile_size, chunk_pixels, chunk_pixels)
+    clear_rects = [rect_from_dict(rect) for rect in generator.get("clear", [])]  # 도착 지점 등 비워둘 영역
+    obstacle_rects = []
+    for _ in range(rng.randint(0, generator.get("max_obstacles", 2))):
+        width, height = rng.randint(40, 120), rng.randint(40, 120)
+        rect = pygame.Rect(chunk_rect.x + rng.randrange(chunk_pixels - width),
+                           chunk_rect.y + rng.randrange(chunk_pixels - height), width, height)
+        if rect.collidelist(clear_rects) == -1 and rect.collidelist(obstacle_rects) == -1:
+            obstacle_rects.append(rect)
+
+    items = []
+    for _ in range(rng.randint(0, generator.get("max_items", 1))):
+        position = [chunk_rect.x + rng.randrange(chunk_pixels - 40), chunk_rect.y + rng.randrange(chunk_pixels - 40)]
+        if pygame.Rect(position, (40, 40)).collidelist(obstacle_rects) == -1:
+            item = make_seed_item(map_index, position, rng)
+            item["chunk"] = name
+            items.append(item)
+
+    obstacles = [
+        {"x": rect.x, "y": rect.y, "width": rect.width, "height": rect.height, "chunk": name}
+        for rect in obstacle_rects
+    ]
+    return {"tiles": tiles, "obstacles": obstacles, "items": items}
+
+
+class StreamedTileMap(TileMap):
+    """generator 설정으로 청크를 만들어 카메라 주변만 메모리에 두는 열린 맵 (수정된 청크는 맵 데이터에 보관)"""
+    streamed = True
+
+    def __init__(self, game_map, map_data, tile_size, executor, preload_chunks=2, keep_chunks=4,
+                 max_pending=8, max_loads_per_frame=2):
+        width, height = map_data["size"]
+        super().__init__(width // tile_size, height // tile_size, tile_size, game_map.time_source)
+        self.game_map = game_map
+        self.map_data = map_data
+        self.map_index = map_data["map_index"]
+        self.generator = map_data["generator"]
+        self.saved_chunks = map_data.setdefault("chunks", {})  # "col,row" -> 수정된 청크 기록
+        self.executor = executor  # generate_chunk를 실행할 Executor (Map이 공유)
+        self.preload_chunks = preload_chunks    # 화면 밖으로 미리 생성할 청크 수 (이동 방향은 두 배)
+        self.keep_chunks = keep_chunks          # 화면 밖으로 이 청크 수를 넘으면 언로드
+        self.max_pending = max_pending          # 동시에 생성 요청할 청크 수
+        self.max_loads_per_frame = max_loads_per_frame  # 프레임당 반영할 청크 수 (프레임 시간 상한)
+        self.chunks = {}          # (chunk_col, chunk_row) -> 타일 행 목록
+        self.chunk_obstacles = {}  # (chunk_col, chunk_row) -> 맵 데이터에 추가한 장애물
+        self.chunk_items = {}      # (chunk_col, chunk_row) -> 맵 데이터에 추가한 아이템
+        self.pending = {}          # (chunk_col, chunk_row) -> Future
+        self.modified = set()      # 불러온 뒤 타일/작물이 바뀐 청크
+        # 자동 저장이 아직 기록하지 않은 청크 이름 (TileMap이 언로드되어도 남도록 Map이 보관)
+        self.unsaved = game_map.pending_chunk_changes.setdefault(self.map_index, set())
+        self.last_center = None
+        self.direction = (0, 0)
+
+        # 이전에 저장된 청크 장애물/아이템은 청크를 불러올 때 다시 추가됨
+        map_data["obstacles"][:] = [o for o in map_data["obstacles"] if "chunk" not in o]
+        map_data["items"][:] = [item for item in map_data["items"] if "chunk" not in item]
+
+    def tile_count(self):
+        return len(self.chunks) * CHUNK_SIZE * CHUNK_SIZE  # 타일 전체 목록(tiles)은 만들지 않음
+
+    def to_data(self):
+        return []  # 타일은 청크 기록(chunks)으로 저장
+
+    def get_tile(self, col, row):
+        rows = self.chunks.get((col // CHUNK_SIZE, row // CHUNK_SIZE))
+        if rows is None or col < 0 or row < 0:
+            return None
+        return rows[row % CHUNK_SIZE][col % CHUNK_SIZE]
+
+    def query_visible(self, camera_x, camera_y, view_width, view_height):
+        col_start, col_end, row_start, row_end = self.visible_range(camera_x, camera_y, view_width, view_height)
+        visible_tiles = []
+        for row in range(row_start, row_end):
+            for col in range(col_start, col_end):
+                tile = self.get_tile(col, row)
+                if tile is not None:
+                    visible_tiles.append(tile)
+        return visible_tiles
+
+    def render_chunk(self, chunk_col, chunk_row):
+        rows = self.chunks.get((chunk_col, chunk_row))
+        chunk_pixels = CHUNK_SIZE * self.tile_size
+        surface = pygame.Surface((chunk_pixels, chunk_pixels))
+        if rows is None:
+            surface.fill(UNLOADED_CHUNK_COLOR)
+            return surface
+        origin_x = chunk_col * chunk_pixels
+        origin_y = chunk_row * chunk_pixels
+        for row in rows:
+            for tile in row:
+                tile.draw(surface, self.tile_size, origin_x, origin_y)
+        return surface
+
+    def mark_dirty(self, tile):
+        super().mark_dirty(tile)
+        chunk_key = (tile.x // self.tile_size // CHUNK_SIZE, tile.y // self.tile_size // CHUNK_SIZE)
+        self.modified.add(chunk_key)
+        if self.game_map.autosaver is not None:
+            self.unsaved.add(chunk_name(chunk_key))
+
+    ####################################
+    # 스트리밍
+    ####################################
+    def chunk_range(self, rect, margin):
+        chunk_pixels = CHUNK_SIZE * self.tile_size
+        max_col = (self.map_width - 1) // CHUNK_SIZE
+        max_row = (self.map_height - 1) // CHUNK_SIZE
+        dx, dy = self.direction
+        return (
+            max(0, rect.left // chunk_pixels - margin * (2 if dx < 0 else 1)),
+            min(max_col, (rect.right - 1) // chunk_pixels + margin * (2 if dx > 0 else 1)),
+            max(0, rect.top // chunk_pixels - margin * (2 if dy < 0 else 1)),
+            min(max_row, (rect.bottom - 1) // chunk_pixels + margin * (2 if dy > 0 else 1)),
+        )
+
+    def stream(self, view_rect):
+        """view_rect(월드 좌표) 주변 청크를 생성 요청/반영하고 먼 청크는 언로드 (매 프레임 호출)"""
+        center = view_rect.center
+        if self.last_center is not None:
+            dx, dy = center[0] - self.last_center[0], center[1] - self.last_center[1]
+            self.direction = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+        self.last_center = center
+
+        self.collect_chunks()
+
+        # 맵에 처음 들어온 경우만 화면 중앙 청크를 이 프레임에서 바로 생성
+        # (그 뒤로는 중앙 청크를 먼저 요청하고 도착할 때까지 빈 청크 색을 그림)
+        chunk_pixels = CHUNK_SIZE * self.tile_size
+        center_key = (center[0] // chunk_pixels, center[1] // chunk_pixels)
+        if center_key not in self.chunks:
+            if not self.chunks:
+                if center_key in self.pending:
+                    self.pending.pop(center_key).cancel()
+                self.load_chunk(center_key, generate_chunk(self.generator, self.map_index, center_key[0], center_key[1], self.tile_size))
+            elif center_key not in self.pending:
+                self.request_chunk(center_key)  # 동시 요청 수(max_pending)와 상관없이 요청
+
+        # 가까운 청크부터 생성 요청
+        col_start, col_end, row_start, row_end = self.chunk_range(view_rect, self.preload_chunks)
+        missing = [
+            (col, row)
+            for row in range(row_start, row_end + 1)
+            for col in range(col_start, col_end + 1)
+            if (col, row) not in self.chunks and (col, row) not in self.pending
+        ]
+        missing.sort(key=lambda key: abs(key[0] - center_key[0]) + abs(key[1] - center_key[1]))
+        for chunk_key in missing[:max(0, self.max_pending - len(self.pending))]:
+            self.request_chunk(chunk_key)
+
+        # 멀어진 청크 언로드 / 필요 없어진 요청 취소
+        col_start, col_end, row_start, row_end = self.chunk_range(view_rect, self.keep_chunks)
+        far = [key for key in self.chunks if not (col_start <= key[0] <= col_end and row_start <= key[1] <= row_end)]
+        for chunk_key in [key for key in self.pending if not (col_start <= key[0] <= col_end and row_start <= key[1] <= row_end)]:
+            self.pending.pop(chunk_key).cancel()
+        if far:
+            self.unload_chunks(far)
+
+    def request_chunk(self, chunk_key):
+        args = (self.generator, self.map_index, chunk_key[0], chunk_key[1], self.tile_size)
+        if self.executor is not None:
+            try:
+                self.pending[chunk_key] = self.executor.submit(generate_chunk, *args)
+                return
+            except RuntimeError as e:  # 작업 프로세스가 비정상 종료된 경우 (BrokenProcessPool 포함)
+                print("청크 생성 프로세스를 사용할 수 없어 직접 생성합니다:", e)
+                self.executor = None
+        future = Future()
+        future.set_result(generate_chunk(*args))
+        self.pending[chunk_key] = future
+
+    def collect_chunks(self):
+        """생성이 끝난 청크를 프레임당 max_loads_per_frame개까지 반영"""
+        loaded = 0
+        for chunk_key in [key for key, future in self.pending.items() if future.done()]:
+            if loaded >= self.max_loads_per_frame:
+                break
+            future = self.pending.pop(chunk_key)
+            if future.cancelled():
+                continue
+            self.load_chunk(chunk_key, future.result())
+            loaded += 1
+        return loaded > 0
+
+    def load_chunk(self, chunk_key, data):
+        name = chunk_name(chunk_key)
+        record = self.saved_chunks.get(name)
+        tile_types = record["tiles"] if record else data["tiles"]
+        col_start, row_start = chunk_key[0] * CHUNK_SIZE, chunk_key[1] * CHUNK_SIZE
+        current_time = self.time_source()
+        rows = [
+            [Tile((col_start + col) * self.tile_size, (row_start + row) * self.tile_size, tile_type, self.tile_size,
+                  current_time)
+             for col, tile_type in enumerate(row_types)]
+            for row, row_types in enumerate(tile_types)
+        ]
+        self.chunks[chunk_key] = rows
+        if record:
+            for col, row, planted_time, growth_stage, crop_type in record["crops"]:
+                tile = rows[row - row_start][col - col_start]
+                tile.planted_time, tile.growth_stage, tile.crop_type = planted_time, growth_stage, crop_type
+
+        game_map = self.game_map
+        self.chunk_obstacles[chunk_key] = data["obstacles"]
+        self.map_data["obstacles"].extend(data["obstacles"])  # 같은 리스트를 유지 (충돌/길찾기 인덱스는 맵 버전으로 갱신)
+        items = record["items"] if record else data["items"]
+        self.chunk_items[chunk_key] = items
+        store = game_map.get_item_store(self.map_index)
+        for item in items:
+            store.add(item)
+        game_map.mark_map_changed(self.map_index)
+
+        for row in rows:
+            for tile in row:
+                if tile.planted_time is not None:
+                    self.planted.add(tile)
+                    game_map.growth_scheduler.schedule(self, tile)
+        self.chunk_surfaces.pop(chunk_key, None)
+        self.version += 1
+        self.layout_version += 1
+
+    def items_changed(self, chunk_key):
+        store = self.game_map.get_item_store(self.map_index)
+        return any(store.id_of(item) is None for item in self.chunk_items[chunk_key])
+
+    def chunk_record(self, chunk_key):
+        """청크의 현재 타일/작물/아이템 (맵 데이터 chunks 항목 형식)"""
+        rows = self.chunks[chunk_key]
+        store = self.game_map.get_item_store(self.map_index)
+        return {
+            "tiles": [[tile.tile_type for tile in row] for row in rows],
+            "crops": crop_rows({
+                (tile.x // self.tile_size, tile.y // self.tile_size): (tile.planted_time, tile.growth_stage, tile.crop_type)
+                for row in rows for tile in row if tile.planted_time is not None
+            }),
+            "items": [item for item in self.chunk_items[chunk_key] if store.id_of(item) is not None],
+        }
+
+    def save_chunks(self):
+        """불러온 청크 중 바뀐 것을 맵 데이터에 기록"""
+        for chunk_key in self.chunks:
+            if chunk_key in self.modified or self.items_changed(chunk_key):
+                self.saved_chunks[chunk_name(chunk_key)] = self.chunk_record(chunk_key)
+
+    def unload_chunks(self, chunk_keys):
+        game_map = self.game_map
+        removed_tiles = set()
+        removed_obstacles = set()
+        store = game_map.get_item_store(self.map_index)
+        for chunk_key in chunk_keys:
+            if chunk_key in self.modified or self.items_changed(chunk_key):
+                name = chunk_name(chunk_key)
+                self.saved_chunks[name] = self.chunk_record(chunk_key)
+                if game_map.autosaver is not None:
+                    self.unsaved.add(name)
+            self.modified.discard(chunk_key)
+            for row in self.chunks.pop(chunk_key):
+                removed_tiles.update(row)
+            removed_obstacles.update(id(o) for o in self.chunk_obstacles.pop(chunk_key))
+            for item in self.chunk_items.pop(chunk_key):
+                store.remove(item)
+            self.chunk_surfaces.pop(chunk_key, None)
+        obstacles = self.map_data["obstacles"]
+        obstacles[:] = [o for o in obstacles if id(o) not in removed_obstacles]
+        self.planted.difference_update(removed_tiles)  # 성장 큐에 남은 항목은 꺼낼 때 버려짐
+        game_map.mark_map_changed(self.map_index)
+        self.version += 1
+        self.layout_version += 1
+
+    def unload_all(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        if self.chunks:
+            self.unload_chunks(list(self.chunks))
+
+    def journal_records(self, names):
+        """자동 저장용: 이름별 청크 기록 (불러온 청크는 현재 상태로)"""
+        for chunk_key in self.chunks:
+            if self.items_changed(chunk_key):
+                names.add(chunk_name(chunk_key))
+        records = {}
+        for name in names:
+            chunk_key = chunk_key_of(name)
+            if chunk_key in self.chunks:
+                records[name] = self.chunk_record(chunk_key)
+            elif name in self.saved_chunks:
+                records[name] = self.saved_chunks[name]
+        return records
@@ -0,0 +1,375 @@
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from modules.map import crop_stage_at, make_seed_item
+from modules.pathfinding import Pathfinder, follow_route
+from modules.spatial import FreeSpaceSampler, rect_from_dict
+
+####################################
+# 화면 밖 맵 시뮬레이션 (작업 프로세스)
+####################################
+class MapState:
+    """작업 프로세스에서 Pathfinder가 읽는 최소한의 맵 정보"""
+    def __init__(self, map_data):
+        self.maps = {map_data["map_index"]: map_data}
+        self.tilemaps = {}
+
+    def get_layout_version(self, map_index):
+        return 0  # 배치가 바뀌면 메인이 전체를 다시 보내 새로 만듦
+
+
+class RouteWalker:
+    """작업 프로세스에서 이동시키는 NPC 위치/경로"""
+    def __init__(self, map_index, x, y, width, height, route, route_index, speed):
+        self.map_index = map_index
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.route = route
+        self.route_index = route_index
+        self.speed = speed
+
+
+class WorkerMap:
+    """작업 프로세스에 남겨두는 맵별 상태 (배치, NPC 위치, 길찾기/빈 공간 캐시)"""
+    def __init__(self, layout):
+        self.layout = layout
+        self.version = 0
+        self.walkers = {}  # NPC 키 -> RouteWalker
+        self.pathfinder = None
+        self.sampler = None
+
+    def get_pathfinder(self):
+        if self.pathfinder is None:
+            self.pathfinder = Pathfinder(MapState(self.layout), frame_budget=float("inf"))
+        return self.pathfinder
+
+    def get_sampler(self):
+        if self.sampler is None:
+            layout = self.layout
+            blocked = [rect_from_dict(obstacle) for obstacle in layout["obstacles"]]
+            blocked += [rect_from_dict(zone["zone"]) for zone in layout["transition_zones"]]
+            self.sampler = FreeSpaceSampler(layout["size"], blocked)
+        return self.sampler
+
+
+WORKER_MAPS = {}  # map_index -> WorkerMap (작업 프로세스 안에서만 사용)
+
+
+def simulate_map(job, npc_step=200):
+    """맵 상태를 start~end(게임 시간 ms)만큼 진행해 바뀐 부분만 돌려줌 (작업 프로세스에서 실행)
+
+    배치(layout)는 처음이나 바뀌었을 때만, NPC는 새로 생기거나 메인에서 바뀐 것만 받음.
+    이 프로세스에 맞는 버전의 상태가 없으면 missing을 돌려주고 메인이 전체를 다시 보냄.
+    """
+    map_index = job["map_index"]
+    start, end = job["start"], job["end"]
+    result = {"map_index": map_index, "end": end, "missing": False,
+              "crops": [], "items": [], "npcs": {}, "seed_timer": None}
+    state = WORKER_MAPS.get(map_index)
+    if job["layout"] is not None:
+        state = WorkerMap(job["layout"])
+        WORKER_MAPS[map_index] = state
+    elif state is None or state.version != job["base_version"]:
+        result["missing"] = True
+        return result
+    state.version = job["version"]
+    rng = random.Random(job["rng_seed"])
+
+    # 작물 성장 (기한이 된 타일만 받아 같은 순서로 단계를 돌려줌)
+    result["crops"] = [
+        crop_stage_at(crop_type, planted_time, growth_stage, end)
+        for planted_time, growth_stage, crop_type in job["crops"]
+    ]
+
+    # 씨앗 맵 재생성 (SeedManager.update와 같은 규칙)
+    seeds = job["seeds"]
+    if seeds is not None:
+        seed_count = seeds["count"]
+        timer = seeds["timer"]
+        spawn = 0
+        if seed_count == 0:
+            spawn = seeds["max_seeds"]
+            timer = end
+        while seed_count + spawn < seeds["max_seeds"] and end - timer >= seeds["spawn_interval"]:
+            timer += seeds["spawn_interval"]
+            spawn += 1
+        if spawn:
+            result["items"] = [make_seed_item(map_index, seed_position, rng)
+                               for seed_position in state.get_sampler().sample_many(rng, spawn)]
+        result["seed_timer"] = timer
+
+    # NPC 경로 이동
+    walkers = state.walkers
+    for key in job["removed"]:
+        walkers.pop(key, None)
+    for key, npc in job["npcs"].items():
+        walkers[key] = RouteWalker(map_index, *npc)
+    if walkers:
+        pathfinder = state.get_pathfinder()
+        before = {key: (walker.x, walker.y, walker.route_index) for key, walker in walkers.items()}
+        elapsed = 0
+        while elapsed < end - start:
+            dt = min(npc_step, end - start - elapsed)
+            for walker in walkers.values():
+                follow_route(walker, dt, pathfinder)
+            elapsed += dt
+        for key, walker in walkers.items():
+            position = (walker.x, walker.y, walker.route_index)
+            if position != before[key]:
+                result["npcs"][key] = position
+    return result
+
+
+def npc_snapshot(npc):
+    """작업 프로세스에 보낸 NPC 상태와 비교하는 값 (경로는 리스트 객체 기준)"""
+    return (npc.x, npc.y, npc.width, npc.height, id(npc.route), npc.route_index, npc.speed)
+
+
+class WorldSimulator:
+    """현재 맵이 아닌 맵을 일정 간격(게임 시간)마다 작업 프로세스에서 진행시키고 끝난 결과를 반영
+
+    맵마다 같은 작업 프로세스에 보내 배치/NPC 상태를 그쪽에 남겨두고, 간격마다 바뀐 부분만 주고받음.
+    작업 중인 맵은 작물 성장(GrowthScheduler.pause)과 NPC update를 메인에서 하지 않음.
+    """
+    def __init__(self, game_map, npc_manager, seed_manager, tick_interval=1000, workers=1, seed=None):
+        self.game_map = game_map
+        self.npc_manager = npc_manager
+        self.seed_manager = seed_manager
+        self.tick_interval = tick_interval  # 시뮬레이션 간격 (게임 시간 ms)
+        self.rng = random.Random(seed)
+        # 작업 프로세스는 처음 작업을 보낼 때 띄움 (맵마다 map_index % workers 번째 프로세스가 맡음)
+        # spawn 방식이므로 실행 스크립트는 if __name__ == "__main__": 아래에서 게임을 시작해야 함
+        self.executors = [None] * max(1, workers)
+        self.enabled = True
+        self.jobs = {}        # map_index -> 진행 중인 작업 (Future, 보낸 타일/NPC)
+        self.sent = {}        # map_index -> 작업 프로세스에 있는 상태 (배치 키, 버전, NPC 스냅샷)
+        self.owned = {}       # map_index -> 성장을 멈춰둔 TileMap (없으면 None)
+        self.last_times = {}  # map_index -> 마지막으로 시뮬레이션한 게임 시간
+        self.seed_timers = {}
+        self.last_tick = None
+        game_map.simulator = self
+
+    def owns(self, map_index):
+        return map_index in self.owned
+
+    def update(self, game_time):
+        # 끝난 작업만 반영 (기다리지 않음)
+        for map_index in [i for i, job in self.jobs.items() if job["future"].done()]:
+            self.merge(map_index)
+        if not self.enabled:
+            self.release_all()  # 남은 작업만 돌려받음
+            return
+        if self.last_tick is not None and game_time - self.last_tick < self.tick_interval:
+            return
+        self.last_tick = game_time
+        current_map_index = self.game_map.current_map_index
+        for m in self.game_map.maps:
+            map_index = m["map_index"]
+            if map_index != current_map_index and map_index not in self.jobs:
+                self.submit(map_index, game_time)
+                if not self.enabled:
+                    break
+
+    def get_executor(self, map_index):
+        slot = map_index % len(self.executors)
+        if self.executors[slot] is None:
+            self.executors[slot] = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self.executors[slot]
+
+    def own(self, map_index, tilemap):
+        """맵을 작업 프로세스 쪽으로 가져옴 (TileMap이 바뀌었으면 새 TileMap의 성장을 멈춤)"""
+        scheduler = self.game_map.growth_scheduler
+        previous = self.owned.get(map_index)
+        if map_index in self.owned and previous is tilemap:
+            return
+        if previous is not None:
+            scheduler.resume(previous)
+        if tilemap is not None:
+            scheduler.pause(tilemap)
+        self.owned[map_index] = tilemap
+        self.npc_manager.simulated_maps.add(map_index)
+
+    def layout_key(self, map_index, tilemap, with_tiles):
+        current_map = self.game_map.maps[map_index]
+        tiles = None
+        if with_tiles:
+            tiles = (id(tilemap), tilemap.layout_version) if tilemap else id(current_map["tilemap"])
+        return (tuple(current_map["size"]), self.game_map.get_layout_version(map_index), tiles)
+
+    def submit(self, map_index, game_time):
+        game_map = self.game_map
+        current_map = game_map.maps[map_index]
+        tilemap = game_map.tilemaps.get(map_index)
+        npcs = [npc for npc in self.npc_manager.npcs_on_map(map_index) if npc.route]
+        seeds = None
+        if current_map["type"] == "seed map":
+            seeds = {
+                "max_seeds": self.seed_manager.max_seeds,
+                "spawn_interval": self.seed_manager.spawn_interval,
+                "timer": self.seed_timers.get(map_index, game_time),
+                "count": game_map.get_item_store(map_index).count("seed"),
+            }
+        planted = tilemap is not None and bool(tilemap.planted)
+        if not planted and not npcs and seeds is None and map_index not in self.owned:
+            return  # 진행시킬 것이 없는 맵
+        self.own(map_index, tilemap)
+        start = self.last_times.setdefault(map_index, game_time)
+        tiles = game_map.growth_scheduler.take_paused(tilemap) if tilemap is not None else []
+        if not tiles and not npcs and seeds is None:
+            self.last_times[map_index] = game_time
+            return
+
+        # 작업 프로세스에 없는 것만 보냄 (배치가 바뀌었으면 전체)
+        layout_key = self.layout_key(map_index, tilemap, bool(npcs))
+        sent = self.sent.get(map_index)
+        layout = None
+        if sent is None or sent["layout_key"] != layout_key:
+            sent = {"layout_key": layout_key, "version": 0, "npcs": {}}
+            layout = {
+                "map_index": map_index,
+                "size": current_map["size"],
+                "obstacles": current_map["obstacles"],
+                "transition_zones": current_map["transition_zones"],
+                "tilemap": (tilemap.to_data() if tilemap else current_map["tilemap"]) if npcs else [],
+            }
+        snapshots = sent["npcs"]
+        changed = {}
+        current = {}
+        for npc in npcs:
+            key = id(npc)
+            snapshot = npc_snapshot(npc)
+            current[key] = (npc, snapshot)
+            previous = snapshots.get(key)
+            if previous is None or previous[1] != snapshot:
+                changed[key] = (npc.x, npc.y, npc.width, npc.height, npc.route, npc.route_index, npc.speed)
+        removed = [key for key in snapshots if key not in current]
+        base_version = sent["version"]
+        sent["version"] = base_version + 1
+        sent["npcs"] = current
+        self.sent[map_index] = sent
+
+        job = {
+            "map_index": map_index,
+            "layout": layout,
+            "base_version": base_version,
+            "version": sent["version"],
+            "crops": [(tile.planted_time, tile.growth_stage, tile.crop_type) for tile in tiles],
+            "npcs": changed,
+            "removed": removed,
+            "seeds": seeds,
+            "start": start,
+            "end": game_time,
+            "rng_seed": self.rng.getrandbits(32),
+        }
+        try:
+            future = self.get_executor(map_index).submit(simulate_map, job)
+        except RuntimeError as e:  # 작업 프로세스가 비정상 종료된 경우 (BrokenProcessPool 포함)
+            print("화면 밖 맵 시뮬레이션을 중단합니다:", e)
+            self.enabled = False
+            self.sent.pop(map_index, None)
+            self.reschedule(tilemap, tiles)
+            return
+        self.jobs[map_index] = {"future": future, "tilemap": tilemap, "tiles": tiles,
+                                "crops": job["crops"], "npcs": current}
+
+    def reschedule(self, tilemap, tiles):
+        """보냈던 타일을 다시 성장 큐에 넣음 (멈춰둔 맵이면 기한이 된 뒤 다시 미뤄짐)"""
+        if tilemap is None or not tilemap.scheduled:
+            return
+        for tile in tiles:
+            self.game_map.growth_scheduler.schedule(tilemap, tile)
+
+    def merge(self, map_index):
+        """작업 결과 중 바뀐 타일/새 아이템/움직인 NPC만 반영 (끝나지 않았으면 기다림)"""
+        job = self.jobs.pop(map_index)
+        game_map = self.game_map
+        try:
+            result = job["future"].result()
+        except Exception as e:
+            print("화면 밖 맵 시뮬레이션 실패:", map_index, e)
+            result = None
+        tilemap = job["tilemap"]
+        if result is None or result["missing"]:
+            # 작업 프로세스에 상태가 없으면 다음 간격에 전체를 다시 보내 같은 구간부터 진행
+            self.sent.pop(map_index, None)
+            self.reschedule(tilemap, job["tiles"])
+            return
+
+        self.last_times[map_index] = result["end"]
+        if result["seed_timer"] is not None:
+            self.seed_timers[map_index] = result["seed_timer"]
+        if result["items"]:
+            store = game_map.get_item_store(map_index)
+            for item in result["items"]:
+                store.add(item)
+            game_map.mark_map_changed(map_index, items_only=True)
+
+        if tilemap is not None and tilemap.scheduled:
+            for tile, (planted_time, growth_stage, _), stage in zip(job["tiles"], job["crops"], result["crops"]):
+                # 작업 중에 수확/재파종된 타일은 그대로 둠
+                if (tile in tilemap.planted and tile.planted_time == planted_time
+                        and tile.growth_stage == growth_stage and stage != growth_stage):
+                    tile.growth_stage = stage
+                    tilemap.mark_dirty(tile)
+            self.reschedule(tilemap, job["tiles"])
+
+        sent = self.sent.get(map_index)
+        npc_manager = self.npc_manager
+        for key, (x, y, route_index) in result["npcs"].items():
+            npc, _ = job["npcs"][key]
+            npc.route_index = route_index
+            npc_manager.move_npc(npc, x, y)
+            if sent is not None and key in sent["npcs"]:
+                sent["npcs"][key] = (npc, npc_snapshot(npc))
+        for npc, _ in job["npcs"].values():
+            npc.last_update_frame = npc_manager.frame  # 돌아온 뒤 밀린 시간을 한꺼번에 이동하지 않도록
+
+    def drop(self, map_index):
+        """끝나지 않은 작업을 버림 (작업 프로세스 상태는 다음에 전체를 다시 보냄)"""
+        job = self.jobs.pop(map_index)
+        job["future"].cancel()
+        self.sent.pop(map_index, None)
+        self.reschedule(job["tilemap"], job["tiles"])
+
+    def release(self, map_index):
+        """맵을 메인 스레드로 돌려줌"""
+        tilemap = self.owned.pop(map_index, None)
+        if tilemap is not None:
+            self.game_map.growth_scheduler.resume(tilemap)
+        self.npc_manager.simulated_maps.discard(map_index)
+        self.sent.pop(map_index, None)
+        self.last_times.pop(map_index, None)
+
+    def release_all(self):
+        self.sync()
+        for map_index in list(self.owned):
+            self.release(map_index)
+
+    def pull(self, map_index):
+        """플레이어가 들어가는 맵을 메인 스레드로 가져옴 (끝난 결과만 반영하고 기다리지 않음)"""
+        if map_index in self.jobs:
+            if self.jobs[map_index]["future"].done():
+                self.merge(map_index)
+            else:
+                self.drop(map_index)
+        self.release(map_index)
+
+    def sync(self):
+        """진행 중인 작업을 모두 기다려 반영 (저장, 시간 건너뛰기, 종료 전)"""
+        for map_index in list(self.jobs):
+            self.merge(map_index)
+
+    def skip(self):
+        """시간 건너뛰기 전에 호출: 결과를 모두 반영하고, 건너뛴 구간은 NPC 이동을 다시 계산하지 않음"""
+        self.sync()
+        self.last_times.clear()
+        self.last_tick = None
+
+    def close(self):
+        self.release_all()
+        for executor in self.executors:
+            if executor is not None:
+                executor.shutdown()
+        self.executors = [None] * len(self.executors)